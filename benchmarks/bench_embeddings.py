@@ -0,0 +1,80 @@
+"""
+Embedding backends on the CPU: encode throughput of the torch, ONNX and
+int8-quantized ONNX models, and how far their resume/job similarities
+drift from util.cos_sim on the torch reference model.
+
+    python -m benchmarks.bench_embeddings --docs 200 --backends torch onnx onnx-int8
+"""
+import os
+
+# CPU only, even on a machine with a GPU
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import json
+import time
+
+import numpy as np
+from sentence_transformers import util
+
+from models import EMBEDDING_BACKENDS, EMBEDDING_MODEL_NAME, load_embedding_model
+from benchmarks.corpus import make_corpus, make_job_corpus
+
+
+def docs_per_second(model, texts, batch_size: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        model.encode(texts, batch_size=batch_size)
+        best = min(best, time.perf_counter() - started)
+    return len(texts) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    resumes = make_corpus(args.docs)
+    jobs = make_job_corpus(args.jobs)
+
+    # Similarities of every resume/job pair on the reference model, as the API computed them originally
+    reference = load_embedding_model(EMBEDDING_MODEL_NAME, "torch")
+    reference_resumes = reference.encode(resumes, batch_size=args.batch_size)
+    reference_scores = util.cos_sim(reference_resumes, reference.encode(jobs, batch_size=args.batch_size)).numpy()
+    reference_best = reference_scores.argmax(axis=0)
+    del reference
+
+    results = {"model": EMBEDDING_MODEL_NAME, "docs": len(resumes), "jobs": len(jobs), "backends": {}}
+    for backend in args.backends:
+        started = time.perf_counter()
+        model = load_embedding_model(EMBEDDING_MODEL_NAME, backend)
+        load_seconds = time.perf_counter() - started
+        # One untimed pass so lazy session setup is not counted
+        model.encode(resumes[:args.batch_size], batch_size=args.batch_size)
+
+        throughput = docs_per_second(model, resumes, args.batch_size, args.repeat)
+        resume_vectors = model.encode(resumes, batch_size=args.batch_size)
+        scores = util.cos_sim(resume_vectors, model.encode(jobs, batch_size=args.batch_size)).numpy()
+        drift = np.abs(scores - reference_scores)
+        results["backends"][backend] = {
+            "load_seconds": load_seconds,
+            "docs_per_sec": throughput,
+            "similarity_drift_mean": float(drift.mean()),
+            "similarity_drift_max": float(drift.max()),
+            # Agreement of each resume vector with its reference vector
+            "vector_cosine_min": float(util.cos_sim(resume_vectors, reference_resumes).numpy().diagonal().min()),
+            # Jobs whose best-matching resume is unchanged
+            "top1_agreement": float((scores.argmax(axis=0) == reference_best).mean()),
+        }
+        del model
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Rewrite prompt size: tokens of the full prompt versus the boilerplate-
+pruned, budget-fitted one for long multi-page resumes, and the time the
+pruning and section ranking take.
+
+    python -m benchmarks.bench_prompt --docs 50 --budget 3000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from main import build_rewrite_messages
+from models import load_embedding_model
+from prompt_builder import count_message_tokens, fit_prompt_inputs, get_encoding
+from benchmarks.corpus import make_corpus, make_job_corpus
+
+JOB_BOILERPLATE = """
+About us
+We are a fast-growing company with offices in three countries and a culture of ownership.
+
+Benefits:
+- Health, dental and vision insurance
+- Unlimited paid time off
+- Home office stipend
+
+We are an equal opportunity employer and do not discriminate on the basis of race, gender or age."""
+
+
+def paginate(resume: str, lines_per_page: int = 25) -> str:
+    """The resume as a multi-page PDF extracts: a running header and a page number on every page"""
+    lines = resume.split("\n")
+    header = f"{lines[0]} - Resume"
+    pages = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+    return "\n".join("\n".join([header, *page, f"Page {number} of {len(pages)}"])
+                     for number, page in enumerate(pages, 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--budget", type=int, default=3000)
+    parser.add_argument("--jobs-per-resume", type=int, default=20)
+    args = parser.parse_args()
+
+    model = load_embedding_model()
+
+    async def embed(texts):
+        return model.encode(texts)
+
+    resumes = [paginate(resume) for resume in make_corpus(args.docs, jobs=args.jobs_per_resume, bullets=6)]
+    jobs = [job + JOB_BOILERPLATE for job in make_job_corpus(args.docs)]
+    job_embeddings = model.encode(jobs)
+    fixed_tokens = count_message_tokens(build_rewrite_messages("", "", [], []))
+
+    async def fit_all():
+        return [await fit_prompt_inputs(resume, job, fixed_tokens, embed, job_embedding, budget=args.budget)
+                for resume, job, job_embedding in zip(resumes, jobs, job_embeddings)]
+
+    started = time.perf_counter()
+    fitted = asyncio.run(fit_all())
+    seconds = time.perf_counter() - started
+
+    original = [inputs.original_tokens for inputs in fitted]
+    sent = [inputs.tokens for inputs in fitted]
+    print(json.dumps({
+        "docs": args.docs,
+        "budget": args.budget,
+        "token_counter": "tiktoken" if get_encoding() is not None else "estimate",
+        "original_tokens": {"mean": float(np.mean(original)), "max": int(np.max(original))},
+        "sent_tokens": {"mean": float(np.mean(sent)), "max": int(np.max(sent))},
+        "saved_fraction": 1 - sum(sent) / sum(original),
+        "over_budget_before": sum(tokens > args.budget for tokens in original),
+        "ms_per_prompt": round(seconds / args.docs * 1000, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
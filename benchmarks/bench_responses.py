@@ -0,0 +1,87 @@
+"""
+Response payloads of a bulk client: bytes per tailoring result in full,
+compact and fields= form, raw and gzip- or brotli-compressed, and the time
+to serialize them with json.dumps versus orjson.
+
+The results are built from the synthetic corpus with a fixed skill list,
+so no model is needed.
+
+    python -m benchmarks.bench_responses --docs 1000
+"""
+import argparse
+import random
+import json
+import gzip
+import time
+
+from responses import BROTLI_QUALITY, GZIP_LEVEL, brotli, json_line, orjson, parse_fields, project
+from benchmarks.corpus import make_corpus, make_job_corpus
+
+SKILLS = ["Python", "AWS", "Docker", "Kubernetes", "SQL", "React", "Leadership", "Communication", "Terraform", "Go"]
+
+
+def make_result(rng: random.Random, resume: str, job: str) -> dict:
+    """A /tailor-resume-text response with the same shape and text sizes as the real one"""
+    resume_skills = rng.sample(SKILLS, 6)
+    job_skills = rng.sample(SKILLS, 5)
+    matching = [skill for skill in job_skills if skill in resume_skills]
+    return {
+        "similarity_score": rng.random(),
+        "resume_text": resume[:1000] + "..." if len(resume) > 1000 else resume,
+        "job_desc": job,
+        "job_id": "%016x" % rng.getrandbits(64),
+        "resume_skills": resume_skills,
+        "job_skills": job_skills,
+        "missing_skills": [skill for skill in job_skills if skill not in matching],
+        "matching_skills": matching,
+        "recommendations": ["Consider highlighting these skills: " + ", ".join(job_skills[:3])],
+        "analysis": {"total_resume_skills": 6, "total_job_skills": 5,
+                     "skill_match_percentage": len(matching) / 5 * 100},
+        "improved_resume": resume,
+    }
+
+
+def best_seconds(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--fields", default="similarity_score,analysis.skill_match_percentage")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    jobs = make_job_corpus(10)
+    results = [make_result(rng, resume, jobs[i % len(jobs)]) for i, resume in enumerate(make_corpus(args.docs))]
+    shapes = {
+        "full": results,
+        "compact": [project(result, compact=True) for result in results],
+        "fields": [project(result, parse_fields(args.fields)) for result in results],
+    }
+
+    report = {"docs": args.docs, "fields": args.fields, "bytes_per_result": {}, "serialize_us_per_result": {}}
+    for name, shaped in shapes.items():
+        body = b"".join(json_line(result) for result in shaped)
+        sizes = {"raw": len(body), "gzip": len(gzip.compress(body, GZIP_LEVEL))}
+        if brotli is not None:
+            sizes["br"] = len(brotli.compress(body, quality=BROTLI_QUALITY))
+        report["bytes_per_result"][name] = {encoding: round(size / args.docs, 1) for encoding, size in sizes.items()}
+
+    encoders = {"json": lambda: [json.dumps(result) for result in results]}
+    if orjson is not None:
+        encoders["orjson"] = lambda: [orjson.dumps(result) for result in results]
+    for name, encode in encoders.items():
+        report["serialize_us_per_result"][name] = round(best_seconds(encode, args.repeat) / args.docs * 1e6, 2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Section-header and action-verb rules: one regex per section tried in turn
+and one re.sub per weak verb, versus the single named-group alternation
+and single-pass verb substitution in ResumeRules.
+
+    python -m benchmarks.bench_rules --docs 200
+"""
+import argparse
+import json
+import time
+import re
+
+from resume_document import BULLET_CHARS, classify_header
+from resume_rules import get_resume_rules
+from benchmarks.corpus import make_corpus
+
+
+def baseline_section_for(regexes, line: str):
+    """Previous behaviour: every section pattern tried in order until one matches"""
+    for section, regex in regexes:
+        if regex.match(line):
+            return section
+    return None
+
+
+def baseline_strengthen_verbs(verbs, text: str) -> str:
+    """Previous behaviour: one re.sub, with an f-string pattern, per weak verb"""
+    for weak, strong in verbs.items():
+        text = re.sub(rf'\b{weak}\b', strong, text, flags=re.IGNORECASE)
+    return text
+
+
+def best_us_per_doc(fn, docs, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for lines in docs:
+            fn(lines)
+        best = min(best, time.perf_counter() - started)
+    return best / len(docs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rules = get_resume_rules()
+    regexes = [(section, re.compile(rf'^[^\w]*(?:{pattern})\b', re.IGNORECASE))
+               for section, pattern in rules.sections.items()]
+    docs = [[line.strip() for line in text.split('\n') if line.strip()] for text in make_corpus(args.docs)]
+    bullet_docs = [[line.lstrip('•-').strip() for line in lines if line.startswith(BULLET_CHARS)] for lines in docs]
+
+    # Both paths must agree before they are timed
+    for lines in docs:
+        for line in lines:
+            assert rules.section_for(line) == baseline_section_for(regexes, line)
+    for bullets in bullet_docs:
+        for bullet in bullets:
+            assert rules.strengthen_verbs(bullet) == baseline_strengthen_verbs(rules.action_verbs, bullet)
+
+    results = {
+        "docs": len(docs),
+        "lines_per_doc": sum(map(len, docs)) / len(docs),
+        "bullets_per_doc": sum(map(len, bullet_docs)) / len(bullet_docs),
+        "section_us_per_doc": {
+            "per_pattern": best_us_per_doc(
+                lambda lines: [baseline_section_for(regexes, line) for line in lines], docs, args.repeat),
+            "alternation": best_us_per_doc(
+                lambda lines: [rules.section_for(line) for line in lines], docs, args.repeat),
+            "classify_header": best_us_per_doc(
+                lambda lines: [classify_header(line) for line in lines], docs, args.repeat),
+        },
+        "verbs_us_per_doc": {
+            "per_verb_sub": best_us_per_doc(
+                lambda bullets: [baseline_strengthen_verbs(rules.action_verbs, b) for b in bullets],
+                bullet_docs, args.repeat),
+            "single_pass": best_us_per_doc(
+                lambda bullets: [rules.strengthen_verbs(b) for b in bullets], bullet_docs, args.repeat),
+        },
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Incremental re-analysis: time to re-analyze a resume after its summary
+is edited, as a whole document versus section by section with the
+unchanged sections cached, and how far the recombined similarity to a
+job drifts from the whole-document one.
+
+    python -m benchmarks.bench_sections --docs 100
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from job_store import normalize
+from models import EMBEDDING_MODEL_ID, load_embedding_model
+from section_cache import SectionCache, analyze_incrementally
+from skills import extract_skills_batch, load_resources
+from benchmarks.corpus import make_corpus, make_job_corpus
+
+
+def edit_summary(resume: str) -> str:
+    """The resume with its summary line reworded, as a candidate tailoring it would"""
+    lines = resume.split("\n")
+    summary = lines.index("Summary") + 1
+    lines[summary] = lines[summary].replace("years of experience", "years of hands-on experience")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100)
+    args = parser.parse_args()
+
+    load_resources()
+    model = load_embedding_model()
+    resumes = make_corpus(args.docs)
+    edited = [edit_summary(resume) for resume in resumes]
+    job = normalize(np.asarray(model.encode(make_job_corpus(1))[0], dtype=np.float32))
+
+    async def analyze(texts):
+        return extract_skills_batch(texts), list(model.encode(texts))
+
+    # One resume per call in both modes, as a resubmission arrives
+    started = time.perf_counter()
+    full_embeddings = []
+    for text in edited:
+        extract_skills_batch([text])
+        full_embeddings.append(normalize(model.encode([text])[0]))
+    full_seconds = time.perf_counter() - started
+
+    cache = SectionCache(max_entries=len(resumes) * 16)
+
+    async def incremental(texts):
+        return [await analyze_incrementally(text, cache, analyze, EMBEDDING_MODEL_ID) for text in texts]
+
+    asyncio.run(incremental(resumes))
+    started = time.perf_counter()
+    results = asyncio.run(incremental(edited))
+    incremental_seconds = time.perf_counter() - started
+
+    drift = [abs(float(full @ job) - float(resume.embedding @ job))
+             for full, (resume, _) in zip(full_embeddings, results)]
+    counts = [counts for _, counts in results]
+    print(json.dumps({
+        "docs": args.docs,
+        "sections_per_resume": sum(c["sections"] for c in counts) / len(counts),
+        "analyzed_per_resume": sum(c["analyzed"] for c in counts) / len(counts),
+        "full_ms_per_resume": round(full_seconds / args.docs * 1000, 2),
+        "incremental_ms_per_resume": round(incremental_seconds / args.docs * 1000, 2),
+        "speedup": round(full_seconds / incremental_seconds, 2),
+        "similarity_drift": {"mean": float(np.mean(drift)), "max": float(np.max(drift))},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
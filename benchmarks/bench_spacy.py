@@ -0,0 +1,61 @@
+"""
+spaCy skill extraction throughput: full pipeline, one doc at a time (the
+old extract_skills) versus the trimmed pipeline fed through nlp.pipe.
+
+    python -m benchmarks.bench_spacy --docs 200 --batch-size 64 --n-process 1 2
+"""
+import argparse
+import json
+import time
+
+import spacy
+
+import skills
+from benchmarks.corpus import make_corpus
+
+
+def docs_per_second(fn, texts, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - started)
+    return len(texts) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=skills.SPACY_BATCH_SIZE)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = make_corpus(args.docs)
+    full_nlp = spacy.load("en_core_web_sm")
+
+    def baseline(batch):
+        # Previous behaviour: full pipeline, one nlp() call per document
+        return [skills.skills_from_doc(full_nlp(text), text) for text in batch]
+
+    # Warm both pipelines before timing
+    baseline(texts[:5])
+    skills.extract_skills_batch(texts[:5])
+
+    results = {
+        "docs": len(texts),
+        "excluded_components": skills.SPACY_EXCLUDE,
+        "baseline_full_pipeline_docs_per_sec": docs_per_second(baseline, texts, args.repeat),
+    }
+    for n_process in args.n_process:
+        key = f"trimmed_pipe_batch{args.batch_size}_nproc{n_process}_docs_per_sec"
+        results[key] = docs_per_second(
+            lambda batch: skills.extract_skills_batch(batch, batch_size=args.batch_size, n_process=n_process),
+            texts, args.repeat,
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Deterministic synthetic resumes and job descriptions for benchmarks
+"""
+from typing import List
+import random
+
+FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Drew"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Okafor", "Novak", "Silva", "Kim", "Larsen", "Haddad"]
+COMPANIES = ["Tech Corp", "DataWorks", "Cloudline", "Acme Analytics", "Northwind", "Bluefin Labs", "Orbital Systems"]
+TITLES = ["Software Developer", "Data Analyst", "Backend Engineer", "DevOps Engineer", "Full Stack Developer",
+          "Machine Learning Engineer", "Project Manager"]
+SKILLS = ["Python", "JavaScript", "Java", "React", "Node.js", "SQL", "Docker", "Kubernetes", "AWS", "Azure",
+          "GCP", "TensorFlow", "PyTorch", "Pandas", "NumPy", "FastAPI", "Django", "Flask", "MongoDB",
+          "PostgreSQL", "Redis", "GraphQL", "Git", "Linux", "CI/CD", "Agile", "Scrum", "Terraform"]
+VERBS = ["Worked on", "Helped build", "Used", "Made", "Was responsible for", "Led", "Designed", "Improved"]
+OBJECTS = ["web applications", "data pipelines", "internal dashboards", "REST APIs", "microservices",
+           "reporting tools", "deployment automation", "customer-facing features", "ETL jobs"]
+OUTCOMES = ["for the sales team", "that cut latency by 30%", "used by 2,000 customers", "across three regions",
+            "with cross-functional teams", "to reduce manual work", "in an Agile environment"]
+
+
+def make_resume(rng: random.Random, jobs: int = 3, bullets: int = 4) -> str:
+    """Build a plain-text resume with the usual sections"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{name.split()[1].lower()}@email.com",
+        f"(555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        f"linkedin.com/in/{name.replace(' ', '-').lower()}",
+        "",
+        "Summary",
+        f"{rng.choice(TITLES)} with {rng.randint(2, 15)} years of experience building {rng.choice(OBJECTS)}.",
+        "",
+        "Experience",
+    ]
+    for i in range(jobs):
+        start = 2024 - (i + 1) * rng.randint(1, 3)
+        lines.append(f"{rng.choice(TITLES)} | {rng.choice(COMPANIES)} | {start} - {start + rng.randint(1, 3)}")
+        for _ in range(bullets):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)} "
+                         f"and {rng.choice(SKILLS)} {rng.choice(OUTCOMES)}")
+        lines.append("")
+    lines += [
+        "Education",
+        f"Bachelor of Science in Computer Science, University of Technology, {rng.randint(2005, 2020)}",
+        "",
+        "Skills",
+        ", ".join(rng.sample(SKILLS, 8)),
+    ]
+    return "\n".join(lines)
+
+
+def make_job_description(rng: random.Random, requirements: int = 6) -> str:
+    """Build a job posting with requirements and responsibilities"""
+    title = rng.choice(TITLES)
+    lines = [
+        f"We are looking for a Senior {title} to join our team at {rng.choice(COMPANIES)}.",
+        "",
+        "Requirements:",
+        f"- {rng.randint(2, 8)}+ years of experience in {rng.choice(OBJECTS)}",
+    ]
+    for _ in range(requirements):
+        lines.append(f"- Proficiency in {rng.choice(SKILLS)} and {rng.choice(SKILLS)}")
+    lines += [
+        "",
+        "Responsibilities:",
+        f"- Develop and maintain {rng.choice(OBJECTS)}",
+        "- Work with cross-functional teams",
+        "- Mentor junior developers",
+    ]
+    return "\n".join(lines)
+
+
+def make_corpus(count: int, seed: int = 42, jobs: int = 3, bullets: int = 4) -> List[str]:
+    """Return count resumes, reproducible for a given seed"""
+    rng = random.Random(seed)
+    return [make_resume(rng, jobs=jobs, bullets=bullets) for _ in range(count)]
+
+
+def make_job_corpus(count: int, seed: int = 7) -> List[str]:
+    """Return count job descriptions, reproducible for a given seed"""
+    rng = random.Random(seed)
+    return [make_job_description(rng) for _ in range(count)]
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """Build a minimal PDF with one text page per string; empty strings give text-less (scanned-like) pages"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_refs = []
+    for text in pages:
+        if text:
+            escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in text.splitlines()]
+            stream = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        else:
+            # A filled rectangle stands in for a scanned image
+            stream = "0.8 g 50 50 500 700 re f"
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        content_ref = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>")
+        page_refs.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_at = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def make_pdf_corpus(count: int, pages: int = 20, seed: int = 42) -> List[bytes]:
+    """Return count multi-page resume PDFs, each page holding one synthetic resume section"""
+    rng = random.Random(seed)
+    return [make_pdf([make_resume(rng, jobs=2, bullets=4) for _ in range(pages)]) for _ in range(count)]
@@ -0,0 +1,174 @@
+"""
+Load test of the production launcher: throughput and latency of
+POST /tailor-resume-text against serve.py with 1, 2, 4... workers, and how
+close each step comes to linear scaling.
+
+Every worker count gets a fresh serve.py on a local port, with the OpenAI
+API replaced by the fake server from benchmarks.suite. Each request sends a
+different resume with caching off, so every one runs spaCy, the embedding
+model and the template scoring. Workers run one intra-op thread each by
+default, so N workers should use N cores; on a machine with fewer cores
+than workers the extra workers cannot add throughput.
+
+    python -m benchmarks.load_test --workers 1 2 4 --duration 30
+"""
+from typing import Dict, List
+import subprocess
+import tempfile
+import argparse
+import asyncio
+import socket
+import shutil
+import json
+import time
+import sys
+import os
+
+import httpx
+
+from benchmarks.corpus import make_corpus, make_job_corpus
+from benchmarks.suite import git_commit, start_fake_llm, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, threads: int, port: int, llm_url: str, state_dir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "WORKER_THREADS": str(threads),
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "LOG_LEVEL": "warning",
+        "OPENAI_API_KEY": "benchmark",
+        "OPENAI_BASE_URL": llm_url,
+        "REWRITE_CACHE_MAX_ENTRIES": "0",
+        "JOB_STORE_PATH": os.path.join(state_dir, f"job_store_{workers}.sqlite"),
+    }
+    return subprocess.Popen([sys.executable, "serve.py"], cwd=ROOT, env=env)
+
+
+def wait_until_ready(base_url: str, workers: int, timeout: float):
+    """Poll /ready until enough consecutive answers say ready that every worker has likely warmed up"""
+    deadline = time.monotonic() + timeout
+    ready_in_a_row = 0
+    while ready_in_a_row < workers * 4:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"serve.py was not ready after {timeout:.0f}s")
+        try:
+            ready = httpx.get(f"{base_url}/ready", timeout=5).status_code == 200
+        except httpx.HTTPError:
+            ready = False
+        ready_in_a_row = ready_in_a_row + 1 if ready else 0
+        if not ready:
+            time.sleep(0.5)
+
+
+async def drive(base_url: str, resumes: List[str], jobs: List[str], concurrency: int, duration: float) -> Dict:
+    """Keep concurrency requests in flight for duration seconds"""
+    latencies: List[float] = []
+    errors = 0
+    sent = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal errors, sent
+        while time.perf_counter() < deadline:
+            index = sent
+            sent += 1
+            form = {"resume_text": resumes[index % len(resumes)], "job_desc": jobs[index % len(jobs)],
+                    "use_cache": "false"}
+            started = time.perf_counter()
+            try:
+                response = await client.post(f"{base_url}/tailor-resume-text", data=form)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                errors += 1
+
+    started = time.perf_counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": len(latencies) / elapsed,
+        "latency": summarize(latencies) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=1, help="WORKER_THREADS for every worker")
+    parser.add_argument("--clients-per-worker", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--resumes", type=int, default=500)
+    parser.add_argument("--llm-latency-ms", type=float, default=0)
+    parser.add_argument("--ready-timeout", type=float, default=600)
+    parser.add_argument("--output", help="write the JSON results here as well as to stdout")
+    args = parser.parse_args()
+
+    llm = start_fake_llm(args.llm_latency_ms / 1000)
+    llm_url = f"http://127.0.0.1:{llm.server_port}/v1"
+    resumes = make_corpus(args.resumes)
+    jobs = make_job_corpus(max(1, args.resumes // 10))
+    # Registered jobs of each run, shared by its workers
+    state_dir = tempfile.mkdtemp(prefix="load_test_")
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "cpu_count": os.cpu_count(),
+        "threads_per_worker": args.threads,
+        "llm_latency_ms": args.llm_latency_ms,
+        "runs": {},
+    }
+    for workers in args.workers:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(workers, args.threads, port, llm_url, state_dir)
+        try:
+            wait_until_ready(base_url, workers, args.ready_timeout)
+            concurrency = workers * args.clients_per_worker
+            asyncio.run(drive(base_url, resumes, jobs, concurrency, args.warmup))
+            results["runs"][str(workers)] = asyncio.run(drive(base_url, resumes, jobs, concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        print(f"{workers} workers: {results['runs'][str(workers)]['requests_per_sec']:.1f} req/s", file=sys.stderr)
+    llm.shutdown()
+    shutil.rmtree(state_dir, ignore_errors=True)
+
+    # Throughput relative to the smallest worker count, and the fraction of linear scaling reached
+    base_workers = min(args.workers)
+    base_rps = results["runs"][str(base_workers)]["requests_per_sec"]
+    results["scaling"] = {
+        str(workers): {
+            "speedup": run["requests_per_sec"] / base_rps if base_rps else None,
+            "efficiency": run["requests_per_sec"] / base_rps / (workers / base_workers) if base_rps else None,
+        }
+        for workers, run in ((int(key), value) for key, value in results["runs"].items())
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
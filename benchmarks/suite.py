@@ -0,0 +1,237 @@
+"""
+End-to-end benchmark suite: every pipeline stage and the tailoring
+endpoints over synthetic corpora of several sizes, emitted as JSON so runs
+can be compared across commits.
+
+The OpenAI API is replaced by a local OpenAI-compatible server (plain and
+streamed chat completions with a fixed latency), so nothing leaves the
+machine. The embedding model and the spaCy model must already be
+installed or cached locally.
+
+    python -m benchmarks.suite --sizes 10 50 200 --output bench.json
+    python -m benchmarks.suite --sizes 10 50 --baseline bench.json
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+import subprocess
+import statistics
+import threading
+import argparse
+import platform
+import json
+import time
+import os
+
+from benchmarks.corpus import make_corpus, make_job_corpus, make_pdf
+
+FAKE_LLM_REWRITE = "Improved resume\n\nSummary\nExperienced engineer.\n\nExperience\n- Delivered results\n"
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Answers POST /v1/chat/completions like the OpenAI API, streamed or not"""
+
+    latency = 0.0
+    chunk_size = 16
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.latency)
+        base = {"id": "chatcmpl-bench", "created": int(time.time()), "model": request.get("model", "fake")}
+        if not request.get("stream"):
+            self._send("application/json", json.dumps({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": FAKE_LLM_REWRITE}}],
+            }).encode())
+            return
+
+        events = []
+        for start in range(0, len(FAKE_LLM_REWRITE), self.chunk_size):
+            delta = {"content": FAKE_LLM_REWRITE[start:start + self.chunk_size]}
+            events.append({**base, "object": "chat.completion.chunk",
+                           "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+        events.append({**base, "object": "chat.completion.chunk",
+                       "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        body = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+        self._send("text/event-stream", body.encode())
+
+    def _send(self, content_type: str, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_llm(latency: float) -> ThreadingHTTPServer:
+    """Serve the fake OpenAI API on a free local port in a daemon thread"""
+    handler = type("Handler", (FakeLLMHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Latency distribution (ms) and throughput of per-item timings in seconds"""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "per_sec": len(ordered) / sum(ordered) if sum(ordered) else None,
+    }
+
+
+def time_each(fn: Callable, items: List, warmup: int) -> Dict:
+    """Time fn(item) for every item, after calling it on the first few untimed"""
+    for item in items[:warmup]:
+        fn(item)
+    samples = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def run_stage(results: Dict, name: str, fn: Callable, *args):
+    """Record a stage, or the error that stopped it, without aborting the suite"""
+    try:
+        results[name] = fn(*args)
+    except Exception as e:
+        results[name] = {"error": f"{e.__class__.__name__}: {e}"}
+        print(f"{name} failed: {results[name]['error']}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except Exception:
+        return None
+
+
+def bench_size(main, client, size: int, warmup: int) -> Dict:
+    """Time every stage and endpoint over size resumes"""
+    from resume_document import parse_resume
+    from skills import extract_skills
+
+    resumes = make_corpus(size, seed=size)
+    jobs = make_job_corpus(max(1, size // 10), seed=size)
+    pairs = [(resume, jobs[i % len(jobs)]) for i, resume in enumerate(resumes)]
+    pdfs = [make_pdf([resume]) for resume in resumes]
+    analyzed = {}
+
+    def fallback(pair):
+        resume, job = pair
+        if job not in analyzed:
+            analyzed[job] = extract_skills(job)
+        missing, matching = main.compare_skills(extract_skills(resume), analyzed[job])
+        return main.generate_improved_resume_fallback(resume, job, missing, matching)
+
+    def post(path: str, data: Dict, files=None):
+        response = client.post(path, data=data, files=files)
+        response.raise_for_status()
+        return response.content
+
+    def encode_batch():
+        started = time.perf_counter()
+        main.encode_texts(resumes)
+        elapsed = time.perf_counter() - started
+        return {"n": size, "total_ms": elapsed * 1000, "per_sec": size / elapsed}
+
+    def rank_all():
+        started = time.perf_counter()
+        lines = post("/rank-resumes", {"resume_texts": resumes, "job_desc": jobs[0], "use_cache": "false"})
+        elapsed = time.perf_counter() - started
+        assert lines.strip().splitlines(), "empty ranking"
+        return {"n": size, "total_ms": elapsed * 1000, "per_sec": size / elapsed}
+
+    def form(pair):
+        return {"resume_text": pair[0], "job_desc": pair[1], "use_cache": "false"}
+
+    # Each request uses a different resume, so the upload cache never hits; the jobs cycle
+    stages = {}
+    run_stage(stages, "extract_text_from_pdf", time_each, main.extract_text_from_pdf, pdfs, warmup)
+    run_stage(stages, "extract_skills", time_each, extract_skills, resumes, warmup)
+    run_stage(stages, "model.encode", time_each, lambda text: main.encode_texts([text]), resumes, warmup)
+    run_stage(stages, "model.encode_batch", encode_batch)
+    run_stage(stages, "parse_resume", time_each, parse_resume, resumes, warmup)
+    run_stage(stages, "generate_improved_resume_fallback", time_each, fallback, pairs, warmup)
+    run_stage(stages, "POST /tailor-resume-text", time_each,
+              lambda pair: post("/tailor-resume-text", form(pair)), pairs, warmup)
+    run_stage(stages, "POST /tailor-resume-text-stream", time_each,
+              lambda pair: post("/tailor-resume-text-stream", form(pair)), pairs, warmup)
+    run_stage(stages, "POST /tailor-resume", time_each,
+              lambda item: post("/tailor-resume", {"job_desc": item[1], "use_cache": "false"},
+                                files={"resume": ("resume.pdf", item[0], "application/pdf")}),
+              list(zip(pdfs, [job for _, job in pairs])), 0)
+    run_stage(stages, "POST /rank-resumes", rank_all)
+    return stages
+
+
+def compare(results: Dict, baseline: Dict) -> Dict:
+    """Ratio of mean (or total) time against a previous run; above 1 is slower"""
+    ratios = {}
+    for size, stages in results["sizes"].items():
+        for name, stats in stages.items():
+            old = baseline.get("sizes", {}).get(size, {}).get(name, {})
+            key = "mean_ms" if "mean_ms" in stats else "total_ms"
+            if stats.get(key) and old.get(key):
+                ratios.setdefault(size, {})[name] = round(stats[key] / old[key], 3)
+    return {"commit": baseline.get("commit"), "time_ratio": ratios}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--llm-latency-ms", type=float, default=0)
+    parser.add_argument("--output", help="write the JSON results here as well as to stdout")
+    parser.add_argument("--baseline", help="JSON from a previous run to compare against")
+    args = parser.parse_args()
+
+    server = start_fake_llm(args.llm_latency_ms / 1000)
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    # Measure the work, not the rewrite cache
+    os.environ["REWRITE_CACHE_MAX_ENTRIES"] = "0"
+
+    # Imported after the environment is set, as main reads it at import time
+    from fastapi.testclient import TestClient
+    import main as app_main
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "embedding_model": app_main.EMBEDDING_MODEL_ID,
+        "llm_latency_ms": args.llm_latency_ms,
+        "sizes": {},
+    }
+    with TestClient(app_main.app) as client:
+        for size in args.sizes:
+            results["sizes"][str(size)] = bench_size(app_main, client, size, args.warmup)
+    server.shutdown()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["baseline"] = compare(results, json.load(f))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
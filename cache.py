@@ -0,0 +1,235 @@
+"""
+Small LRU caches with optional time-to-live: in memory, on disk in SQLite,
+and both tiers together
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+import threading
+import sqlite3
+import time
+import os
+
+
+class LRUCache:
+    """Thread-safe LRU cache; entries older than ttl seconds are treated as missing"""
+
+    def __init__(self, max_entries: int = 1000, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0,
+            "evictions": self.evictions,
+        }
+
+
+class DiskCache:
+    """SQLite-backed string cache with TTL and LRU size eviction; survives restarts"""
+
+    def __init__(self, path: str, table: str = "cache", max_entries: int = 1000, ttl: Optional[float] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._connection = None
+        self._pid = None
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+        self._db.commit()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # A SQLite connection must not be used across fork(), and serve.py forks its
+        # workers after importing the app, so each process opens its own
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._connection
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._db.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None or self._expired(row[1]):
+                if row is not None:
+                    self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self._db.commit()
+                self.misses += 1
+                return default
+
+            self._db.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)", (key, value, now, now))
+            if self.ttl is not None:
+                self._db.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl,))
+            overflow = self._count() - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._db.commit()
+
+    def delete(self, key: str) -> bool:
+        """Remove an entry; returns False if it was not cached"""
+        with self._lock:
+            removed = self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,)).rowcount > 0
+            self._db.commit()
+            return removed
+
+    def _count(self) -> int:
+        return self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute(f"DELETE FROM {self.table}")
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0,
+            "evictions": self.evictions,
+            "path": self.path,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class Serializer(NamedTuple):
+    """How a TwoTierCache stores its values as text in the SQLite tier"""
+    dumps: Callable[[Any], str]
+    loads: Callable[[str], Any]
+
+
+class TwoTierCache:
+    """In-memory LRU in front of an optional SQLite tier (disabled with an empty path).
+
+    The memory tier holds the values themselves; the disk tier, shared by
+    every worker process and kept across restarts, holds them serialized.
+    """
+
+    def __init__(self, serializer: Serializer, table: str, max_entries: int = 1000, ttl: Optional[float] = None,
+                 path: str = "", disk_max_entries: int = 1000):
+        self.serializer = serializer
+        self._memory = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._disk = DiskCache(path, table=table, max_entries=disk_max_entries, ttl=ttl) if path else None
+
+    def get(self, key: str) -> Any:
+        value = self._memory.get(key)
+        if value is None and self._disk is not None:
+            payload = self._disk.get(key)
+            if payload is not None:
+                value = self.serializer.loads(payload)
+                # Promote to memory so the next hit skips SQLite
+                self._memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._memory.set(key, value)
+        if self._disk is not None:
+            self._disk.set(key, self.serializer.dumps(value))
+
+    def delete(self, key: str) -> bool:
+        """Remove an entry from both tiers; returns False if neither had it"""
+        removed = self._memory.pop(key) is not None
+        if self._disk is not None:
+            # Another worker may have stored it, so it can be on disk only
+            removed = self._disk.delete(key) or removed
+        return removed
+
+    @property
+    def ttl(self) -> Optional[float]:
+        return self._memory.ttl
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self._memory.stats(),
+            "disk": self._disk.stats() if self._disk is not None else None,
+        }
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
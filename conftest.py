@@ -0,0 +1,89 @@
+"""
+Shared fixtures: the FastAPI app with small deterministic stand-ins for the
+embedding model and the spaCy pipeline, so endpoint tests run without
+downloading either.
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Each dimension counts one word, so texts sharing these words are similar
+EMBEDDING_VOCABULARY = ["python", "aws", "docker", "kubernetes", "sql", "java", "react", "sales", "marketing"]
+
+
+class StubEmbeddingModel:
+    def encode(self, texts, batch_size=32, **kwargs):
+        vectors = []
+        for text in texts:
+            words = text.lower().replace(",", " ").split()
+            vectors.append([words.count(word) for word in EMBEDDING_VOCABULARY] + [1.0])
+        return np.array(vectors, dtype=np.float32)
+
+
+class StubNLP:
+    """Docs without entities or noun chunks; skills then come from the taxonomy matcher alone"""
+
+    pipe_names = []
+
+    def __call__(self, text):
+        return SimpleNamespace(text=text, ents=[], noun_chunks=[])
+
+    def pipe(self, texts, **kwargs):
+        return (self(text) for text in texts)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """TestClient for main.app with stub models, a fresh job store and no OpenAI key (template rewrites)"""
+    from fastapi.testclient import TestClient
+
+    import main
+    import models
+    import skills
+    import workers
+    from job_store import JobStore
+
+    monkeypatch.setattr(models, "_model", StubEmbeddingModel())
+    monkeypatch.setattr(skills, "_nlp", StubNLP())
+    monkeypatch.setattr(workers, "SPACY_PROCESSES", 0)
+    monkeypatch.setattr(main, "job_store", JobStore(path=""))
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    # Without the lifespan, so the real models are never loaded
+    yield TestClient(main.app)
+    workers.shutdown_pools()
+
+
+class FakeLLM:
+    """Answers chat completions with a fixed rewrite, streamed as REWRITE_TOKENS; fail=True makes every call raise"""
+
+    REWRITE_TOKENS = ["Improved ", "resume ", "text"]
+
+    def __init__(self):
+        self.fail = False
+        self.calls = 0
+
+    async def chat_completion(self, messages, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        return "".join(self.REWRITE_TOKENS)
+
+    async def stream_chat_completion(self, messages, **kwargs):
+        self.calls += 1
+        for token in self.REWRITE_TOKENS:
+            yield token
+            if self.fail:
+                raise RuntimeError("LLM stream broke")
+
+
+@pytest.fixture
+def fake_llm(client, monkeypatch):
+    """Configure the client's app with FakeLLM in place of the OpenAI API"""
+    import llm
+
+    fake = FakeLLM()
+    monkeypatch.setattr(llm, "is_configured", lambda: True)
+    monkeypatch.setattr(llm, "chat_completion", fake.chat_completion)
+    monkeypatch.setattr(llm, "stream_chat_completion", fake.stream_chat_completion)
+    return fake
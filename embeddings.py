@@ -0,0 +1,145 @@
+"""
+Cross-request micro-batching for sentence embeddings.
+
+Concurrent requests each ask for a couple of vectors; the batcher holds
+them for at most EMBED_MAX_WAIT_MS (or until EMBED_MAX_BATCH_SIZE texts are
+queued) and runs a single batched encode on the worker thread pool.
+"""
+from typing import Callable, Dict, List
+import asyncio
+import time
+import os
+
+import numpy as np
+
+from workers import run_in_thread
+
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "32"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class _PendingEncode:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str], future: asyncio.Future):
+        self.texts = texts
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingBatcher:
+    """Coalesces encode calls from concurrent requests into batched encodes"""
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = EMBED_MAX_BATCH_SIZE, max_wait_ms: float = EMBED_MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+        # Metrics
+        self.batches = 0
+        self.requests = 0
+        self.items = 0
+        self.batch_size_counts = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_size_counts["+Inf"] = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+        self.encode_time_total = 0.0
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, sharing a model call with other in-flight requests"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put(_PendingEncode(list(texts), future))
+        return await future
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> List[_PendingEncode]:
+        """Wait for the first request, then gather more until full or timed out"""
+        batch = [await self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = self._loop.time() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                pending = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(pending)
+            size += len(pending.texts)
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            texts = [text for pending in batch for text in pending.texts]
+
+            started = time.perf_counter()
+            self._record_batch(batch, started)
+            try:
+                vectors = await run_in_thread(self.encode_fn, texts)
+            except Exception as e:
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+            finally:
+                self.encode_time_total += time.perf_counter() - started
+
+            offset = 0
+            for pending in batch:
+                count = len(pending.texts)
+                if not pending.future.done():
+                    pending.future.set_result(vectors[offset:offset + count])
+                offset += count
+
+    def _record_batch(self, batch: List[_PendingEncode], started: float):
+        size = sum(len(pending.texts) for pending in batch)
+        self.batches += 1
+        self.requests += len(batch)
+        self.items += size
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_size_counts[bucket] += 1
+                break
+        else:
+            self.batch_size_counts["+Inf"] += 1
+
+        for pending in batch:
+            waited = started - pending.enqueued_at
+            self.queue_time_total += waited
+            self.queue_time_max = max(self.queue_time_max, waited)
+
+    def stats(self) -> Dict:
+        """Batch-size and queue-time metrics for the /stats endpoint"""
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "items": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches else 0,
+            "batch_size_histogram": {str(k): v for k, v in self.batch_size_counts.items()},
+            "avg_queue_time_ms": (self.queue_time_total / self.requests * 1000) if self.requests else 0,
+            "max_queue_time_ms": self.queue_time_max * 1000,
+            "avg_encode_time_ms": (self.encode_time_total / self.batches * 1000) if self.batches else 0,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
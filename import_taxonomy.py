@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Convert a full skills export into the taxonomy format of skill_matcher.py.
+
+The bundled data/skills_taxonomy.txt is a curated sample of about 300
+common skills. For full coverage, download a large export such as the ESCO
+skills classification (skills_en.csv, about 13,900 skills with their
+alternative labels) and convert it:
+
+    python import_taxonomy.py skills_en.csv --merge data/skills_taxonomy.txt > data/skills_taxonomy_full.txt
+    SKILL_TAXONOMY_PATH=data/skills_taxonomy_full.txt python serve.py
+
+Columns default to ESCO's (preferredLabel, altLabels, skillType); pass
+--name-column, --alias-column and --category-column for other exports.
+Aliases may be separated by newlines or "|". With --merge, the curated
+entries come first and win, so their case-sensitive ("=Go") and
+alias-only ("~C") rules still apply.
+"""
+from typing import Dict, Iterable, List, Set
+import argparse
+import csv
+import sys
+import re
+
+from skill_matcher import MIN_SURFACE_LENGTH, parse_taxonomy
+
+# ESCO skill types; knowledge entries are the tools and subject areas the matcher treats as technical
+ESCO_CATEGORIES = {"knowledge": "technical", "skill/competence": "general", "language": "general"}
+ALIAS_SEPARATOR = re.compile(r"[\n|]")
+
+
+def clean_label(label: str) -> str:
+    """A label usable as a surface form; '' when it cannot be written in the taxonomy format"""
+    label = " ".join(label.split())
+    # "|" and "," delimit fields and aliases; a leading "=" or "~" would read as a matching rule
+    if "|" in label or "," in label or label[:1] in ("=", "~", "#") or len(label) < MIN_SURFACE_LENGTH:
+        return ""
+    return label
+
+
+def convert_rows(rows: Iterable[Dict[str, str]], name_column: str, alias_column: str, category_column: str,
+                 known: Set[str]) -> List[str]:
+    """Taxonomy lines for rows whose name and aliases are not already in known (lowercased surfaces)"""
+    lines = []
+    for row in rows:
+        name = clean_label(row.get(name_column) or "")
+        if not name or name.lower() in known:
+            continue
+        raw_category = (row.get(category_column) or "").strip().lower()
+        category = ESCO_CATEGORIES.get(raw_category, raw_category.replace("|", " ") or "general")
+        aliases = []
+        for alias in ALIAS_SEPARATOR.split(row.get(alias_column) or ""):
+            alias = clean_label(alias)
+            if alias and alias.lower() not in known and alias.lower() != name.lower():
+                aliases.append(alias)
+                known.add(alias.lower())
+        known.add(name.lower())
+        lines.append(f"{name} | {category} | {', '.join(aliases)}".rstrip(" |"))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("export", help="CSV export with one skill per row")
+    parser.add_argument("--merge", help="curated taxonomy file to keep first, e.g. data/skills_taxonomy.txt")
+    parser.add_argument("--name-column", default="preferredLabel")
+    parser.add_argument("--alias-column", default="altLabels")
+    parser.add_argument("--category-column", default="skillType")
+    args = parser.parse_args()
+
+    known: Set[str] = set()
+    output = sys.stdout
+    if args.merge:
+        with open(args.merge, encoding="utf-8") as f:
+            curated = f.read()
+        for entry in parse_taxonomy(curated.splitlines()):
+            known.add(entry.name.lower())
+            known.update(surface.lstrip("=").lower() for surface in entry.surfaces)
+        output.write(curated.rstrip("\n") + f"\n\n# Imported from {args.export}\n")
+
+    with open(args.export, encoding="utf-8", newline="") as f:
+        lines = convert_rows(csv.DictReader(f), args.name_column, args.alias_column, args.category_column, known)
+    output.write("\n".join(lines) + "\n")
+    print(f"Wrote {len(lines)} imported skills", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Persistent vector index of job postings.
+
+Embeddings live in one contiguous float32 (or float16) matrix stored as a
+memory-mapped .npy file, so a large index is paged in by the OS rather
+than loaded into the Python heap. Posting metadata (row, title, text and
+skills) lives in SQLite next to it. Top-k search over unit-length
+embeddings is a blocked matrix-vector product plus argpartition.
+
+Deletes leave a tombstone row that is masked out of searches; the matrix
+is compacted once tombstones make up half of it.
+
+Several processes (the serve.py workers) may open the same index: writes
+take SQLite's write lock first, and every process reloads its row map and
+matrix when another one has committed since it last looked.
+
+The embedding model id and dimension are recorded next to the matrix.
+Opening the index with a different model id raises JobIndexModelMismatch,
+and JobIndex.rebuild re-embeds the stored postings with the new model, so
+vectors from two models are never compared.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
+import sqlite3
+import json
+import time
+import os
+
+import numpy as np
+
+JOB_INDEX_DIR = os.getenv("JOB_INDEX_DIR", "job_index")
+JOB_INDEX_DTYPE = os.getenv("JOB_INDEX_DTYPE", "float32")
+
+# Rows converted to float32 per matmul block when the matrix is float16
+SEARCH_BLOCK_ROWS = 16384
+INITIAL_CAPACITY = 1024
+# Postings re-embedded per encode call during a rebuild
+REBUILD_BATCH_SIZE = 256
+
+
+class JobIndexModelMismatch(ValueError):
+    """The index holds vectors from another embedding model (or from an unrecorded one)"""
+
+
+class JobIndex:
+    """Memory-mapped embedding matrix with SQLite metadata for job postings.
+
+    With model_id set, the index refuses to open over vectors recorded for
+    another model; None skips the check.
+    """
+
+    def __init__(self, directory: str = JOB_INDEX_DIR, dtype: str = JOB_INDEX_DTYPE, model_id: Optional[str] = None):
+        if dtype not in ("float32", "float16"):
+            raise ValueError("JOB_INDEX_DTYPE must be float32 or float16")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.vectors_path = os.path.join(directory, "vectors.npy")
+        self.model_id = model_id
+        self._lock = threading.RLock()
+
+        self._db = sqlite3.connect(os.path.join(directory, "postings.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " posting_id TEXT PRIMARY KEY, row INTEGER UNIQUE NOT NULL, title TEXT,"
+            " job_desc TEXT NOT NULL, skills TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._db.commit()
+
+        self._vectors = None
+        self._valid = np.zeros(0, dtype=bool)
+        self._row_ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._load()
+
+    def _load(self):
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        rows = self._db.execute("SELECT posting_id, row FROM postings").fetchall()
+        self._rows = {posting_id: row for posting_id, row in rows}
+        count = max(self._rows.values()) + 1 if self._rows else 0
+        self._row_ids = [None] * count
+        for posting_id, row in self._rows.items():
+            self._row_ids[row] = posting_id
+
+        meta = self._meta()
+        if self.model_id is not None and self._rows and meta.get("model_id") != self.model_id:
+            raise JobIndexModelMismatch(
+                f"Job index at {self.directory} was built with {meta.get('model_id') or 'an unrecorded model'}, "
+                f"not {self.model_id}"
+            )
+
+        if os.path.exists(self.vectors_path):
+            self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+            if self._vectors.dtype != self.dtype:
+                raise ValueError(f"Job index at {self.directory} is {self._vectors.dtype}, not {self.dtype}")
+            if "dim" in meta and int(meta["dim"]) != self._vectors.shape[1]:
+                raise ValueError(f"Job index at {self.directory} records dimension {meta['dim']}, "
+                                 f"but its matrix has {self._vectors.shape[1]}")
+            self._valid = np.zeros(self._vectors.shape[0], dtype=bool)
+            self._valid[list(self._rows.values())] = True
+
+    def _meta(self) -> Dict[str, str]:
+        return dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+
+    def _set_meta(self, dim: int):
+        values = [("dim", str(dim))] + ([("model_id", self.model_id)] if self.model_id is not None else [])
+        self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", values)
+
+    def _refresh(self):
+        """Reload if another process committed to the index since the last load"""
+        if self._db.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+            self._vectors = None
+            self._valid = np.zeros(0, dtype=bool)
+            self._load()
+
+    @contextmanager
+    def _writing(self):
+        """Hold the SQLite write lock on an up-to-date index; commits on success"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh()
+                yield
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                # The in-memory rows may be ahead of the database now; reload on next use
+                self._data_version = None
+                raise
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def __contains__(self, posting_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return posting_id in self._rows
+
+    def _allocate(self, capacity: int, dim: int):
+        """Create (or grow into) a memory-mapped matrix with room for capacity rows"""
+        tmp_path = self.vectors_path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(capacity, dim))
+        valid = np.zeros(capacity, dtype=bool)
+        if self._vectors is not None:
+            used = len(self._row_ids)
+            grown[:used] = self._vectors[:used]
+            valid[:used] = self._valid[:used]
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(tmp_path, self.vectors_path)
+        self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+        self._valid = valid
+
+    def add(self, postings: List[Dict], embeddings: np.ndarray):
+        """Add or replace postings; each dict needs posting_id, job_desc, skills and optionally title"""
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if len(postings) != embeddings.shape[0]:
+            raise ValueError("postings and embeddings must have the same length")
+        if not postings:
+            return
+
+        # A posting repeated within one call keeps its last version
+        latest = {posting["posting_id"]: i for i, posting in enumerate(postings)}
+        if len(latest) != len(postings):
+            keep = sorted(latest.values())
+            postings = [postings[i] for i in keep]
+            embeddings = embeddings[keep]
+
+        with self._writing():
+            self._insert(postings, embeddings)
+
+    def _insert(self, postings: List[Dict], embeddings: np.ndarray):
+        """Write unique postings and their embeddings; the caller holds the write lock"""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms == 0, 1, norms)
+
+        dim = embeddings.shape[1]
+        if self._vectors is None:
+            self._allocate(max(INITIAL_CAPACITY, len(postings)), dim)
+            self._set_meta(dim)
+        elif dim != self.dim:
+            raise ValueError(f"Embedding dimension {dim} does not match index dimension {self.dim}")
+
+        # Replacing a posting tombstones its old row
+        for posting in postings:
+            self._tombstone(posting["posting_id"])
+
+        start = len(self._row_ids)
+        needed = start + len(postings)
+        if needed > self._vectors.shape[0]:
+            self._allocate(max(needed, self._vectors.shape[0] * 2), dim)
+
+        self._vectors[start:needed] = embeddings.astype(self.dtype)
+        self._vectors.flush()
+        self._valid[start:needed] = True
+
+        now = time.time()
+        records = []
+        for offset, posting in enumerate(postings):
+            row = start + offset
+            self._row_ids.append(posting["posting_id"])
+            self._rows[posting["posting_id"]] = row
+            records.append((posting["posting_id"], row, posting.get("title"), posting["job_desc"],
+                            json.dumps(posting["skills"]), posting.get("created_at", now)))
+        self._db.executemany("INSERT INTO postings VALUES (?, ?, ?, ?, ?, ?)", records)
+
+    @classmethod
+    def rebuild(cls, directory: str, dtype: str, model_id: str,
+                encode: Callable[[List[str]], np.ndarray]) -> "JobIndex":
+        """Re-embed every stored posting with encode (the model_id model) and return the index open on it"""
+        index = cls(directory, dtype)
+        with index._writing():
+            # Another process may have rebuilt it while this one waited for the write lock
+            if index._meta().get("model_id") != model_id or not index._rows:
+                rows = index._db.execute(
+                    "SELECT posting_id, title, job_desc, skills, created_at FROM postings ORDER BY row"
+                ).fetchall()
+                index._db.execute("DELETE FROM postings")
+                index._db.execute("DELETE FROM meta")
+                index._vectors = None
+                if os.path.exists(index.vectors_path):
+                    os.remove(index.vectors_path)
+                index._valid = np.zeros(0, dtype=bool)
+                index._row_ids, index._rows = [], {}
+
+                index.model_id = model_id
+                for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+                    batch = rows[start:start + REBUILD_BATCH_SIZE]
+                    postings = [{"posting_id": posting_id, "title": title, "job_desc": job_desc,
+                                 "skills": json.loads(skills), "created_at": created_at}
+                                for posting_id, title, job_desc, skills, created_at in batch]
+                    embeddings = np.atleast_2d(np.asarray(encode([p["job_desc"] for p in postings]), dtype=np.float32))
+                    index._insert(postings, embeddings)
+        index.model_id = model_id
+        return index
+
+    def _tombstone(self, posting_id: str) -> bool:
+        row = self._rows.pop(posting_id, None)
+        if row is None:
+            return False
+        self._row_ids[row] = None
+        self._valid[row] = False
+        self._vectors[row] = 0
+        self._db.execute("DELETE FROM postings WHERE posting_id = ?", (posting_id,))
+        return True
+
+    def delete(self, posting_id: str) -> bool:
+        """Remove a posting; returns False if it was not in the index"""
+        with self._writing():
+            removed = self._tombstone(posting_id)
+            if removed:
+                self._vectors.flush()
+                self._db.commit()
+                if len(self._row_ids) >= INITIAL_CAPACITY and len(self._rows) * 2 < len(self._row_ids):
+                    self.compact()
+            return removed
+
+    def compact(self):
+        """Rewrite the matrix without tombstoned rows"""
+        with self._writing():
+            if self._vectors is None:
+                return
+            live = [(posting_id, row) for row, posting_id in enumerate(self._row_ids) if posting_id is not None]
+            dim = self.dim
+            capacity = max(INITIAL_CAPACITY, len(live) * 2)
+            tmp_path = self.vectors_path + ".tmp"
+            compacted = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.dtype, shape=(capacity, dim))
+            if live:
+                compacted[:len(live)] = self._vectors[[old_row for _, old_row in live]]
+            compacted.flush()
+            del compacted
+
+            # Move rows out of the way first to keep the UNIQUE(row) constraint satisfied
+            self._db.execute("UPDATE postings SET row = -row - 1")
+            self._db.executemany("UPDATE postings SET row = ? WHERE posting_id = ?",
+                                 [(new_row, posting_id) for new_row, (posting_id, _) in enumerate(live)])
+            self._vectors = None
+            os.replace(tmp_path, self.vectors_path)
+            self._db.commit()
+
+            self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+            self._row_ids = [posting_id for posting_id, _ in live]
+            self._rows = {posting_id: row for row, posting_id in enumerate(self._row_ids)}
+            self._valid = np.zeros(capacity, dtype=bool)
+            self._valid[:len(live)] = True
+
+    def search(self, query: np.ndarray, top_k: int = 10) -> List[Tuple[str, float]]:
+        """Return (posting_id, cosine similarity) for the top_k closest postings"""
+        with self._lock:
+            self._refresh()
+            if not self._rows:
+                return []
+            query = np.asarray(query, dtype=np.float32).ravel()
+            norm = np.linalg.norm(query)
+            if norm:
+                query = query / norm
+
+            used = len(self._row_ids)
+            matrix = self._vectors[:used]
+            if self.dtype == np.float32:
+                scores = matrix @ query
+            else:
+                scores = np.empty(used, dtype=np.float32)
+                for start in range(0, used, SEARCH_BLOCK_ROWS):
+                    block = matrix[start:start + SEARCH_BLOCK_ROWS].astype(np.float32)
+                    scores[start:start + len(block)] = block @ query
+            scores = np.where(self._valid[:used], scores, -np.inf)
+
+            k = min(top_k, len(self._rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._row_ids[row], float(scores[row])) for row in top]
+
+    def get(self, posting_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch stored metadata for postings"""
+        if not posting_ids:
+            return {}
+        placeholders = ",".join("?" * len(posting_ids))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT posting_id, title, job_desc, skills, created_at FROM postings WHERE posting_id IN ({placeholders})",
+                posting_ids,
+            ).fetchall()
+        return {
+            posting_id: {"posting_id": posting_id, "title": title, "job_desc": job_desc,
+                         "skills": json.loads(skills), "created_at": created_at}
+            for posting_id, title, job_desc, skills, created_at in rows
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "postings": len(self._rows),
+            "rows": len(self._row_ids),
+            "capacity": 0 if self._vectors is None else self._vectors.shape[0],
+            "dim": self.dim,
+            "dtype": self.dtype.name,
+            "model_id": self.model_id,
+            "directory": self.directory,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._db.close()
@@ -0,0 +1,101 @@
+"""
+Registered job descriptions with their precomputed skills and embedding.
+
+A job posting is analyzed once (spaCy skills and features plus a
+normalized MiniLM embedding) and then referenced by job_id from the
+tailoring endpoints, so scoring many resumes against the same posting
+only pays for the resume side.
+
+Analyses live in an in-memory LRU, optionally backed by a SQLite tier
+(JOB_STORE_PATH) shared by every worker process, so a job_id registered
+through one serve.py worker resolves in all of them. Entries are stored
+under the job_id and the embedding model id, so after a model change a
+job_id stops resolving (and is registered again) rather than returning a
+vector of the old model's dimension.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import hashlib
+import json
+import time
+import os
+
+import numpy as np
+
+from cache import Serializer, TwoTierCache
+from models import EMBEDDING_MODEL_ID
+
+JOB_STORE_MAX_ENTRIES = int(os.getenv("JOB_STORE_MAX_ENTRIES", "1000"))
+JOB_STORE_TTL = float(os.getenv("JOB_STORE_TTL", str(24 * 3600)))
+# Empty keeps registered jobs in this process only
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "")
+JOB_STORE_DISK_MAX_ENTRIES = int(os.getenv("JOB_STORE_DISK_MAX_ENTRIES", "20000"))
+
+
+@dataclass
+class JobAnalysis:
+    job_id: str
+    job_desc: str
+    skills: List[str]
+    features: Dict[str, List[str]]
+    embedding: np.ndarray
+    created_at: float = field(default_factory=time.time)
+
+    def summary(self) -> Dict:
+        """JSON-friendly view without the embedding"""
+        return {
+            "job_id": self.job_id,
+            "job_skills": self.skills,
+            "features": self.features,
+            "created_at": self.created_at,
+        }
+
+    def to_json(self) -> str:
+        return json.dumps({**self.summary(), "job_desc": self.job_desc, "embedding": self.embedding.tolist()})
+
+    @classmethod
+    def from_json(cls, payload: str) -> "JobAnalysis":
+        data = json.loads(payload)
+        return cls(data["job_id"], data["job_desc"], data["job_skills"], data["features"],
+                   np.asarray(data["embedding"], dtype=np.float32), data["created_at"])
+
+
+def make_job_id(job_desc: str) -> str:
+    """Content-addressed id, so registering the same posting twice is a no-op"""
+    normalized = " ".join(job_desc.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def make_job_key(job_id: str, model_id: str) -> str:
+    """Storage key of a job analysis: its embedding is only valid for the model that produced it"""
+    return f"{job_id}:{model_id}"
+
+
+def normalize(vector: np.ndarray) -> np.ndarray:
+    """Scale an embedding to unit length so cosine similarity is a dot product"""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class JobStore(TwoTierCache):
+    """LRU/TTL store of analyzed job descriptions keyed by job_id, optionally backed by SQLite"""
+
+    def __init__(self, max_entries: int = JOB_STORE_MAX_ENTRIES, ttl: float = JOB_STORE_TTL,
+                 path: str = JOB_STORE_PATH, disk_max_entries: int = JOB_STORE_DISK_MAX_ENTRIES,
+                 model_id: str = EMBEDDING_MODEL_ID):
+        super().__init__(Serializer(JobAnalysis.to_json, JobAnalysis.from_json), table="jobs",
+                         max_entries=max_entries, ttl=ttl, path=path, disk_max_entries=disk_max_entries)
+        self.model_id = model_id
+
+    def get(self, job_id: str) -> Optional[JobAnalysis]:
+        return super().get(make_job_key(job_id, self.model_id))
+
+    def add(self, job: JobAnalysis):
+        self.set(make_job_key(job.job_id, self.model_id), job)
+
+    def remove(self, job_id: str) -> bool:
+        return self.delete(make_job_key(job_id, self.model_id))
+
+    def stats(self) -> Dict:
+        return {**self._memory.stats(), "disk": self._disk.stats() if self._disk is not None else None}
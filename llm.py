@@ -0,0 +1,170 @@
+"""
+Shared async OpenAI client with pooled connections, deadlines and retries.
+
+Every LLM call goes through chat_completion() or stream_chat_completion(),
+which cap the number of in-flight requests with a semaphore, enforce an
+overall deadline across retries and back off with full jitter on transient
+errors. Point OPENAI_BASE_URL at a local stub server to exercise them
+without the real API.
+"""
+from openai import AsyncOpenAI, APIConnectionError, RateLimitError, InternalServerError
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import random
+import httpx
+import os
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Connection pool and deadline tuning
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "60"))
+
+# Retry policy and concurrency cap
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))
+
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+_client = None
+_semaphore = None
+
+
+def is_configured() -> bool:
+    """Whether an API key is available for LLM calls"""
+    return bool(os.getenv("OPENAI_API_KEY"))
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client, creating it on first use"""
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                keepalive_expiry=30,
+            ),
+            timeout=httpx.Timeout(LLM_DEADLINE, connect=LLM_CONNECT_TIMEOUT),
+        )
+        _client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+            http_client=http_client,
+            # Retries are handled here so they share the per-call deadline
+            max_retries=0,
+        )
+    return _client
+
+
+def get_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore that caps in-flight LLM calls"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _semaphore
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt"""
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+async def chat_completion(messages: List[Dict[str, str]], max_tokens: int = 2000, temperature: float = 0.7,
+                          deadline: Optional[float] = None) -> str:
+    """Run a chat completion and return the message content.
+
+    The deadline (seconds) covers waiting for a concurrency slot, every
+    attempt and the backoff between them; asyncio.TimeoutError is raised
+    once it is exhausted.
+    """
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + (deadline or LLM_DEADLINE)
+
+    async with asyncio.timeout_at(expires_at):
+        async with get_semaphore():
+            attempt = 0
+            while True:
+                try:
+                    response = await get_client().chat.completions.create(
+                        model=OPENAI_MODEL,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                    )
+                    return response.choices[0].message.content.strip()
+                except RETRYABLE_ERRORS as e:
+                    if attempt >= LLM_MAX_RETRIES:
+                        raise
+                    delay = backoff_delay(attempt)
+                    if loop.time() + delay >= expires_at:
+                        raise
+                    print(f"LLM call failed ({e.__class__.__name__}), retrying in {delay:.2f}s")
+                    attempt += 1
+                    await asyncio.sleep(delay)
+
+
+async def stream_chat_completion(messages: List[Dict[str, str]], max_tokens: int = 2000, temperature: float = 0.7,
+                                 deadline: Optional[float] = None) -> AsyncIterator[str]:
+    """Stream a chat completion, yielding content deltas as they arrive.
+
+    Transient errors are retried only while opening the stream; once tokens
+    have been yielded a failure is raised to the caller. The deadline is
+    checked around every await rather than with asyncio.timeout, which does
+    not compose with yielding from an async generator.
+    """
+    loop = asyncio.get_running_loop()
+    expires_at = loop.time() + (deadline or LLM_DEADLINE)
+
+    def remaining() -> float:
+        left = expires_at - loop.time()
+        if left <= 0:
+            raise asyncio.TimeoutError()
+        return left
+
+    semaphore = get_semaphore()
+    await asyncio.wait_for(semaphore.acquire(), remaining())
+    try:
+        attempt = 0
+        while True:
+            try:
+                stream = await asyncio.wait_for(get_client().chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                ), remaining())
+                break
+            except RETRYABLE_ERRORS as e:
+                delay = backoff_delay(attempt)
+                if attempt >= LLM_MAX_RETRIES or loop.time() + delay >= expires_at:
+                    raise
+                print(f"LLM stream failed to open ({e.__class__.__name__}), retrying in {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+        async with stream:
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), remaining())
+                except StopAsyncIteration:
+                    break
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    finally:
+        semaphore.release()
+
+
+async def close_client():
+    """Close the pooled HTTP connections; called on application shutdown"""
+    global _client, _semaphore
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _semaphore = None
@@ -1,30 +1,46 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sentence_transformers import SentenceTransformer, util
-from openai import OpenAI
 from dotenv import load_dotenv
-from typing import Dict, List
-import PyPDF2
-import spacy
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import threading
+import asyncio
+import time
 import json
 import io
-import re
 import os
 
-app = FastAPI(title="AI Resume Builder API", version="1.0.0")
+from skills import extract_skills, extract_skills_batch, analyze_job_description, TECHNICAL_CATEGORIES
+from skill_matcher import get_skill_matcher
+from resume_document import parse_resume
+from resume_rules import get_resume_rules
+from workers import run_in_thread, run_in_process, get_process_pool, shutdown_pools, SPACY_PROCESSES
+from embeddings import EmbeddingBatcher, EMBED_MAX_BATCH_SIZE
+from job_store import JobAnalysis, JobStore, make_job_id, normalize
+from upload_cache import ResumeAnalysis, UploadCache, make_upload_key
+from section_cache import SectionCache, analyze_incrementally
+from job_index import JobIndex, JobIndexModelMismatch, JOB_INDEX_DIR, JOB_INDEX_DTYPE
+from pdf_extract import extract_text, PDFExtractionError, PageLimitError
+from uploads import BodySizeLimitMiddleware, SpooledUpload, spool_upload, MAX_REQUEST_BYTES
+from rewrite_cache import RewriteCache, make_rewrite_key, REWRITE_CACHE_MAX_ENTRIES
+from pipeline import AnalysisPipeline, PipelineRun
+from task_queue import TaskStore, TaskWorkerPool, QueueFull, CallbackURLError, check_callback_url, work, TASK_QUEUE_PATH, TASK_WORKERS
+from models import get_model, is_model_loaded, readiness, EMBEDDING_MODEL_ID
+from responses import CompressionMiddleware, JSONResponseClass, json_line, json_response, parse_fields, project
+from metrics import (ServerTimingMiddleware, timed, timed_call, record_cache_lookup, record_fallback, record_queue_depth,
+                     record_prompt_tokens, render_metrics)
+from prompt_builder import count_message_tokens, fit_prompt_inputs
+import llm
+
+app = FastAPI(title="AI Resume Builder API", version="1.0.0", default_response_class=JSONResponseClass)
 
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client with error handling
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY environment variable is required")
-
-openai_client = OpenAI(api_key=api_key)
-
-# Clear the API key from memory for security
-api_key = None
+# Without an OpenAI key the API still serves analysis with template rewrites
+if not llm.is_configured():
+    print("OPENAI_API_KEY is not set; AI resume rewriting will use the template fallback")
 
 # Configure CORS for development and production
 allowed_origins = [
@@ -36,278 +52,112 @@ allowed_origins = [
 production_origins = os.getenv("ALLOWED_ORIGINS", "").split(",")
 allowed_origins.extend([origin.strip() for origin in production_origins if origin.strip()])
 
+# Bulk ranking accepts many files in one request
+BULK_MAX_REQUEST_BYTES = int(os.getenv("BULK_MAX_REQUEST_BYTES", str(100 * 1024 * 1024)))
+
+# Oversized bodies get a 413 before they are read; added first so CORS headers wrap the 413
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=MAX_REQUEST_BYTES,
+    path_limits={"/rank-resumes": BULK_MAX_REQUEST_BYTES}
+)
+
+# Brotli or gzip for large bodies, as the client's Accept-Encoding allows
+app.add_middleware(CompressionMiddleware)
+
+# Per-request stage timings, returned as a Server-Timing header
+app.add_middleware(ServerTimingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["GET", "POST"],  # Only allow necessary methods
+    allow_methods=["GET", "POST", "DELETE"],  # Only allow necessary methods
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
-model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+def encode_texts(texts: List[str]):
+    """Embed a batch of texts with the (lazily loaded) sentence transformer"""
+    return get_model().encode(texts, batch_size=EMBED_MAX_BATCH_SIZE)
 
-nlp = spacy.load("en_core_web_sm")
+# Concurrent requests share batched encode calls
+embedding_batcher = EmbeddingBatcher(encode_texts)
 
+# Analyzed job descriptions, referenced by job_id (shared across workers with JOB_STORE_PATH)
+job_store = JobStore()
+
+# Analyzed PDF uploads by content hash, so repeat uploads skip extraction and models
+upload_cache = UploadCache()
+
+# Analyzed resume sections by content hash, so an edited resume only re-analyzes what changed
+section_cache = SectionCache()
+
+# Persistent index of job postings for resume-to-jobs search, opened on first use
+job_index = None
+_job_index_lock = threading.Lock()
+
+def get_job_index() -> JobIndex:
+    """Open the index (blocking: SQLite, the memmap and possibly a rebuild); call through open_job_index"""
+    global job_index
+    if job_index is None:
+        with _job_index_lock:
+            if job_index is None:
+                try:
+                    job_index = JobIndex(model_id=EMBEDDING_MODEL_ID)
+                except JobIndexModelMismatch as e:
+                    # Vectors from another model can't be compared with this one's; re-embed the stored postings
+                    print(f"Rebuilding job index: {e}")
+                    job_index = JobIndex.rebuild(JOB_INDEX_DIR, JOB_INDEX_DTYPE, EMBEDDING_MODEL_ID, encode_texts)
+    return job_index
+
+async def open_job_index() -> JobIndex:
+    """The job index, opened (or rebuilt) on a worker thread so the event loop keeps serving"""
+    return job_index if job_index is not None else await run_in_thread(get_job_index)
+
+# Persistent cache of AI rewrites, opened on first use (REWRITE_CACHE_MAX_ENTRIES=0 disables it)
+rewrite_cache = None
+
+def get_rewrite_cache() -> Optional[RewriteCache]:
+    global rewrite_cache
+    if rewrite_cache is None and REWRITE_CACHE_MAX_ENTRIES > 0:
+        rewrite_cache = RewriteCache()
+    return rewrite_cache
+
+# Submit/poll task queue, opened on first use; workers start with the first task
+task_store = None
+task_workers = None
+
+def get_task_store() -> TaskStore:
+    global task_store
+    if task_store is None:
+        task_store = TaskStore()
+    return task_store
+
+def ensure_task_workers():
+    """Start the task workers: TASK_WORKERS processes, or a loop in this process when it is 0"""
+    global task_workers
+    if task_workers is not None:
+        return
+    if TASK_WORKERS > 0:
+        # Each worker is already a separate process, so spaCy runs on its thread pool
+        task_workers = TaskWorkerPool(TASK_QUEUE_PATH, "main:run_queued_task", env={"SPACY_PROCESSES": "0"})
+        task_workers.start()
+    else:
+        task_workers = asyncio.create_task(work(get_task_store(), run_queued_task, f"api-{os.getpid()}"))
+
+# Bulk ranking limits
+BULK_MAX_RESUMES = int(os.getenv("BULK_MAX_RESUMES", "1000"))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "32"))
+BULK_MAX_CHUNKS_IN_FLIGHT = int(os.getenv("BULK_MAX_CHUNKS_IN_FLIGHT", "2"))
 
-def extract_skills(text):
-    """Extract skills using a combination of NER and keyword matching"""
-    doc = nlp(text)
-    skills = []
-    
-    # Common technical skills keywords
-    tech_skills = [
-        'python', 'java', 'javascript', 'react', 'node.js', 'sql', 'html', 'css',
-        'machine learning', 'data analysis', 'project management', 'leadership',
-        'communication', 'teamwork', 'problem solving', 'git', 'docker', 'kubernetes',
-        'aws', 'azure', 'gcp', 'tensorflow', 'pytorch', 'pandas', 'numpy', 'fastapi',
-        'django', 'flask', 'mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch',
-        'agile', 'scrum', 'devops', 'ci/cd', 'testing', 'debugging', 'api', 'rest',
-        'graphql', 'microservices', 'cloud computing', 'data science', 'analytics'
-    ]
-    
-    # Extract entities that might be skills
-    for ent in doc.ents:
-        if ent.label_ in ["ORG", "PRODUCT", "LANGUAGE", "PERSON"]:
-            # Filter for technology-related entities
-            if any(tech in ent.text.lower() for tech in ['python', 'java', 'react', 'aws', 'google', 'microsoft']):
-                skills.append(ent.text)
-    
-    # Extract skills using keyword matching
-    text_lower = text.lower()
-    for skill in tech_skills:
-        if skill in text_lower:
-            skills.append(skill.title())
-    
-    # Extract noun phrases that might be skills
-    for chunk in doc.noun_chunks:
-        if len(chunk.text.split()) <= 3 and len(chunk.text) > 2:
-            # Check if it looks like a technical term
-            if any(char.isupper() for char in chunk.text) or any(tech in chunk.text.lower() for tech in tech_skills[:10]):
-                skills.append(chunk.text)
-    
-    return list(set(skills))
-
-def parse_resume_sections(text: str) -> Dict[str, str]:
-    """Parse resume text into structured sections"""
-    sections = {
-        'contact': '',
-        'summary': '',
-        'experience': '',
-        'education': '',
-        'skills': '',
-        'other': ''
-    }
-    
-    # Common section headers
-    section_patterns = {
-        'contact': r'(contact|personal|info)',
-        'summary': r'(summary|objective|profile|about)',
-        'experience': r'(experience|work|employment|career|professional)',
-        'education': r'(education|academic|qualification|degree)',
-        'skills': r'(skills|technical|competenc|abilities)',
-        'projects': r'(projects|portfolio)',
-        'certifications': r'(certification|certificate|license)',
-        'achievements': r'(achievement|award|honor|accomplishment)'
-    }
-    
-    lines = text.split('\n')
-    current_section = 'other'
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Check if line is a section header
-        line_lower = line.lower()
-        section_found = False
-        
-        for section, pattern in section_patterns.items():
-            if re.search(pattern, line_lower) and len(line) < 50:
-                current_section = section
-                section_found = True
-                break
-        
-        if not section_found:
-            # Add content to current section
-            if current_section in sections:
-                sections[current_section] += line + '\n'
-            else:
-                sections['other'] += line + '\n'
-    
-    return sections
-
-def extract_contact_info(text: str) -> Dict[str, str]:
-    """Extract contact information from resume text"""
-    contact_info = {
-        'name': '',
-        'email': '',
-        'phone': '',
-        'location': '',
-        'linkedin': '',
-        'github': ''
-    }
-    
-    # Email pattern
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    email_match = re.search(email_pattern, text)
-    if email_match:
-        contact_info['email'] = email_match.group()
-    
-    # Phone pattern
-    phone_pattern = r'(\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})'
-    phone_match = re.search(phone_pattern, text)
-    if phone_match:
-        contact_info['phone'] = phone_match.group()
-    
-    # LinkedIn pattern
-    linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-    linkedin_match = re.search(linkedin_pattern, text, re.IGNORECASE)
-    if linkedin_match:
-        contact_info['linkedin'] = linkedin_match.group()
-    
-    # GitHub pattern
-    github_pattern = r'github\.com/[\w-]+'
-    github_match = re.search(github_pattern, text, re.IGNORECASE)
-    if github_match:
-        contact_info['github'] = github_match.group()
-    
-    # Extract name (first few words that look like a name)
-    lines = text.split('\n')
-    for line in lines[:5]:  # Check first 5 lines
-        line = line.strip()
-        if line and len(line.split()) <= 4 and not any(char.isdigit() for char in line):
-            if '@' not in line and 'http' not in line.lower():
-                contact_info['name'] = line
-                break
-    
-    return contact_info
-
-def extract_name_from_text(text: str) -> str:
-    """Extract name from resume text (usually first line)"""
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    if lines:
-        # First non-empty line is usually the name
-        first_line = lines[0]
-        # Skip if it looks like a header or section
-        if not any(word in first_line.lower() for word in ['resume', 'cv', 'curriculum', 'objective', 'summary']):
-            return first_line
-    return "Professional Candidate"
-
-def extract_experience_entries(text: str) -> List[Dict[str, str]]:
-    """Extract work experience entries from resume text"""
-    entries = []
-    lines = text.split('\n')
-    
-    # Look for experience section
-    in_experience = False
-    current_entry = {'title': '', 'company': '', 'dates': '', 'description': []}
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Check if we're entering experience section
-        if any(keyword in line.lower() for keyword in ['experience', 'work', 'employment', 'career']):
-            if len(line) < 50:  # Likely a section header
-                in_experience = True
-                continue
-        
-        # Check if we're leaving experience section
-        if in_experience and any(keyword in line.lower() for keyword in ['education', 'skills', 'projects', 'certifications']):
-            if len(line) < 50:  # Likely a section header
-                if current_entry['title'] or current_entry['company']:
-                    entries.append(current_entry.copy())
-                break
-        
-        if in_experience:
-            # Try to identify job title, company, dates
-            if '|' in line or ' at ' in line or ' - ' in line:
-                # Likely a job title/company line
-                if current_entry['title'] or current_entry['company']:
-                    entries.append(current_entry.copy())
-                    current_entry = {'title': '', 'company': '', 'dates': '', 'description': []}
-                
-                # Parse the line
-                parts = re.split(r'\s*[\|\-]\s*', line)
-                if len(parts) >= 2:
-                    current_entry['title'] = parts[0].strip()
-                    current_entry['company'] = parts[1].strip()
-                    if len(parts) >= 3:
-                        current_entry['dates'] = parts[2].strip()
-            elif line.startswith('•') or line.startswith('-'):
-                # Achievement/responsibility bullet point
-                current_entry['description'].append(line)
-            elif current_entry['title'] and not current_entry['dates'] and any(char.isdigit() for char in line):
-                # Might be dates
-                current_entry['dates'] = line
-            elif current_entry['title']:
-                # Additional description
-                current_entry['description'].append(line)
-    
-    # Add the last entry
-    if current_entry['title'] or current_entry['company']:
-        entries.append(current_entry)
-    
-    return entries
-
-def extract_education_entries(text: str) -> List[str]:
-    """Extract education entries from resume text"""
-    entries = []
-    lines = text.split('\n')
-    
-    in_education = False
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Check if we're entering education section
-        if any(keyword in line.lower() for keyword in ['education', 'academic', 'qualification', 'degree']):
-            if len(line) < 50:  # Likely a section header
-                in_education = True
-                continue
-        
-        # Check if we're leaving education section
-        if in_education and any(keyword in line.lower() for keyword in ['experience', 'skills', 'projects', 'certifications']):
-            if len(line) < 50:  # Likely a section header
-                break
-        
-        if in_education:
-            entries.append(line)
-    
-    return entries
-
-def extract_actual_skills_from_text(text: str) -> List[str]:
-    """Extract actual skills mentioned in the resume text"""
-    # Common technical skills to look for
-    common_skills = [
-        'Python', 'JavaScript', 'Java', 'C++', 'C#', 'PHP', 'Ruby', 'Go', 'Rust',
-        'React', 'Angular', 'Vue', 'Node.js', 'Express', 'Django', 'Flask',
-        'HTML', 'CSS', 'SQL', 'MongoDB', 'PostgreSQL', 'MySQL',
-        'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Git', 'Linux',
-        'Machine Learning', 'AI', 'Data Analysis', 'Excel', 'Word', 'PowerPoint'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in common_skills:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return found_skills
 
 def is_technical_skill(skill: str) -> bool:
     """Determine if a skill is technical or soft skill"""
-    technical_keywords = [
-        'python', 'javascript', 'java', 'react', 'node', 'sql', 'html', 'css',
-        'aws', 'docker', 'git', 'linux', 'database', 'api', 'framework',
-        'programming', 'development', 'software', 'web', 'mobile', 'cloud'
-    ]
-    
-    return any(keyword in skill.lower() for keyword in technical_keywords)
+    matcher = get_skill_matcher()
+    if matcher.category(skill) in TECHNICAL_CATEGORIES:
+        return True
+    return matcher.has_match(skill, TECHNICAL_CATEGORIES)
 
 def create_intelligent_summary(experience_entries: List[Dict], actual_skills: List[str], 
                              matching_skills: List[str], missing_skills: List[str], job_desc: str) -> str:
@@ -379,20 +229,8 @@ def enhance_bullet_point(bullet: str, matching_skills: List[str]) -> str:
     # Remove existing bullet if present
     clean_bullet = bullet.lstrip('•-').strip()
     
-    # Action verbs to replace weak verbs
-    action_verbs = {
-        'worked': 'collaborated',
-        'did': 'executed',
-        'made': 'developed',
-        'helped': 'assisted',
-        'used': 'utilized',
-        'was responsible': 'managed'
-    }
-    
-    # Replace weak verbs
-    enhanced = clean_bullet
-    for weak, strong in action_verbs.items():
-        enhanced = re.sub(rf'\b{weak}\b', strong, enhanced, flags=re.IGNORECASE)
+    # Replace weak verbs with stronger action verbs in one compiled pass
+    enhanced = get_resume_rules().strengthen_verbs(clean_bullet)
     
     # Ensure it starts with capital letter
     if enhanced:
@@ -400,13 +238,12 @@ def enhance_bullet_point(bullet: str, matching_skills: List[str]) -> str:
     
     return f"• {enhanced}"
 
-def generate_improved_resume_with_ai(resume_text: str, job_desc: str, missing_skills: List[str], 
-                                   matching_skills: List[str]) -> str:
-    """Generate AI-powered resume rewrite using OpenAI GPT"""
+def build_rewrite_messages(resume_text: str, job_desc: str, missing_skills: List[str],
+                           matching_skills: List[str]) -> List[Dict[str, str]]:
+    """Build the chat messages for the AI resume rewrite"""
     
-    try:
-        # Create a comprehensive prompt for AI resume rewriting
-        prompt = f"""
+    # Create a comprehensive prompt for AI resume rewriting
+    prompt = f"""
 You are an expert resume writer and career coach. Your task is to completely rewrite and optimize a resume to perfectly match a specific job description.
 
 ORIGINAL RESUME:
@@ -441,53 +278,113 @@ FORMATTING REQUIREMENTS:
 OUTPUT: Provide ONLY the complete rewritten resume, no explanations or comments.
 """
 
-        # Call OpenAI API
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert resume writer who creates compelling, job-tailored resumes that get interviews."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2000,
-            temperature=0.7
-        )
-        
-        ai_resume = response.choices[0].message.content.strip()
-        
-        # Add optimization suggestions at the end
-        ai_resume += "\n\n💡 AI OPTIMIZATION NOTES\n" + "-" * 25
-        ai_resume += "\nThis resume has been AI-optimized for maximum job relevance:"
-        
-        if missing_skills:
-            ai_resume += f"\n• Added focus on: {', '.join(missing_skills[:3])}"
-        if matching_skills:
-            ai_resume += f"\n• Emphasized your strengths in: {', '.join(matching_skills[:3])}"
-        
-        ai_resume += "\n• Enhanced with industry-specific keywords and phrases"
-        ai_resume += "\n• Optimized for Applicant Tracking Systems (ATS)"
-        ai_resume += "\n• Quantified achievements and used strong action verbs"
-        
-        return ai_resume
+    return [
+        {"role": "system", "content": "You are an expert resume writer who creates compelling, job-tailored resumes that get interviews."},
+        {"role": "user", "content": prompt}
+    ]
+
+async def build_budgeted_rewrite_messages(resume_text: str, job_desc: str, missing_skills: List[str],
+                                          matching_skills: List[str],
+                                          job_embedding: Optional[np.ndarray] = None) -> List[Dict[str, str]]:
+    """Rewrite messages with the resume and job description pruned to LLM_INPUT_TOKEN_BUDGET"""
+    with timed("prompt"):
+        fixed_tokens = count_message_tokens(build_rewrite_messages("", "", missing_skills, matching_skills))
+        inputs = await fit_prompt_inputs(resume_text, job_desc, fixed_tokens, embedding_batcher.encode, job_embedding)
+    record_prompt_tokens(inputs.tokens, inputs.saved_tokens)
+    if inputs.saved_tokens:
+        dropped = f", dropped {', '.join(inputs.dropped_sections)}" if inputs.dropped_sections else ""
+        print(f"Rewrite prompt: {inputs.original_tokens} -> {inputs.tokens} tokens "
+              f"({inputs.saved_tokens} saved{dropped})")
+    return build_rewrite_messages(inputs.resume_text, inputs.job_desc, missing_skills, matching_skills)
+
+def build_optimization_notes(missing_skills: List[str], matching_skills: List[str]) -> str:
+    """Trailer appended to every AI-rewritten resume"""
+    notes = "\n\n💡 AI OPTIMIZATION NOTES\n" + "-" * 25
+    notes += "\nThis resume has been AI-optimized for maximum job relevance:"
+    
+    if missing_skills:
+        notes += f"\n• Added focus on: {', '.join(missing_skills[:3])}"
+    if matching_skills:
+        notes += f"\n• Emphasized your strengths in: {', '.join(matching_skills[:3])}"
+    
+    notes += "\n• Enhanced with industry-specific keywords and phrases"
+    notes += "\n• Optimized for Applicant Tracking Systems (ATS)"
+    notes += "\n• Quantified achievements and used strong action verbs"
+    return notes
+
+async def lookup_rewrite(resume_text: str, job_desc: str, use_cache: bool) -> Tuple[Optional[str], str]:
+    """Cached rewrite for the pair (or None) and its cache key; a cache error counts as a miss"""
+    cache_key = make_rewrite_key(resume_text, job_desc, llm.OPENAI_MODEL)
+    if not use_cache:
+        return None, cache_key
+    try:
+        cache = await run_in_thread(get_rewrite_cache)
+        if cache is None:
+            return None, cache_key
+        cached = await run_in_thread(cache.get, cache_key)
+    except Exception as e:
+        print(f"Rewrite cache lookup failed: {e!r}")
+        cached = None
+    record_cache_lookup("rewrite", cached is not None)
+    return cached, cache_key
+
+async def store_rewrite(cache_key: str, rewrite: str, use_cache: bool):
+    """Cache a successful AI rewrite; a cache error only skips the write"""
+    if not use_cache or not rewrite:
+        return
+    try:
+        cache = await run_in_thread(get_rewrite_cache)
+        if cache is not None:
+            await run_in_thread(cache.set, cache_key, rewrite)
+    except Exception as e:
+        print(f"Rewrite cache store failed: {e!r}")
+
+async def generate_improved_resume_with_ai(resume_text: str, job_desc: str, missing_skills: List[str], 
+                                   matching_skills: List[str], use_cache: bool = True,
+                                   job_embedding: Optional[np.ndarray] = None) -> str:
+    """Generate AI-powered resume rewrite using OpenAI GPT"""
+    
+    # Identical resume/job pairs are served from the rewrite cache
+    ai_resume, cache_key = await lookup_rewrite(resume_text, job_desc, use_cache)
+    if ai_resume is not None:
+        return ai_resume + build_optimization_notes(missing_skills, matching_skills)
+    
+    try:
+        if not llm.is_configured():
+            raise RuntimeError("OPENAI_API_KEY is not set")
         
+        messages = await build_budgeted_rewrite_messages(resume_text, job_desc, missing_skills, matching_skills,
+                                                         job_embedding)
+        # Call OpenAI API through the shared, concurrency-capped client
+        with timed("llm"):
+            ai_resume = await llm.chat_completion(
+                messages=messages,
+                max_tokens=2000,
+                temperature=0.7
+            )
     except Exception as e:
-        print(f"AI resume generation failed: {e}")
+        print(f"AI resume generation failed: {e!r}")
+        record_fallback(e)
         # Fallback to original method if AI fails
-        return generate_improved_resume_fallback(resume_text, job_desc, missing_skills, matching_skills)
+        with timed("fallback"):
+            return generate_improved_resume_fallback(resume_text, job_desc, missing_skills, matching_skills)
+    
+    await store_rewrite(cache_key, ai_resume, use_cache)
+    # Add optimization suggestions at the end
+    return ai_resume + build_optimization_notes(missing_skills, matching_skills)
 
 def generate_improved_resume_fallback(resume_text: str, job_desc: str, missing_skills: List[str], 
                                     matching_skills: List[str]) -> str:
     """Fallback resume generation if AI fails"""
     
-    # Extract contact information
-    contact_info = extract_contact_info(resume_text)
-    name = contact_info['name'] or extract_name_from_text(resume_text)
-    email = contact_info['email']
-    phone = contact_info['phone']
-    
-    # Extract experience and education
-    experience_entries = extract_experience_entries(resume_text)
-    education_entries = extract_education_entries(resume_text)
-    actual_skills = extract_actual_skills_from_text(resume_text)
+    # Parse contact details, experience, education and skills in one pass
+    doc = parse_resume(resume_text)
+    name = doc.name
+    email = doc.contacts['email']
+    phone = doc.contacts['phone']
+    experience_entries = doc.experience
+    education_entries = doc.education
+    actual_skills = doc.skills
     
     # Generate improved resume
     improved_resume = []
@@ -559,25 +456,14 @@ def generate_improved_resume(resume_text: str, job_desc: str, missing_skills: Li
                            matching_skills: List[str]) -> str:
     """Generate a completely rewritten and improved version of the resume"""
     
-    # Extract contact information
-    contact_info = extract_contact_info(resume_text)
-    
-    # Parse resume into structured sections
-    lines = resume_text.split('\n')
-    
-    # Extract actual content from resume
-    name = contact_info['name'] or extract_name_from_text(resume_text)
-    email = contact_info['email']
-    phone = contact_info['phone']
-    
-    # Extract experience entries
-    experience_entries = extract_experience_entries(resume_text)
-    
-    # Extract education entries  
-    education_entries = extract_education_entries(resume_text)
-    
-    # Extract actual skills from resume text
-    actual_skills = extract_actual_skills_from_text(resume_text)
+    # Parse resume into structured sections, contacts and entries in one pass
+    doc = parse_resume(resume_text)
+    name = doc.name
+    email = doc.contacts['email']
+    phone = doc.contacts['phone']
+    experience_entries = doc.experience
+    education_entries = doc.education
+    actual_skills = doc.skills
     
     # Generate improved resume
     improved_resume = []
@@ -667,200 +553,900 @@ def generate_improved_resume(resume_text: str, job_desc: str, missing_skills: Li
     return '\n'.join(improved_resume)
 
 def extract_text_from_pdf(file):
-    """Extract text from PDF with enhanced error handling and multiple methods"""
+    """Extract text from a PDF (bytes or a binary file), splitting long documents across the process pool"""
     try:
-        # Method 1: Try PyPDF2 with strict=False
-        try:
-            reader = PyPDF2.PdfReader(io.BytesIO(file), strict=False)
-            text = ""
-            for page in reader.pages:
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                except Exception:
-                    continue
-            
-            if text.strip():
-                return text.strip()
-        except Exception:
-            pass
-        
-        # Method 2: Try with different PyPDF2 settings
-        try:
-            file_obj = io.BytesIO(file)
-            reader = PyPDF2.PdfReader(file_obj)
-            text = ""
-            for i, page in enumerate(reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                except Exception:
-                    # Skip problematic pages
-                    continue
-            
-            if text.strip():
-                return text.strip()
-        except Exception:
-            pass
-        
-        # If all methods fail, provide helpful error message
-        raise ValueError("Unable to extract text from this PDF. The file may be corrupted, password-protected, or contain only images. Please try a different PDF or convert it to text format.")
-        
+        # A single worker cannot beat extracting in this thread
+        executor = get_process_pool() if SPACY_PROCESSES > 1 else None
+        return extract_text(file, executor=executor)
+    except PageLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except PDFExtractionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         if "EOF marker not found" in str(e):
             raise HTTPException(
                 status_code=400, 
                 detail="PDF file appears to be corrupted or incomplete. Please try re-saving or re-exporting your PDF and upload again."
             )
-        elif "password" in str(e).lower():
-            raise HTTPException(
-                status_code=400, 
-                detail="This PDF is password-protected. Please remove the password and try again."
-            )
         else:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Error processing PDF: {str(e)}. Please try a different PDF file or paste your resume text directly."
             )
 
+async def analyze_job(job_desc: str) -> JobAnalysis:
+    """Run spaCy and the embedding model over a job description once and store it"""
+    job_id = make_job_id(job_desc)
+    job = await run_in_thread(job_store.get, job_id)
+    record_cache_lookup("job", job is not None)
+    if job is not None:
+        return job
+
+    analysis, embeddings = await asyncio.gather(
+        timed_call("job_skills", run_in_process(analyze_job_description, job_desc)),
+        timed_call("job_embedding", embedding_batcher.encode([job_desc])),
+    )
+    job = JobAnalysis(
+        job_id=job_id,
+        job_desc=job_desc,
+        skills=analysis["skills"],
+        features={"entities": analysis["entities"], "noun_chunks": analysis["noun_chunks"]},
+        embedding=normalize(embeddings[0]),
+    )
+    await run_in_thread(job_store.add, job)
+    return job
+
+async def resolve_job(job_desc: Optional[str], job_id: Optional[str]) -> JobAnalysis:
+    """Look up a registered job by id, or analyze an inline job description"""
+    if job_id:
+        job = await run_in_thread(job_store.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired job_id. Register the job description again via POST /jobs")
+        return job
+
+    if not job_desc or not job_desc.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+    return await analyze_job(job_desc)
+
+def parse_fields_param(fields: Optional[str]) -> Optional[List[List[str]]]:
+    """Parse a fields= projection, rejecting a malformed one with a 400"""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e}. Use comma-separated keys, e.g. similarity_score,analysis.skill_match_percentage")
+
+def compare_skills(resume_skills: List[str], job_skills: List[str]):
+    """Split the job's skills into those missing from and matching the resume"""
+    resume_skills_lower = {rs.lower() for rs in resume_skills}
+    missing_skills = [skill for skill in job_skills if skill.lower() not in resume_skills_lower]
+    matching_skills = [skill for skill in job_skills if skill.lower() in resume_skills_lower]
+    return missing_skills, matching_skills
+
+def skill_match_percentage(matching_skills: List[str], job_skills: List[str]) -> float:
+    return (len(matching_skills) / len(job_skills) * 100) if job_skills else 0
+
+def build_recommendations(similarity: float, missing_skills: List[str]) -> List[str]:
+    """Turn the similarity score and skill gaps into recommendations"""
+    recommendations = []
+    if similarity < 0.7:
+        recommendations.append("Consider adding more relevant keywords from the job description")
+        recommendations.append("Highlight experiences that match the job requirements")
+    if missing_skills:
+        recommendations.append(f"Consider adding these skills: {', '.join(missing_skills[:5])}")
+    if similarity >= 0.85:
+        recommendations.append("Excellent match! Your resume aligns well with the job requirements")
+    return recommendations
+
+async def analyze_resume(resume_text: str) -> ResumeAnalysis:
+    """Extract skills and the normalized embedding of a resume concurrently"""
+    resume_skills, embeddings = await asyncio.gather(
+        timed_call("resume_skills", run_in_process(extract_skills, resume_text)),
+        timed_call("resume_embedding", embedding_batcher.encode([resume_text])),
+    )
+    return ResumeAnalysis(resume_text, resume_skills, normalize(embeddings[0]))
+
+async def analyze_section_texts(texts: List[str]):
+    """Skills and embeddings of resume sections, one batched pass each"""
+    return await asyncio.gather(
+        timed_call("resume_skills", run_in_process(extract_skills_batch, texts)),
+        timed_call("resume_embedding", embedding_batcher.encode(texts)),
+    )
+
+async def analyze_resume_incrementally(resume_text: str) -> Tuple[ResumeAnalysis, Dict[str, int]]:
+    """Analyze only the sections not seen before and recombine the resume from all of them"""
+    resume, counts = await analyze_incrementally(resume_text, section_cache, analyze_section_texts, EMBEDDING_MODEL_ID)
+    for hit in [True] * counts["reused"] + [False] * counts["analyzed"]:
+        record_cache_lookup("section", hit)
+    return resume, counts
+
+async def analyze_resume_pdf(upload: SpooledUpload) -> ResumeAnalysis:
+    """Extract and analyze a spooled PDF resume, reusing the result for repeat uploads of the same file"""
+    key = make_upload_key(upload.sha256, EMBEDDING_MODEL_ID)
+    cached = await run_in_thread(upload_cache.get, key)
+    record_cache_lookup("upload", cached is not None)
+    if cached is not None:
+        return cached
+    
+    resume_text = await timed_call("pdf_extraction", run_in_thread(extract_text_from_pdf, upload.open()))
+    resume = await analyze_resume(resume_text)
+    await run_in_thread(upload_cache.set, key, resume)
+    return resume
+
+def similarity_score(resume: ResumeAnalysis, job: JobAnalysis) -> float:
+    # Both embeddings are normalized, so cosine similarity is a dot product
+    with timed("similarity"):
+        return float(np.dot(resume.embedding, job.embedding))
+
+def build_score(resume: ResumeAnalysis, job: JobAnalysis, similarity: float, missing_skills: List[str],
+                matching_skills: List[str]) -> Dict:
+    """Assemble the analysis response from the similarity and the skill comparison"""
+    resume_text, resume_skills = resume.text, resume.skills
+    job_skills = job.skills
+    
+    # Generate recommendations
+    recommendations = build_recommendations(similarity, missing_skills)
+    
+    return {
+        "similarity_score": similarity,
+        "resume_text": resume_text[:1000] + "..." if len(resume_text) > 1000 else resume_text,
+        "job_desc": job.job_desc,
+        "job_id": job.job_id,
+        "resume_skills": resume_skills,
+        "job_skills": job_skills,
+        "missing_skills": missing_skills,
+        "matching_skills": matching_skills,
+        "recommendations": recommendations,
+        "analysis": {
+            "total_resume_skills": len(resume_skills),
+            "total_job_skills": len(job_skills),
+            "skill_match_percentage": skill_match_percentage(matching_skills, job_skills)
+        }
+    }
+
+async def score_resume(resume: ResumeAnalysis, job: JobAnalysis) -> Dict:
+    """Score an analyzed resume against an analyzed job: skills, similarity and recommendations"""
+    missing_skills, matching_skills = compare_skills(resume.skills, job.skills)
+    return build_score(resume, job, similarity_score(resume, job), missing_skills, matching_skills)
+
+# The tailoring pipeline shared by /tailor-resume and /tailor-resume-text. Resume and job
+# analysis overlap, skills and embedding are independent, and the LLM rewrite starts as soon
+# as the skill comparison is ready instead of waiting for the embeddings.
+tailoring_pipeline = AnalysisPipeline()
+
+@tailoring_pipeline.stage("job")
+async def job_stage(run: PipelineRun) -> JobAnalysis:
+    return await resolve_job(run.inputs["job_desc"], run.inputs["job_id"])
+
+@tailoring_pipeline.stage("cached_resume")
+async def cached_resume_stage(run: PipelineRun) -> Optional[ResumeAnalysis]:
+    """A previous analysis of the same PDF upload, if any"""
+    upload = run.inputs["resume_pdf"]
+    if upload is None:
+        return None
+    cached = await run_in_thread(upload_cache.get, make_upload_key(upload.sha256, EMBEDDING_MODEL_ID))
+    record_cache_lookup("upload", cached is not None)
+    return cached
+
+@tailoring_pipeline.stage("resume_text", after=("cached_resume",))
+async def resume_text_stage(run: PipelineRun) -> str:
+    if run["cached_resume"] is not None:
+        return run["cached_resume"].text
+    if run.inputs["resume_pdf"] is None:
+        return run.inputs["resume_text"]
+    return await timed_call("pdf_extraction", run_in_thread(extract_text_from_pdf, run.inputs["resume_pdf"].open()))
+
+@tailoring_pipeline.stage("resume_sections", after=("resume_text",))
+async def resume_sections_stage(run: PipelineRun) -> Optional[Tuple[ResumeAnalysis, Dict[str, int]]]:
+    """In incremental mode, the resume recombined from its (mostly cached) sections"""
+    if not run.inputs["incremental"] or run["cached_resume"] is not None:
+        return None
+    return await analyze_resume_incrementally(run["resume_text"])
+
+@tailoring_pipeline.stage("resume_skills", after=("resume_text", "resume_sections"))
+async def resume_skills_stage(run: PipelineRun) -> List[str]:
+    if run["cached_resume"] is not None:
+        return run["cached_resume"].skills
+    if run["resume_sections"] is not None:
+        return run["resume_sections"][0].skills
+    return await timed_call("resume_skills", run_in_process(extract_skills, run["resume_text"]))
+
+@tailoring_pipeline.stage("resume_embedding", after=("resume_text", "resume_sections"))
+async def resume_embedding_stage(run: PipelineRun) -> np.ndarray:
+    if run["cached_resume"] is not None:
+        return run["cached_resume"].embedding
+    if run["resume_sections"] is not None:
+        return run["resume_sections"][0].embedding
+    embeddings = await timed_call("resume_embedding", embedding_batcher.encode([run["resume_text"]]))
+    return normalize(embeddings[0])
+
+@tailoring_pipeline.stage("store_resume", after=("resume_skills", "resume_embedding"))
+async def store_resume_stage(run: PipelineRun) -> ResumeAnalysis:
+    resume = ResumeAnalysis(run["resume_text"], run["resume_skills"], run["resume_embedding"])
+    upload = run.inputs["resume_pdf"]
+    if upload is not None and run["cached_resume"] is None:
+        await run_in_thread(upload_cache.set, make_upload_key(upload.sha256, EMBEDDING_MODEL_ID), resume)
+    return resume
+
+@tailoring_pipeline.stage("skill_match", after=("resume_skills", "job"))
+async def skill_match_stage(run: PipelineRun):
+    return compare_skills(run["resume_skills"], run["job"].skills)
+
+@tailoring_pipeline.stage("rewrite", after=("skill_match",))
+async def rewrite_stage(run: PipelineRun) -> str:
+    missing_skills, matching_skills = run["skill_match"]
+    return await generate_improved_resume_with_ai(
+        run["resume_text"], run["job"].job_desc, missing_skills, matching_skills, run.inputs["use_cache"],
+        run["job"].embedding
+    )
+
+@tailoring_pipeline.stage("similarity", after=("store_resume", "job"))
+async def similarity_stage(run: PipelineRun) -> float:
+    return similarity_score(run["store_resume"], run["job"])
+
+async def run_tailoring_pipeline(job_desc: Optional[str], job_id: Optional[str], resume_text: Optional[str] = None,
+                                 resume_pdf: Optional[SpooledUpload] = None, use_cache: bool = True,
+                                 incremental: bool = False) -> Dict:
+    """Analyze a resume (text or spooled PDF) against a job, rewrite it, and report the critical path"""
+    run = await tailoring_pipeline.run(job_desc=job_desc, job_id=job_id, resume_text=resume_text,
+                                       resume_pdf=resume_pdf, use_cache=use_cache, incremental=incremental)
+    missing_skills, matching_skills = run["skill_match"]
+    result = build_score(run["store_resume"], run["job"], run["similarity"], missing_skills, matching_skills)
+    result["improved_resume"] = run["rewrite"]
+    if run["resume_sections"] is not None:
+        result["sections"] = run["resume_sections"][1]
+    result["pipeline"] = run.report(tailoring_pipeline.dependencies)
+    return result
+
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_tailoring_events(resume_text: Optional[str], resume_pdf: Optional[SpooledUpload], job: JobAnalysis,
+                                  use_cache: bool = True, fields: Optional[List[List[str]]] = None,
+                                  compact: bool = False, incremental: bool = False):
+    """Yield the analysis first, then the rewritten resume token by token, then the notes"""
+    try:
+        if resume_text is None:
+            try:
+                resume = await analyze_resume_pdf(resume_pdf)
+            finally:
+                resume_pdf.close()
+        elif incremental:
+            resume, _ = await analyze_resume_incrementally(resume_text)
+        else:
+            resume = await analyze_resume(resume_text)
+        resume_text = resume.text
+        result = await score_resume(resume, job)
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else f"Error processing resume: {str(e)}"
+        yield sse_event("error", {"detail": detail})
+        return
+    
+    yield sse_event("analysis", project(result, fields, compact))
+    
+    missing_skills, matching_skills = result["missing_skills"], result["matching_skills"]
+    streamed_any = False
+    # A cached rewrite is sent as a single token event
+    cached, cache_key = await lookup_rewrite(resume_text, job.job_desc, use_cache)
+    try:
+        if cached is not None:
+            yield sse_event("token", {"text": cached, "cached": True})
+        else:
+            if not llm.is_configured():
+                raise RuntimeError("OPENAI_API_KEY is not set")
+            
+            messages = await build_budgeted_rewrite_messages(resume_text, job.job_desc, missing_skills, matching_skills,
+                                                             job.embedding)
+            deltas = []
+            # Timed from the request to the last token, including time spent yielding to the client
+            with timed("llm"):
+                async for delta in llm.stream_chat_completion(messages, max_tokens=2000, temperature=0.7):
+                    streamed_any = True
+                    deltas.append(delta)
+                    yield sse_event("token", {"text": delta})
+            await store_rewrite(cache_key, "".join(deltas).strip(), use_cache)
+        yield sse_event("notes", {"text": build_optimization_notes(missing_skills, matching_skills)})
+    except Exception as e:
+        print(f"AI resume streaming failed: {e!r}")
+        record_fallback(e)
+        # Tokens already sent cannot be taken back, so the client is told to replace them
+        with timed("fallback"):
+            fallback = generate_improved_resume_fallback(resume_text, job.job_desc, missing_skills, matching_skills)
+        yield sse_event("fallback", {"text": fallback, "replaces_tokens": streamed_any})
+    
+    yield sse_event("done", {})
+
+def sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/jobs")
+async def register_job(job_desc: str = Form(...)):
+    """Analyze a job description once and return a job_id for the tailoring endpoints"""
+    
+    if not job_desc.strip():
+        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+    
+    try:
+        job = await analyze_job(job_desc)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing job description: {str(e)}")
+    
+    return {**job.summary(), "expires_in": job_store.ttl}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return the stored analysis of a registered job description"""
+    job = await run_in_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job_id")
+    return job.summary()
+
 @app.post("/tailor-resume")
 async def tailor_resume(
     resume: UploadFile = File(...),
-    job_desc: str = Form(...)
+    job_desc: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    use_cache: bool = Form(True),
+    fields: Optional[str] = Form(None),
+    compact: bool = Form(False),
+    incremental: bool = Form(False)
 ):
-    """Analyze PDF resume against job description and provide tailoring suggestions"""
+    """Analyze PDF resume against a job description (inline or by job_id) and provide tailoring suggestions"""
     
     # Validate inputs
     if not resume.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
-    
-    if not job_desc.strip():
-        raise HTTPException(status_code=400, detail="Job description cannot be empty")
+    field_paths = parse_fields_param(fields)
     
     try:
-        # Extract text from PDF resume
-        resume_bytes = await resume.read()
-        resume_text = extract_text_from_pdf(resume_bytes)
-        
-        # Extract skills from resume and job description
-        resume_skills = extract_skills(resume_text)
-        job_skills = extract_skills(job_desc)
-        
-        # Find missing and matching skills
-        missing_skills = [skill for skill in job_skills if skill.lower() not in [rs.lower() for rs in resume_skills]]
-        matching_skills = [skill for skill in job_skills if skill.lower() in [rs.lower() for rs in resume_skills]]
-        
-        # Calculate similarity
-        embeddings = model.encode([resume_text, job_desc])
-        similarity = util.cos_sim(embeddings[0], embeddings[1]).item()
-        
-        # Generate recommendations
-        recommendations = []
-        if similarity < 0.7:
-            recommendations.append("Consider adding more relevant keywords from the job description")
-            recommendations.append("Highlight experiences that match the job requirements")
-        if missing_skills:
-            recommendations.append(f"Consider adding these skills: {', '.join(missing_skills[:5])}")
-        if similarity >= 0.85:
-            recommendations.append("Excellent match! Your resume aligns well with the job requirements")
-        
-        # Generate AI-powered improved resume
-        improved_resume = generate_improved_resume_with_ai(resume_text, job_desc, missing_skills, matching_skills)
-        
-        # Return comprehensive results
-        return {
-            "similarity_score": similarity,
-            "resume_text": resume_text[:1000] + "..." if len(resume_text) > 1000 else resume_text,
-            "job_desc": job_desc,
-            "resume_skills": resume_skills,
-            "job_skills": job_skills,
-            "missing_skills": missing_skills,
-            "matching_skills": matching_skills,
-            "recommendations": recommendations,
-            "improved_resume": improved_resume,
-            "analysis": {
-                "total_resume_skills": len(resume_skills),
-                "total_job_skills": len(job_skills),
-                "skill_match_percentage": (len(matching_skills) / len(job_skills) * 100) if job_skills else 0
-            }
-        }
+        # The job is analyzed while the PDF is extracted (or reused from a previous upload of the same file)
+        spooled = await run_in_thread(spool_upload, resume)
+        try:
+            result = await run_tailoring_pipeline(job_desc, job_id, resume_pdf=spooled, use_cache=use_cache,
+                                                  incremental=incremental)
+            return json_response(project(result, field_paths, compact))
+        finally:
+            spooled.close()
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
 @app.post("/tailor-resume-text")
 async def tailor_resume_text(
     resume_text: str = Form(...),
-    job_desc: str = Form(...)
+    job_desc: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    use_cache: bool = Form(True),
+    fields: Optional[str] = Form(None),
+    compact: bool = Form(False),
+    incremental: bool = Form(False)
 ):
-    """Analyze resume text against job description and provide tailoring suggestions"""
+    """Analyze resume text against a job description (inline or by job_id) and provide tailoring suggestions"""
     
     # Validate inputs
     if not resume_text.strip():
         raise HTTPException(status_code=400, detail="Resume text cannot be empty")
+    field_paths = parse_fields_param(fields)
     
-    if not job_desc.strip():
+    try:
+        result = await run_tailoring_pipeline(job_desc, job_id, resume_text=resume_text, use_cache=use_cache,
+                                              incremental=incremental)
+        return json_response(project(result, field_paths, compact))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+
+@app.post("/tailor-resume-stream")
+async def tailor_resume_stream(
+    resume: UploadFile = File(...),
+    job_desc: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    use_cache: bool = Form(True),
+    fields: Optional[str] = Form(None),
+    compact: bool = Form(False)
+):
+    """Like /tailor-resume, but streams the analysis and the rewritten resume as Server-Sent Events"""
+    
+    if not resume.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    field_paths = parse_fields_param(fields)
+    
+    job = await resolve_job(job_desc, job_id)
+    
+    # The upload is closed once this handler returns, so spool it before streaming
+    spooled = await run_in_thread(spool_upload, resume)
+    return sse_response(stream_tailoring_events(None, spooled, job, use_cache, field_paths, compact))
+
+async def run_queued_task(payload: Dict, resume_pdf: Optional[bytes]) -> Dict:
+    """Task queue handler: run the tailoring pipeline for a queued /tasks submission"""
+    upload = SpooledUpload(io.BytesIO(resume_pdf), len(resume_pdf), payload["sha256"]) if resume_pdf is not None else None
+    result = await run_tailoring_pipeline(payload["job_desc"], None, resume_text=payload["resume_text"],
+                                          resume_pdf=upload, use_cache=payload["use_cache"])
+    # Tasks queued before fields/compact existed have neither
+    return project(result, parse_fields(payload.get("fields")), payload.get("compact", False))
+
+async def enqueue_tailoring(kind: str, job_desc: Optional[str], job_id: Optional[str], resume_text: Optional[str],
+                            resume_pdf: Optional[SpooledUpload], use_cache: bool, callback_url: Optional[str],
+                            fields: Optional[str] = None, compact: bool = False) -> Dict:
+    """Validate a tailoring request and queue it, returning the task id to poll"""
+    parse_fields_param(fields)
+    if callback_url:
+        try:
+            await run_in_thread(check_callback_url, callback_url)
+        except CallbackURLError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Workers have their own job store, so a registered job is passed by its description
+    if job_id:
+        job_desc = (await resolve_job(None, job_id)).job_desc
+    elif not job_desc or not job_desc.strip():
         raise HTTPException(status_code=400, detail="Job description cannot be empty")
     
+    payload = {"job_desc": job_desc, "resume_text": resume_text, "use_cache": use_cache,
+               "sha256": resume_pdf.sha256 if resume_pdf is not None else None, "fields": fields, "compact": compact}
+    pdf_bytes = await run_in_thread(resume_pdf.open().read) if resume_pdf is not None else None
     try:
-        # Extract skills from resume and job description
-        resume_skills = extract_skills(resume_text)
-        job_skills = extract_skills(job_desc)
-        
-        # Find missing and matching skills
-        missing_skills = [skill for skill in job_skills if skill.lower() not in [rs.lower() for rs in resume_skills]]
-        matching_skills = [skill for skill in job_skills if skill.lower() in [rs.lower() for rs in resume_skills]]
-        
-        # Calculate similarity
-        embeddings = model.encode([resume_text, job_desc])
-        similarity = util.cos_sim(embeddings[0], embeddings[1]).item()
-        
-        # Generate recommendations
-        recommendations = []
-        if similarity < 0.7:
-            recommendations.append("Consider adding more relevant keywords from the job description")
-            recommendations.append("Highlight experiences that match the job requirements")
-        if missing_skills:
-            recommendations.append(f"Consider adding these skills: {', '.join(missing_skills[:5])}")
-        if similarity >= 0.85:
-            recommendations.append("Excellent match! Your resume aligns well with the job requirements")
-        
-        # Generate AI-powered improved resume
-        improved_resume = generate_improved_resume_with_ai(resume_text, job_desc, missing_skills, matching_skills)
-        
-        # Return comprehensive results
-        return {
-            "similarity_score": similarity,
-            "resume_text": resume_text[:1000] + "..." if len(resume_text) > 1000 else resume_text,
-            "job_desc": job_desc,
+        task_id = await run_in_thread(get_task_store().submit, kind, payload, pdf_bytes, callback_url)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Task queue is full: {e}. Try again later")
+    ensure_task_workers()
+    return {"task_id": task_id, "status": "queued", "status_url": f"/tasks/{task_id}"}
+
+@app.post("/tasks/tailor-resume", status_code=202)
+async def submit_tailor_resume_task(
+    resume: UploadFile = File(...),
+    job_desc: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    use_cache: bool = Form(True),
+    callback_url: Optional[str] = Form(None),
+    fields: Optional[str] = Form(None),
+    compact: bool = Form(False)
+):
+    """Queue /tailor-resume work and return a task id at once; poll GET /tasks/{task_id} or wait for the callback"""
+    
+    if not resume.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    
+    spooled = await run_in_thread(spool_upload, resume)
+    try:
+        return await enqueue_tailoring("tailor-resume", job_desc, job_id, None, spooled, use_cache, callback_url,
+                                       fields, compact)
+    finally:
+        spooled.close()
+
+@app.post("/tasks/tailor-resume-text", status_code=202)
+async def submit_tailor_resume_text_task(
+    resume_text: str = Form(...),
+    job_desc: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    use_cache: bool = Form(True),
+    callback_url: Optional[str] = Form(None),
+    fields: Optional[str] = Form(None),
+    compact: bool = Form(False)
+):
+    """Queue /tailor-resume-text work and return a task id at once; poll GET /tasks/{task_id} or wait for the callback"""
+    
+    if not resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text cannot be empty")
+    
+    return await enqueue_tailoring("tailor-resume-text", job_desc, job_id, resume_text, None, use_cache, callback_url,
+                                   fields, compact)
+
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: str, fields: Optional[str] = None, compact: bool = False):
+    """Status of a queued tailoring task, with the same result as the synchronous endpoint once it succeeds"""
+    field_paths = parse_fields_param(fields)
+    task = await run_in_thread(get_task_store().get, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired task_id")
+    if "result" in task:
+        task["result"] = project(task["result"], field_paths, compact)
+    return json_response(task)
+
+@app.post("/tailor-resume-text-stream")
+async def tailor_resume_text_stream(
+    resume_text: str = Form(...),
+    job_desc: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    use_cache: bool = Form(True),
+    fields: Optional[str] = Form(None),
+    compact: bool = Form(False),
+    incremental: bool = Form(False)
+):
+    """Like /tailor-resume-text, but streams the analysis and the rewritten resume as Server-Sent Events"""
+    
+    if not resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text cannot be empty")
+    field_paths = parse_fields_param(fields)
+    
+    job = await resolve_job(job_desc, job_id)
+    return sse_response(stream_tailoring_events(resume_text, None, job, use_cache, field_paths, compact, incremental))
+
+async def rank_resume_chunk(chunk: List[Dict], job: JobAnalysis, include_rewrite: bool,
+                            use_cache: bool = True) -> List[Dict]:
+    """Score a chunk of resumes with one batched spaCy pass and one batched encode"""
+    
+    # Extract text from PDFs concurrently; plain-text resumes pass straight through
+    async def resume_text_for(item: Dict) -> str:
+        if item["text"] is not None:
+            return item["text"]
+        try:
+            return await timed_call("pdf_extraction", run_in_thread(extract_text_from_pdf, item["pdf"].open()))
+        finally:
+            item["pdf"].close()
+    
+    texts = await asyncio.gather(*(resume_text_for(item) for item in chunk), return_exceptions=True)
+    
+    results = []
+    ok_items, ok_texts = [], []
+    for item, text in zip(chunk, texts):
+        if isinstance(text, Exception):
+            detail = text.detail if isinstance(text, HTTPException) else str(text)
+            results.append({"type": "error", "id": item["id"], "filename": item["filename"], "detail": detail})
+        elif not text.strip():
+            results.append({"type": "error", "id": item["id"], "filename": item["filename"], "detail": "Resume text is empty"})
+        else:
+            ok_items.append(item)
+            ok_texts.append(text)
+    if not ok_items:
+        return results
+    
+    # Batched skill extraction and embedding for the whole chunk
+    skills_per_resume, embeddings = await asyncio.gather(
+        timed_call("resume_skills", run_in_process(extract_skills_batch, ok_texts)),
+        timed_call("resume_embedding", embedding_batcher.encode(ok_texts)),
+    )
+    with timed("similarity"):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1)
+        similarities = (embeddings @ job.embedding) / np.where(norms == 0, 1, norms)
+    
+    scored = []
+    for item, text, resume_skills, similarity in zip(ok_items, ok_texts, skills_per_resume, similarities):
+        missing_skills, matching_skills = compare_skills(resume_skills, job.skills)
+        scored.append({
+            "type": "result",
+            "id": item["id"],
+            "filename": item["filename"],
+            "similarity_score": float(similarity),
             "resume_skills": resume_skills,
-            "job_skills": job_skills,
             "missing_skills": missing_skills,
             "matching_skills": matching_skills,
-            "recommendations": recommendations,
-            "improved_resume": improved_resume,
+            "recommendations": build_recommendations(float(similarity), missing_skills),
             "analysis": {
                 "total_resume_skills": len(resume_skills),
-                "total_job_skills": len(job_skills),
-                "skill_match_percentage": (len(matching_skills) / len(job_skills) * 100) if job_skills else 0
+                "total_job_skills": len(job.skills),
+                "skill_match_percentage": skill_match_percentage(matching_skills, job.skills)
             }
+        })
+    
+    # The LLM rewrite is opt-in for bulk runs
+    if include_rewrite:
+        rewrites = await asyncio.gather(*(
+            generate_improved_resume_with_ai(text, job.job_desc, result["missing_skills"], result["matching_skills"],
+                                             use_cache, job.embedding)
+            for text, result in zip(ok_texts, scored)
+        ))
+        for result, improved_resume in zip(scored, rewrites):
+            result["improved_resume"] = improved_resume
+    
+    return results + scored
+
+def ranking_key(result: Dict, rank_by: str):
+    """Sort key for ranked results, built from similarity_score and skill match"""
+    similarity = result["similarity_score"]
+    skill_match = result["analysis"]["skill_match_percentage"]
+    if rank_by == "skills":
+        return (skill_match, similarity)
+    return (similarity, skill_match)
+
+async def stream_ranked_results(items: List[Dict], job: JobAnalysis, include_rewrite: bool, rank_by: str,
+                                use_cache: bool = True, fields: Optional[List[List[str]]] = None,
+                                compact: bool = False):
+    """Yield NDJSON lines per chunk as it completes, then the final ranking"""
+    semaphore = asyncio.Semaphore(BULK_MAX_CHUNKS_IN_FLIGHT)
+    
+    async def run_chunk(chunk: List[Dict]) -> List[Dict]:
+        async with semaphore:
+            try:
+                return await rank_resume_chunk(chunk, job, include_rewrite, use_cache)
+            except Exception as e:
+                return [{"type": "error", "id": item["id"], "filename": item["filename"], "detail": str(e)} for item in chunk]
+    
+    chunks = [items[i:i + BULK_CHUNK_SIZE] for i in range(0, len(items), BULK_CHUNK_SIZE)]
+    tasks = [asyncio.create_task(run_chunk(chunk)) for chunk in chunks]
+    
+    scored = []
+    try:
+        for finished in asyncio.as_completed(tasks):
+            for result in await finished:
+                if result["type"] == "result":
+                    scored.append(result)
+                    # Ranked on the full result; the projection only shapes the line sent
+                    result = project(result, fields, compact, keep=("type", "id", "filename"))
+                yield json_line(result)
+    finally:
+        # Stop outstanding work if the client disconnects mid-stream
+        for task in tasks:
+            task.cancel()
+        for item in items:
+            if item["pdf"] is not None:
+                item["pdf"].close()
+    
+    scored.sort(key=lambda result: ranking_key(result, rank_by), reverse=True)
+    ranking = [
+        {
+            "rank": rank,
+            "id": result["id"],
+            "filename": result["filename"],
+            "similarity_score": result["similarity_score"],
+            "skill_match_percentage": result["analysis"]["skill_match_percentage"]
         }
+        for rank, result in enumerate(scored, start=1)
+    ]
+    yield json_line({
+        "type": "ranking",
+        "job_id": job.job_id,
+        "rank_by": rank_by,
+        "total": len(items),
+        "scored": len(scored),
+        "ranking": ranking
+    })
+
+@app.post("/rank-resumes")
+async def rank_resumes(
+    resumes: Optional[List[UploadFile]] = File(None),
+    resume_texts: Optional[List[str]] = Form(None),
+    job_desc: Optional[str] = Form(None),
+    job_id: Optional[str] = Form(None),
+    include_rewrite: bool = Form(False),
+    rank_by: str = Form("similarity"),
+    use_cache: bool = Form(True),
+    fields: Optional[str] = Form(None),
+    compact: bool = Form(False)
+):
+    """Rank many resumes (PDFs and/or text) against one job, streaming NDJSON results"""
+    
+    resumes = resumes or []
+    resume_texts = resume_texts or []
+    if not resumes and not resume_texts:
+        raise HTTPException(status_code=400, detail="Provide at least one resume file or resume text")
+    if len(resumes) + len(resume_texts) > BULK_MAX_RESUMES:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_RESUMES} resumes can be ranked per request")
+    if rank_by not in ("similarity", "skills"):
+        raise HTTPException(status_code=400, detail="rank_by must be 'similarity' or 'skills'")
+    field_paths = parse_fields_param(fields)
+    for upload in resumes:
+        if not upload.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail=f"Only PDF files are supported: {upload.filename}")
+    
+    job = await resolve_job(job_desc, job_id)
+    
+    # Uploads are closed once this handler returns, so spool them before streaming
+    items = []
+    try:
+        for upload in resumes:
+            items.append({"id": len(items), "filename": upload.filename, "pdf": await run_in_thread(spool_upload, upload),
+                          "text": None})
+    except HTTPException:
+        for item in items:
+            item["pdf"].close()
+        raise
+    for text in resume_texts:
+        items.append({"id": len(items), "filename": None, "pdf": None, "text": text})
+    
+    return StreamingResponse(
+        stream_ranked_results(items, job, include_rewrite, rank_by, use_cache, field_paths, compact),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/job-postings")
+async def add_job_postings(
+    job_descs: List[str] = Form(...),
+    titles: Optional[List[str]] = Form(None),
+    posting_ids: Optional[List[str]] = Form(None)
+):
+    """Add job postings to the persistent index (re-adding an id replaces it)"""
+    
+    titles = titles or []
+    posting_ids = posting_ids or []
+    if any(not job_desc.strip() for job_desc in job_descs):
+        raise HTTPException(status_code=400, detail="Job descriptions cannot be empty")
+    if titles and len(titles) != len(job_descs):
+        raise HTTPException(status_code=400, detail="titles must match job_descs one-to-one")
+    if posting_ids and len(posting_ids) != len(job_descs):
+        raise HTTPException(status_code=400, detail="posting_ids must match job_descs one-to-one")
+    
+    try:
+        skills_per_job, embeddings = await asyncio.gather(
+            run_in_process(extract_skills_batch, job_descs),
+            embedding_batcher.encode(job_descs),
+        )
+        postings = [
+            {
+                "posting_id": posting_ids[i] if posting_ids else make_job_id(job_desc),
+                "title": titles[i] if titles else None,
+                "job_desc": job_desc,
+                "skills": skills_per_job[i]
+            }
+            for i, job_desc in enumerate(job_descs)
+        ]
+        index = await open_job_index()
+        await run_in_thread(index.add, postings, embeddings)
+        total = await run_in_thread(len, index)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error indexing job postings: {str(e)}")
+    
+    return {"posting_ids": [posting["posting_id"] for posting in postings], "total_postings": total}
+
+@app.delete("/job-postings/{posting_id}")
+async def delete_job_posting(posting_id: str):
+    """Remove a job posting from the index"""
+    index = await open_job_index()
+    removed = await run_in_thread(index.delete, posting_id)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Unknown posting_id")
+    return {"deleted": posting_id, "total_postings": await run_in_thread(len, index)}
+
+@app.post("/job-postings/search")
+async def search_job_postings(
+    resume: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    top_k: int = Form(10)
+):
+    """Find the indexed job postings closest to a resume, with the skill gap for each"""
+    
+    if resume is None and not (resume_text and resume_text.strip()):
+        raise HTTPException(status_code=400, detail="Provide a PDF resume or resume text")
+    if resume is not None and not resume.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    if not 1 <= top_k <= 100:
+        raise HTTPException(status_code=400, detail="top_k must be between 1 and 100")
+    
+    try:
+        if resume is not None:
+            spooled = await run_in_thread(spool_upload, resume)
+            try:
+                analyzed = await analyze_resume_pdf(spooled)
+            finally:
+                spooled.close()
+        else:
+            analyzed = await analyze_resume(resume_text)
+        resume_skills = analyzed.skills
+        
+        index = await open_job_index()
+        hits = await run_in_thread(index.search, analyzed.embedding, top_k)
+        postings = await run_in_thread(index.get, [posting_id for posting_id, _ in hits])
+        total = await run_in_thread(len, index)
         
+        results = []
+        for posting_id, similarity in hits:
+            posting = postings.get(posting_id)
+            if posting is None:
+                continue
+            missing_skills, matching_skills = compare_skills(resume_skills, posting["skills"])
+            results.append({
+                "posting_id": posting_id,
+                "title": posting["title"],
+                "similarity_score": similarity,
+                "job_skills": posting["skills"],
+                "missing_skills": missing_skills,
+                "matching_skills": matching_skills,
+                "skill_match_percentage": skill_match_percentage(matching_skills, posting["skills"])
+            })
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching job postings: {str(e)}")
+    
+    return {"resume_skills": resume_skills, "total_postings": total, "results": results}
+
+async def warm_up_models():
+    """Load every model and run a dummy batch through it before reporting ready"""
+    try:
+        started = time.perf_counter()
+        await run_in_thread(get_model)
+        await embedding_batcher.encode(["Warm-up: Python developer with AWS experience"])
+        readiness.mark_stage("embedding_model", time.perf_counter() - started)
+        
+        # One task per spaCy worker so each process loads its pipeline
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_in_process(extract_skills, "Warm-up: Python developer with AWS experience")
+            for _ in range(max(1, SPACY_PROCESSES))
+        ))
+        readiness.mark_stage("spacy", time.perf_counter() - started)
+        
+        readiness.mark_ready()
+        print(f"Models warmed up in {time.time() - readiness.started_at:.1f}s")
+    except Exception as e:
+        readiness.mark_failed(e)
+        print(f"Model warm-up failed: {e!r}")
+
+@app.on_event("startup")
+async def start_model_warm_up():
+    """Load models in the background so the server starts listening immediately"""
+    app.state.warmup_task = asyncio.create_task(warm_up_models())
+    # Resume tasks queued before a restart
+    if os.path.exists(TASK_QUEUE_PATH):
+        ensure_task_workers()
+
+@app.on_event("shutdown")
+async def shutdown_worker_pools():
+    """Release the worker pools and LLM connections when the server stops"""
+    shutdown_pools()
+    await llm.close_client()
+    if job_index is not None:
+        job_index.close()
+    if rewrite_cache is not None:
+        rewrite_cache.close()
+    upload_cache.close()
+    section_cache.close()
+    job_store.close()
+    if isinstance(task_workers, TaskWorkerPool):
+        task_workers.stop()
+    elif task_workers is not None:
+        # Let the loop requeue its claimed tasks before the store closes
+        task_workers.cancel()
+        await asyncio.gather(task_workers, return_exceptions=True)
+    if task_store is not None:
+        task_store.close()
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "AI Resume Builder API is running", "status": "healthy"}
 
+@app.get("/stats")
+async def stats():
+    """Internal batching and cache metrics"""
+    cache = get_rewrite_cache()
+    return {
+        # Under serve.py each worker answers with its own counters
+        "pid": os.getpid(),
+        "embedding_batcher": embedding_batcher.stats(),
+        "job_store": job_store.stats(),
+        "upload_cache": upload_cache.stats(),
+        "section_cache": section_cache.stats(),
+        "rewrite_cache": cache.stats() if cache is not None else None,
+        "task_queue": {
+            **(await run_in_thread(task_store.stats)),
+            "workers_alive": task_workers.alive() if isinstance(task_workers, TaskWorkerPool) else None
+        } if task_store is not None else None
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Per-stage latency histograms, LLM fallback and cache hit counters in Prometheus format"""
+    if task_store is not None:
+        record_queue_depth(await run_in_thread(task_store.depth))
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
+    """Liveness check; stays healthy while models are still warming up"""
     return {
         "status": "healthy",
-        "model_loaded": model is not None,
-        "nlp_loaded": nlp is not None
-    }
\ No newline at end of file
+        "ready": readiness.ready,
+        "model_loaded": is_model_loaded(),
+        "nlp_loaded": "spacy" in readiness.stages
+    }
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check; 503 until every model has run a warm-up inference"""
+    status = readiness.status()
+    if not readiness.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up" if not readiness.error else "failed", **status})
+    return {"status": "ready", **status}
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""
+Per-stage latency metrics for the tailoring pipeline.
+
+Every stage (PDF extraction, skill extraction and embedding of the
+resume and the job, similarity, the LLM call and the template fallback)
+is timed into one Prometheus histogram labelled by stage, served on
+/metrics. The same timings are collected per request through a context
+variable and returned in a Server-Timing header, so a slow response can
+be broken down from the browser's network panel. Counters track LLM
+fallbacks by reason, cache hits and misses by cache and the prompt
+tokens sent and saved by pruning, and gauges the depth of the
+submit/poll task queue.
+
+Under serve.py the workers are separate processes: with
+PROMETHEUS_MULTIPROC_DIR set, each writes its samples to files there and
+/metrics aggregates every worker's (and every exited worker's) samples.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Dict, Optional, TypeVar
+import time
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+T = TypeVar("T")
+
+STAGE_SECONDS = Histogram(
+    "resume_stage_seconds",
+    "Time spent in each stage of the tailoring pipeline",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+LLM_FALLBACKS = Counter(
+    "resume_llm_fallbacks_total",
+    "AI rewrites that fell back to the template rewrite",
+    ["reason"],
+)
+CACHE_LOOKUPS = Counter(
+    "resume_cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+LLM_PROMPT_TOKENS = Counter(
+    "resume_llm_prompt_tokens_total",
+    "Prompt tokens of AI rewrites, sent to the model and saved by pruning",
+    ["kind"],
+)
+TASK_QUEUE_DEPTH = Gauge(
+    "resume_task_queue_depth",
+    "Tailoring tasks in the submit/poll queue by status",
+    ["status"],
+    # The queue is shared, so every worker sets the same value; report the latest
+    multiprocess_mode="mostrecent",
+)
+TASK_QUEUE_OLDEST_AGE = Gauge(
+    "resume_task_queue_oldest_age_seconds",
+    "Age of the oldest task still waiting for a worker",
+    multiprocess_mode="mostrecent",
+)
+
+# Stage name -> seconds for the request being served, None outside a request
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        # Repeated stages (e.g. one per resume in a bulk run) add up
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the enclosed block as one stage, whether or not it raises"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+async def timed_call(stage: str, awaitable: Awaitable[T]) -> T:
+    """Await as one stage; use for stages run concurrently with asyncio.gather"""
+    with timed(stage):
+        return await awaitable
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_fallback(error: Exception):
+    """Count a template fallback, labelled by the exception class that caused it"""
+    LLM_FALLBACKS.labels(error.__class__.__name__).inc()
+
+
+def record_prompt_tokens(sent: int, saved: int):
+    LLM_PROMPT_TOKENS.labels("sent").inc(sent)
+    LLM_PROMPT_TOKENS.labels("saved").inc(saved)
+
+
+def record_queue_depth(depth: Dict):
+    """Refresh the queue gauges from TaskStore.depth(); called when /metrics is scraped"""
+    for status, count in depth["by_status"].items():
+        TASK_QUEUE_DEPTH.labels(status).set(count)
+    TASK_QUEUE_OLDEST_AGE.set(depth["oldest_queued_age_seconds"])
+
+
+def render_metrics():
+    """Prometheus exposition body and content type for /metrics, summed over all workers in multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that collects stage timings per request and sends them as Server-Timing.
+
+    Headers go out before a streamed body, so streaming responses only
+    report the stages finished before their first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = format_server_timing({**timings, "total": time.perf_counter() - started})
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
@@ -0,0 +1,129 @@
+"""
+Lazy model loading and readiness tracking.
+
+Nothing heavy happens at import time. The embedding model is loaded on
+first use (or by the startup warm-up task), and the readiness state only
+flips once every model has run a real inference.
+
+EMBEDDING_BACKEND selects how the embedding model runs: "torch" (the
+sentence-transformers default), "onnx" (ONNX Runtime, exported on first
+load when the model repository has no ONNX file) or "onnx-int8" (ONNX
+Runtime with dynamically int8-quantized weights). The ONNX backends need
+only the CPU.
+"""
+from typing import Dict, Optional
+import threading
+import time
+import os
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# ONNX file inside the model repository; the defaults ship with all-MiniLM-L6-v2
+EMBEDDING_ONNX_FILES = {"onnx": "onnx/model.onnx", "onnx-int8": "onnx/model_qint8_avx2.onnx"}
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "")
+# Where int8 weights are exported for models that do not publish them
+EMBEDDING_EXPORT_DIR = os.getenv("EMBEDDING_EXPORT_DIR", "models")
+# Quantization target of that export: avx2, avx512, avx512_vnni or arm64
+EMBEDDING_QUANTIZATION = os.getenv("EMBEDDING_QUANTIZATION", "avx2")
+# Intra-op threads of an ONNX Runtime session; 0 keeps its default of one per core
+# (torch follows OMP_NUM_THREADS / torch.set_num_threads instead)
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+if EMBEDDING_BACKEND not in EMBEDDING_BACKENDS:
+    raise ValueError(f"EMBEDDING_BACKEND must be one of {', '.join(EMBEDDING_BACKENDS)}")
+
+# Cached embeddings are only reused by the model and backend that produced them
+EMBEDDING_MODEL_ID = EMBEDDING_MODEL_NAME if EMBEDDING_BACKEND == "torch" else f"{EMBEDDING_MODEL_NAME}@{EMBEDDING_BACKEND}"
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def export_int8_model(name: str, quantization: str = EMBEDDING_QUANTIZATION) -> str:
+    """Export a dynamically int8-quantized ONNX copy of a model once and return its directory"""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    directory = os.path.join(EMBEDDING_EXPORT_DIR, name.replace("/", "--"))
+    if not os.path.exists(os.path.join(directory, "onnx", f"model_qint8_{quantization}.onnx")):
+        model = SentenceTransformer(name, backend="onnx", device="cpu")
+        model.save(directory)
+        export_dynamic_quantized_onnx_model(model, quantization, directory)
+    return directory
+
+
+def onnx_model_kwargs(file_name: str) -> Dict:
+    """SentenceTransformer model_kwargs for one ONNX file, limited to EMBEDDING_THREADS"""
+    model_kwargs = {"file_name": file_name}
+    if EMBEDDING_THREADS > 0:
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = EMBEDDING_THREADS
+        options.inter_op_num_threads = 1
+        model_kwargs["session_options"] = options
+    return model_kwargs
+
+
+def load_embedding_model(name: str = EMBEDDING_MODEL_NAME, backend: str = EMBEDDING_BACKEND):
+    """Load a SentenceTransformer for the given backend"""
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(name)
+    file_name = EMBEDDING_ONNX_FILE or EMBEDDING_ONNX_FILES[backend]
+    try:
+        return SentenceTransformer(name, backend="onnx", device="cpu", model_kwargs=onnx_model_kwargs(file_name))
+    except Exception as e:
+        if backend != "onnx-int8" or EMBEDDING_ONNX_FILE:
+            raise
+        print(f"{name} has no {file_name} ({e.__class__.__name__}); exporting int8 weights")
+        return SentenceTransformer(export_int8_model(name), backend="onnx", device="cpu",
+                                   model_kwargs=onnx_model_kwargs(f"onnx/model_qint8_{EMBEDDING_QUANTIZATION}.onnx"))
+
+
+def get_model():
+    """Return the embedding model for EMBEDDING_BACKEND, loading it on first use"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_embedding_model()
+    return _model
+
+
+def is_model_loaded() -> bool:
+    return _model is not None
+
+
+class Readiness:
+    """Tracks the warm-up of each model so /ready can report real state"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.ready_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.stages: Dict[str, float] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def mark_stage(self, name: str, seconds: float):
+        self.stages[name] = round(seconds, 3)
+
+    def mark_ready(self):
+        self.ready_at = time.time()
+
+    def mark_failed(self, error: Exception):
+        self.error = f"{error.__class__.__name__}: {error}"
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "warmup_seconds": round(self.ready_at - self.started_at, 3) if self.ready else None,
+            "stages": self.stages,
+            "error": self.error,
+        }
+
+
+readiness = Readiness()
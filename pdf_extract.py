@@ -0,0 +1,124 @@
+"""
+Single-parse PDF text extraction.
+
+The document is parsed once with PyPDF2 (strict=False), the first few
+pages are extracted up front so image-only (scanned) PDFs fail fast
+without walking every page, and the rest of a long document is split
+into page ranges that run in parallel on an executor. Documents over
+PDF_PAGE_LIMIT pages are rejected before any text is extracted; pages
+beyond PDF_MAX_PAGES are ignored.
+"""
+from concurrent.futures import Executor
+from typing import List, Optional
+import io
+import os
+
+import PyPDF2
+
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+# Longer documents are rejected outright (read from the page tree, before extraction)
+PDF_PAGE_LIMIT = int(os.getenv("PDF_PAGE_LIMIT", "50"))
+# Leading pages checked for a text layer before the rest are extracted
+PDF_SAMPLE_PAGES = int(os.getenv("PDF_SAMPLE_PAGES", "2"))
+# Documents with at least this many pages are split across the executor
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+
+
+class PDFExtractionError(ValueError):
+    """Raised when no text can be extracted; the message is safe to show to users"""
+
+
+class EncryptedPDFError(PDFExtractionError):
+    pass
+
+
+class ImageOnlyPDFError(PDFExtractionError):
+    pass
+
+
+class PageLimitError(PDFExtractionError):
+    pass
+
+
+def open_pdf(source) -> PyPDF2.PdfReader:
+    """Parse a PDF from bytes or a binary file object, decrypting empty-password files"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    reader = PyPDF2.PdfReader(source, strict=False)
+    if reader.is_encrypted:
+        try:
+            decrypted = reader.decrypt("")
+        except Exception:
+            decrypted = 0
+        if not decrypted:
+            raise EncryptedPDFError("This PDF is password-protected. Please remove the password and try again.")
+    return reader
+
+
+def extract_pages(reader: PyPDF2.PdfReader, start: int, stop: int) -> List[str]:
+    """Extract text from pages [start, stop); unreadable pages come back empty"""
+    texts = []
+    for number in range(start, stop):
+        try:
+            texts.append(reader.pages[number].extract_text() or "")
+        except Exception:
+            texts.append("")
+    return texts
+
+
+def extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    """Executor task: parse the PDF in the worker and extract one page range"""
+    return extract_pages(open_pdf(data), start, stop)
+
+
+def extract_text(source, executor: Optional[Executor] = None, max_pages: int = PDF_MAX_PAGES,
+                 page_limit: int = PDF_PAGE_LIMIT) -> str:
+    """Return the text of a PDF given as bytes or a binary file object.
+
+    With an executor, documents of PDF_PARALLEL_MIN_PAGES or more have
+    their remaining pages extracted in parallel page ranges; that needs
+    the raw bytes, so file objects are read into memory in that case.
+    """
+    reader = open_pdf(source)
+    if len(reader.pages) > page_limit:
+        raise PageLimitError(f"This PDF has {len(reader.pages)} pages; at most {page_limit} pages are accepted.")
+    page_count = min(len(reader.pages), max_pages)
+    if len(reader.pages) > max_pages:
+        print(f"PDF has {len(reader.pages)} pages; extracting the first {max_pages}")
+
+    sampled = min(PDF_SAMPLE_PAGES, page_count)
+    texts = extract_pages(reader, 0, sampled)
+    if page_count and not any(text.strip() for text in texts):
+        raise ImageOnlyPDFError(
+            "This PDF appears to contain only images (e.g. a scanned document). "
+            "Please upload a PDF with selectable text or paste your resume text directly."
+        )
+
+    if executor is not None and page_count >= PDF_PARALLEL_MIN_PAGES:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            data = bytes(source)
+        else:
+            source.seek(0)
+            data = source.read()
+        futures = [
+            executor.submit(extract_page_range, data, start, min(start + PDF_PAGES_PER_TASK, page_count))
+            for start in range(sampled, page_count, PDF_PAGES_PER_TASK)
+        ]
+        try:
+            texts.extend(text for future in futures for text in future.result())
+        except Exception as e:
+            # Page errors are handled inside the task, so this is the pool itself failing
+            print(f"Parallel PDF extraction failed ({e!r}), extracting serially")
+            del texts[sampled:]
+            texts.extend(extract_pages(reader, sampled, page_count))
+    else:
+        texts.extend(extract_pages(reader, sampled, page_count))
+
+    text = "\n".join(page_text for page_text in texts if page_text)
+    if not text.strip():
+        raise PDFExtractionError(
+            "Unable to extract text from this PDF. The file may be corrupted or contain only images. "
+            "Please try a different PDF or convert it to text format."
+        )
+    return text.strip()
@@ -0,0 +1,102 @@
+"""
+Dependency-driven stage runner for the tailoring pipeline.
+
+An AnalysisPipeline is a set of async stages, each naming the stages it
+needs. run() starts every stage as a task that waits only for its own
+dependencies, so independent stages (resume and job analysis, skill
+extraction and embedding) overlap and each stage begins as soon as its
+inputs exist. The returned PipelineRun records when each stage started and
+finished and derives the critical path: the chain of stages that decided
+the wall-clock latency.
+"""
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple
+import asyncio
+import time
+
+StageFunc = Callable[["PipelineRun"], Awaitable]
+
+
+def to_ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+class PipelineRun:
+    """Inputs, stage results and stage timings of one pipeline run"""
+
+    def __init__(self, inputs: Dict):
+        self.inputs = inputs
+        self.results: Dict = {}
+        self.started_at = time.perf_counter()
+        self.stage_times: Dict[str, Tuple[float, float]] = {}
+
+    def __getitem__(self, name: str):
+        return self.results[name]
+
+    def critical_path(self, dependencies: Dict[str, Sequence[str]]) -> List[str]:
+        """Walk back from the last stage to finish through whichever dependency finished last"""
+        if not self.stage_times:
+            return []
+        stage = max(self.stage_times, key=lambda name: self.stage_times[name][1])
+        path = [stage]
+        while dependencies.get(stage):
+            stage = max(dependencies[stage], key=lambda name: self.stage_times[name][1])
+            path.append(stage)
+        return path[::-1]
+
+    def report(self, dependencies: Dict[str, Sequence[str]]) -> Dict:
+        stages = {
+            name: {"start_ms": to_ms(start), "duration_ms": to_ms(end - start)}
+            for name, (start, end) in self.stage_times.items()
+        }
+        return {
+            "wall_ms": to_ms(max((end for _, end in self.stage_times.values()), default=0.0)),
+            "sum_of_stages_ms": to_ms(sum(end - start for start, end in self.stage_times.values())),
+            "critical_path": self.critical_path(dependencies),
+            "stages": stages,
+        }
+
+
+class AnalysisPipeline:
+    """Async stages wired by their dependencies; a stage may only depend on stages added before it"""
+
+    def __init__(self):
+        self.stages: Dict[str, StageFunc] = {}
+        self.dependencies: Dict[str, Tuple[str, ...]] = {}
+
+    def stage(self, name: str, after: Sequence[str] = ()):
+        """Decorator registering an async fn(run) as a stage that runs once every stage in after has finished"""
+        unknown = [dependency for dependency in after if dependency not in self.stages]
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on unknown stages: {', '.join(unknown)}")
+
+        def register(fn: StageFunc) -> StageFunc:
+            self.stages[name] = fn
+            self.dependencies[name] = tuple(after)
+            return fn
+        return register
+
+    async def run(self, **inputs) -> PipelineRun:
+        """Run every stage as early as its dependencies allow; the first failure cancels the rest"""
+        run = PipelineRun(inputs)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str):
+            if self.dependencies[name]:
+                await asyncio.gather(*(tasks[dependency] for dependency in self.dependencies[name]))
+            start = time.perf_counter() - run.started_at
+            try:
+                run.results[name] = await self.stages[name](run)
+            finally:
+                run.stage_times[name] = (start, time.perf_counter() - run.started_at)
+
+        for name in self.stages:
+            tasks[name] = asyncio.create_task(run_stage(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            # Let cancelled stages unwind before the error propagates
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return run
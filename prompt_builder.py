@@ -0,0 +1,268 @@
+"""
+Token-budgeted inputs for the AI rewrite prompt.
+
+The rewrite prompt carries the resume and the job description next to
+fixed instructions, and generation latency and cost grow with its size.
+Before the prompt is built, both inputs are stripped of boilerplate:
+page numbers and the header and footer lines a multi-page PDF repeats on
+every page (lines recurring next to the page numbers; a job title or
+bullet repeated elsewhere is kept), "references available on request",
+and the benefits, company and equal-opportunity sections of job postings. If the prompt
+still exceeds LLM_INPUT_TOKEN_BUDGET, the job description is capped and
+the resume sections least similar to the job (by embedding) are dropped
+until it fits; the block before the first header (name and contact
+details) always stays.
+
+Tokens are counted with tiktoken's encoding for OPENAI_MODEL when
+tiktoken and its encoding file are available, otherwise estimated from
+the character count.
+"""
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+import threading
+import math
+import re
+import os
+
+import numpy as np
+
+from job_store import normalize
+from llm import OPENAI_MODEL
+from resume_document import classify_header, split_sections
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Prompt tokens (instructions, resume and job description) sent for one rewrite; 0 disables the budget
+LLM_INPUT_TOKEN_BUDGET = int(os.getenv("LLM_INPUT_TOKEN_BUDGET", "3000"))
+# Share of the budget left after the instructions that a long job description may keep
+JOB_DESC_BUDGET_SHARE = 1 / 3
+
+CHARS_PER_TOKEN = 4
+# Chat format overhead per message, as OpenAI documents for its chat models
+TOKENS_PER_MESSAGE = 4
+
+PAGE_NUMBER = re.compile(r'^(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$', re.IGNORECASE)
+RESUME_BOILERPLATE = re.compile(
+    r'^(?:references?\s+(?:are\s+)?(?:available\s+)?(?:up)?on\s+request\.?|curriculum\s+vitae|resume|cv)$',
+    re.IGNORECASE,
+)
+JOB_BOILERPLATE_HEADER = re.compile(
+    r'^(?:about\s+(?:us|the\s+(?:company|team))|who\s+we\s+are|(?:our\s+)?benefits|perks(?:\s+and\s+benefits)?|'
+    r'what\s+we\s+offer|compensation(?:\s+and\s+benefits)?|equal\s+(?:employment\s+)?opportunity|eeo|'
+    r'how\s+to\s+apply)$',
+    re.IGNORECASE,
+)
+JOB_BOILERPLATE_LINE = re.compile(
+    r'equal\s+opportunity\s+employer|without\s+regard\s+to|regardless\s+of\s+(?:race|gender|age)|'
+    r'reasonable\s+accommodation',
+    re.IGNORECASE,
+)
+# Headings that end a skipped boilerplate section even without a trailing colon
+JOB_CONTENT_HEADER = re.compile(
+    r'^(?:requirements|responsibilities|qualifications|(?:required|preferred|key)\s+\w+|'
+    r'what\s+you.ll\s+(?:do|bring|need)|about\s+the\s+(?:role|position|job)|nice\s+to\s+have|skills)$',
+    re.IGNORECASE,
+)
+MAX_JOB_HEADER_WORDS = 6
+# Lines this close to a page number (or the start or end of the text) can be a page header or footer;
+# wider margins start catching bullets that happen to sit at the same place on two pages
+PAGE_MARGIN_LINES = 1
+
+# Async fn(texts) -> one embedding per text
+Embedder = Callable[[List[str]], Awaitable[Sequence[np.ndarray]]]
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """tiktoken's encoding for OPENAI_MODEL, or None when it cannot be loaded"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                if tiktoken is not None:
+                    try:
+                        _encoding = tiktoken.encoding_for_model(OPENAI_MODEL)
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                    except Exception as e:
+                        # The encoding file is downloaded on first use, which fails offline
+                        print(f"tiktoken encoding unavailable, estimating tokens: {e!r}")
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text, exact with tiktoken, else about one per four characters"""
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Prompt tokens of a chat request"""
+    return sum(count_tokens(message["content"]) + TOKENS_PER_MESSAGE for message in messages) + 2
+
+
+def page_margin_lines(lines: List[str]) -> set:
+    """Indexes of the non-blank lines next to a page number, or at the start or end of a paginated text"""
+    nonblank = [index for index, line in enumerate(lines) if line]
+    page_numbers = [position for position, index in enumerate(nonblank) if PAGE_NUMBER.match(lines[index])]
+    if not page_numbers:
+        return set()
+    boundaries = [-1, len(nonblank)] + page_numbers
+    return {index for position, index in enumerate(nonblank)
+            if any(abs(position - boundary) <= PAGE_MARGIN_LINES for boundary in boundaries)}
+
+
+def prune_resume_boilerplate(text: str) -> str:
+    """Drop page numbers, header/footer lines repeated at page boundaries and stock phrases, and collapse blank runs"""
+    raw_lines = text.split('\n')
+    lines = [' '.join(raw_line.split()) for raw_line in raw_lines]
+    margins = page_margin_lines(lines)
+    margin_counts: Dict[str, int] = {}
+    for index in margins:
+        margin_counts[lines[index].lower()] = margin_counts.get(lines[index].lower(), 0) + 1
+    # Section headers may legitimately repeat; other lines recurring at page boundaries are running headers/footers
+    running = {line for line, count in margin_counts.items() if count > 1 and classify_header(line) is None}
+
+    seen = set()
+    kept: List[str] = []
+    for index, (raw_line, line) in enumerate(zip(raw_lines, lines)):
+        if not line:
+            if kept and kept[-1]:
+                kept.append('')
+            continue
+        if PAGE_NUMBER.match(line) or RESUME_BOILERPLATE.match(line):
+            continue
+        if index in margins and line.lower() in running:
+            # The first occurrence stays: on page one a running header is usually the name line
+            if line.lower() in seen:
+                continue
+            seen.add(line.lower())
+        kept.append(raw_line.rstrip())
+    return '\n'.join(kept).strip()
+
+
+def is_job_header(line: str) -> bool:
+    """A short heading line of a job posting, e.g. 'Benefits:' or '## About us'"""
+    return len(line.split()) <= MAX_JOB_HEADER_WORDS and not line.startswith(('-', '•', '*'))
+
+
+def prune_job_boilerplate(text: str) -> str:
+    """Drop company, benefits, EEO and how-to-apply sections and equal-opportunity sentences"""
+    kept: List[str] = []
+    skipping = False
+    for raw_line in text.split('\n'):
+        line = ' '.join(raw_line.split())
+        if line and is_job_header(line):
+            heading = line.strip('#*: ').rstrip(':')
+            if JOB_BOILERPLATE_HEADER.match(heading):
+                skipping = True
+                continue
+            if line.endswith(':') or raw_line.lstrip().startswith('#') or JOB_CONTENT_HEADER.match(heading):
+                skipping = False
+        if skipping or JOB_BOILERPLATE_LINE.search(line):
+            continue
+        if line or (kept and kept[-1]):
+            kept.append(raw_line.rstrip())
+    return '\n'.join(kept).strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """The longest run of whole leading lines within max_tokens"""
+    kept: List[str] = []
+    used = 0
+    for line in text.split('\n'):
+        tokens = count_tokens(line + '\n')
+        if used + tokens > max_tokens:
+            break
+        kept.append(line)
+        used += tokens
+    return '\n'.join(kept).strip()
+
+
+@dataclass
+class PromptInputs:
+    resume_text: str
+    job_desc: str
+    # Prompt tokens with the inputs as submitted and as sent
+    original_tokens: int
+    tokens: int
+    dropped_sections: List[str] = field(default_factory=list)
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+async def fit_prompt_inputs(resume_text: str, job_desc: str, fixed_tokens: int, embed: Embedder,
+                            job_embedding: Optional[np.ndarray] = None,
+                            budget: int = LLM_INPUT_TOKEN_BUDGET) -> PromptInputs:
+    """Prune the resume and job description so the prompt fits in budget tokens.
+
+    fixed_tokens is the size of the prompt without either input. embed is
+    only called when boilerplate pruning alone does not fit the budget.
+    """
+    original_tokens = fixed_tokens + count_tokens(resume_text) + count_tokens(job_desc)
+    resume_text = prune_resume_boilerplate(resume_text)
+    job_desc = prune_job_boilerplate(job_desc)
+    resume_tokens, job_tokens = count_tokens(resume_text), count_tokens(job_desc)
+    available = budget - fixed_tokens
+    if budget <= 0 or resume_tokens + job_tokens <= available:
+        return PromptInputs(resume_text, job_desc, original_tokens, fixed_tokens + resume_tokens + job_tokens)
+
+    # A long job description keeps its share; a short resume leaves it the rest
+    job_limit = max(available - resume_tokens, int(available * JOB_DESC_BUDGET_SHARE))
+    if job_tokens > job_limit:
+        job_desc = truncate_to_tokens(job_desc, job_limit)
+        job_tokens = count_tokens(job_desc)
+    resume_limit = available - job_tokens
+
+    # Lowest similarity to the job goes first; the leading contact block is never ranked
+    blocks = split_sections(resume_text)
+    ranked = list(range(1, len(blocks))) if blocks and blocks[0][0] == 'other' else list(range(len(blocks)))
+    dropped: List[int] = []
+
+    def join_blocks() -> str:
+        return '\n\n'.join(block.strip() for index, (_, block) in enumerate(blocks) if index not in dropped)
+
+    if resume_tokens > resume_limit and ranked:
+        texts = [blocks[index][1] for index in ranked]
+        vectors = await embed(texts if job_embedding is not None else texts + [job_desc])
+        job_vector = normalize(job_embedding if job_embedding is not None else vectors[-1])
+        similarity = {index: float(normalize(vector) @ job_vector) for index, vector in zip(ranked, vectors)}
+        ranked.sort(key=lambda index: similarity[index])
+        # The most relevant section is cut short rather than dropped
+        for index in ranked[:-1]:
+            dropped.append(index)
+            resume_text = join_blocks()
+            if count_tokens(resume_text) <= resume_limit:
+                # Sections dropped before a larger one may fit again, most relevant first
+                for restored in sorted(dropped[:-1], key=lambda index: -similarity[index]):
+                    dropped.remove(restored)
+                    if count_tokens(join_blocks()) > resume_limit:
+                        dropped.append(restored)
+                resume_text = join_blocks()
+                break
+        else:
+            top = ranked[-1]
+            dropped.append(top)
+            rest_tokens = count_tokens(join_blocks() + '\n\n')
+            dropped.remove(top)
+            blocks[top] = (blocks[top][0], truncate_to_tokens(blocks[top][1], resume_limit - rest_tokens))
+            resume_text = join_blocks()
+    if count_tokens(resume_text) > resume_limit:
+        resume_text = truncate_to_tokens(resume_text, resume_limit)
+
+    return PromptInputs(
+        resume_text, job_desc, original_tokens,
+        fixed_tokens + count_tokens(resume_text) + job_tokens,
+        [blocks[index][0] for index in sorted(dropped)],
+    )
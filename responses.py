@@ -0,0 +1,168 @@
+"""
+Response shaping: field projection, compact results, fast JSON and
+negotiated compression.
+
+Tailoring results echo the resume text and the job description and list
+every skill on both sides. Clients that only need a few values pass
+fields= (comma-separated keys, dotted for nested ones such as
+analysis.skill_match_percentage) or compact=true, which leaves out the
+echoed inputs. JSON is serialized with orjson when it is installed, and
+bodies of at least COMPRESSION_MIN_BYTES are brotli- or gzip-compressed
+as the client's Accept-Encoding allows. Streamed NDJSON is flushed chunk
+by chunk, so compressed results still arrive as they are ready.
+"""
+from typing import Dict, Iterable, List, Optional
+import json
+import zlib
+import os
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+# Starlette's responder handles the headers, small bodies and streaming; Server-Sent Events stay uncompressed
+from starlette.middleware.gzip import IdentityResponder
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Inputs the client already has; job_skills is also available from GET /jobs/{job_id}
+COMPACT_OMITTED_FIELDS = ("resume_text", "job_desc", "job_skills")
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# 4-5 is the usual choice for dynamic content; 11 is for static assets
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+JSONResponseClass = ORJSONResponse if orjson is not None else JSONResponse
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[List[str]]]:
+    """Split a fields= value into key paths; None (or blank) means every field"""
+    if fields is None or not fields.strip():
+        return None
+    paths = []
+    for field in fields.split(","):
+        path = field.strip().split(".")
+        if not all(path):
+            raise ValueError(f"Invalid field {field.strip()!r}")
+        paths.append(path)
+    return paths
+
+
+def _copy_path(source: Dict, path: List[str], target: Dict):
+    key = path[0]
+    if not isinstance(source, dict) or key not in source:
+        return
+    if len(path) == 1:
+        target[key] = source[key]
+    else:
+        _copy_path(source[key], path[1:], target.setdefault(key, {}))
+
+
+def project(result: Dict, fields: Optional[List[List[str]]] = None, compact: bool = False,
+            keep: Iterable[str] = ()) -> Dict:
+    """Keep only the requested fields (plus keep), or drop the echoed inputs when compact.
+
+    Requested fields the result does not have are skipped, so one fields=
+    works for every line of a stream. An explicit fields= wins over compact.
+    """
+    if fields is not None:
+        projected = {key: result[key] for key in keep if key in result}
+        for path in fields:
+            _copy_path(result, path, projected)
+        return projected
+    if compact:
+        return {key: value for key, value in result.items() if key not in COMPACT_OMITTED_FIELDS}
+    return result
+
+
+def json_response(content, status_code: int = 200):
+    """Serialize directly with the fast encoder, skipping FastAPI's jsonable_encoder pass"""
+    return JSONResponseClass(content, status_code=status_code)
+
+
+def json_line(data) -> bytes:
+    """One NDJSON line"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data) + "\n").encode()
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported content coding the client accepts: br, then gzip.
+
+    "*" covers codings not listed; a coding listed with q=0 is refused even then.
+    """
+    accepted, refused = set(), set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        coding, quality = coding.strip(), params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    refused.add(coding)
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+
+    def acceptable(coding: str) -> bool:
+        return coding in accepted or ("*" in accepted and coding not in refused)
+
+    if brotli is not None and acceptable("br"):
+        return "br"
+    if acceptable("gzip"):
+        return "gzip"
+    return None
+
+
+class GzipResponder(IdentityResponder):
+    content_encoding = "gzip"
+
+    def __init__(self, app, minimum_size: int):
+        super().__init__(app, minimum_size)
+        # wbits 31 writes the gzip header and trailer
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        # A sync flush per chunk lets streamed lines through without ending the stream
+        return self.compressor.compress(body) + self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        compressed = self.compressor.process(body)
+        return compressed + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip, as negotiated by Accept-Encoding"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = BrotliResponder if encoding == "br" else GzipResponder
+        await responder(self.app, self.minimum_size)(scope, receive, send)
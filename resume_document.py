@@ -0,0 +1,141 @@
+"""
+Single-pass resume document model for the template rewrite.
+
+parse_resume() walks the resume text once, classifying each line as a
+section header or content with the compiled rules from resume_rules,
+and builds a ResumeDocument holding the lines, their offsets, the
+section each belongs to, and the contact details, experience and
+education entries derived from them. The rewrite helpers read from that object instead of
+re-splitting and re-scanning the text for every field.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import re
+
+from skill_matcher import get_skill_matcher
+from resume_rules import get_resume_rules
+
+# Headers are short, stand-alone lines
+MAX_HEADER_LENGTH = 50
+MAX_HEADER_WORDS = 5
+BULLET_CHARS = ('•', '-', '*', '▪', '◦')
+
+ENTRY_SEPARATOR = re.compile(r'\s*[\|\-]\s*')
+NOT_A_NAME = ('resume', 'cv', 'curriculum', 'objective', 'summary')
+
+
+@dataclass(slots=True)
+class ResumeDocument:
+    text: str
+    # Stripped, non-empty lines with the offset of each in text
+    lines: List[str] = field(default_factory=list)
+    line_offsets: List[int] = field(default_factory=list)
+    # Section name -> indexes into lines (header lines excluded); unheaded lines go to 'other'
+    sections: Dict[str, List[int]] = field(default_factory=dict)
+    headers: Dict[int, str] = field(default_factory=dict)
+    contacts: Dict[str, str] = field(default_factory=dict)
+    name: str = "Professional Candidate"
+    experience: List[Dict] = field(default_factory=list)
+    education: List[str] = field(default_factory=list)
+    skills: List[str] = field(default_factory=list)
+
+    def section_lines(self, section: str) -> List[str]:
+        return [self.lines[index] for index in self.sections.get(section, [])]
+
+    def section_text(self, section: str) -> str:
+        return ''.join(line + '\n' for line in self.section_lines(section))
+
+
+def classify_header(line: str) -> Optional[str]:
+    """Return the section a header line starts, or None for content lines"""
+    if len(line) >= MAX_HEADER_LENGTH or line.startswith(BULLET_CHARS):
+        return None
+    if '|' in line or '@' in line or len(line.split()) > MAX_HEADER_WORDS:
+        return None
+    return get_resume_rules().section_for(line)
+
+
+def parse_name(lines: List[str]) -> str:
+    """A short, digit-free line near the top, else the first line unless it is a title"""
+    for line in lines[:5]:
+        if len(line.split()) <= 4 and not any(char.isdigit() for char in line):
+            if '@' not in line and 'http' not in line.lower():
+                return line
+    if lines and not any(word in lines[0].lower() for word in NOT_A_NAME):
+        return lines[0]
+    return "Professional Candidate"
+
+
+def parse_experience(lines: List[str]) -> List[Dict]:
+    """Group experience lines into title/company/dates entries with their bullets"""
+    entries = []
+    current = None
+    for line in lines:
+        if line.startswith(BULLET_CHARS):
+            # Achievement/responsibility bullet point
+            if current is not None:
+                current['description'].append(line)
+        elif '|' in line or ' at ' in line or ' - ' in line:
+            # A job title/company line starts a new entry
+            current = {'title': '', 'company': '', 'dates': '', 'description': []}
+            entries.append(current)
+            if '|' in line:
+                parts = line.split('|')
+            elif ' at ' in line:
+                parts = line.split(' at ', 1)
+            else:
+                parts = ENTRY_SEPARATOR.split(line)
+            if len(parts) >= 2:
+                current['title'] = parts[0].strip()
+                current['company'] = parts[1].strip()
+                if len(parts) >= 3:
+                    current['dates'] = parts[2].strip()
+        elif current is not None and current['title'] and not current['dates'] and any(char.isdigit() for char in line):
+            current['dates'] = line
+        elif current is not None and current['title']:
+            current['description'].append(line)
+    return [entry for entry in entries if entry['title'] or entry['company']]
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split resume text into (section, text) blocks in document order, each starting at its header line.
+
+    Lines before the first header form an 'other' block. Block texts keep
+    their lines verbatim, so an edit changes only the block it falls in.
+    """
+    blocks: List[Tuple[str, List[str]]] = []
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        section = classify_header(line) if line else None
+        if section is not None or not blocks:
+            blocks.append((section or 'other', []))
+        blocks[-1][1].append(raw_line)
+    return [(section, '\n'.join(lines)) for section, lines in blocks if any(line.strip() for line in lines)]
+
+
+def parse_resume(text: str) -> ResumeDocument:
+    """Tokenize resume text once and derive every field the template rewrite needs"""
+    doc = ResumeDocument(text)
+    current = 'other'
+    offset = 0
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        if line:
+            index = len(doc.lines)
+            doc.lines.append(line)
+            doc.line_offsets.append(offset + raw_line.index(line[0]))
+            section = classify_header(line)
+            if section is not None:
+                current = section
+                doc.headers[index] = section
+            else:
+                doc.sections.setdefault(current, []).append(index)
+        offset += len(raw_line) + 1
+
+    doc.contacts = get_resume_rules().find_contacts(text)
+    doc.name = parse_name(doc.lines)
+    doc.contacts['name'] = doc.name
+    doc.experience = parse_experience(doc.section_lines('experience'))
+    doc.education = doc.section_lines('education')
+    doc.skills = get_skill_matcher().find_all(text)
+    return doc
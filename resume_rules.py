@@ -0,0 +1,90 @@
+"""
+Precompiled rules for the template rewrite: section headers, weak-verb
+substitutions and contact details.
+
+Section patterns and action verbs are loaded from a JSON file
+(RESUME_RULES_PATH, default data/resume_rules.json):
+
+    {"sections": {"experience": "(?:work )?experience|employment", ...},
+     "action_verbs": {"worked": "collaborated", ...}}
+
+Section patterns are tried in file order. They are compiled into one
+alternation with a named group per section, so classifying a line is a
+single match, and all weak verbs are replaced in one pass by a single
+pattern whose callback looks the stronger verb up in a dict.
+"""
+from typing import Dict, Optional
+import threading
+import json
+import re
+import os
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "resume_rules.json")
+RESUME_RULES_PATH = os.getenv("RESUME_RULES_PATH", DEFAULT_RULES_PATH)
+
+CONTACT_PATTERNS = {
+    'email': re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    'phone': re.compile(r'(\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})'),
+    'linkedin': re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE),
+    'github': re.compile(r'github\.com/[\w-]+', re.IGNORECASE),
+}
+
+
+class ResumeRules:
+    """Compiled section-header and action-verb rules"""
+
+    def __init__(self, sections: Dict[str, str], action_verbs: Dict[str, str]):
+        for name in sections:
+            if not name.isidentifier():
+                raise ValueError(f"Section name {name!r} must be a valid identifier")
+        self.sections = dict(sections)
+        alternation = "|".join(f"(?P<{name}>{pattern})" for name, pattern in sections.items())
+        # A header starts with a section phrase, after any bullets or decoration
+        self.header_pattern = re.compile(rf"[^\w]*(?:{alternation})\b", re.IGNORECASE)
+
+        self.action_verbs = {weak.lower(): strong for weak, strong in action_verbs.items()}
+        # Longest first so multi-word phrases win over their prefixes
+        weak_verbs = sorted(self.action_verbs, key=len, reverse=True)
+        self.verb_pattern = re.compile(
+            r"\b(?:" + "|".join(re.escape(weak) for weak in weak_verbs) + r")\b", re.IGNORECASE
+        ) if weak_verbs else None
+
+    def section_for(self, line: str) -> Optional[str]:
+        """Section whose header phrase starts line, or None"""
+        match = self.header_pattern.match(line)
+        return match.lastgroup if match else None
+
+    def strengthen_verbs(self, text: str) -> str:
+        """Replace every weak verb with its stronger counterpart in one pass"""
+        if self.verb_pattern is None:
+            return text
+        return self.verb_pattern.sub(lambda match: self.action_verbs[match.group().lower()], text)
+
+    @staticmethod
+    def find_contacts(text: str) -> Dict[str, str]:
+        contacts = {'email': '', 'phone': '', 'location': '', 'linkedin': '', 'github': ''}
+        for key, pattern in CONTACT_PATTERNS.items():
+            match = pattern.search(text)
+            if match:
+                contacts[key] = match.group()
+        return contacts
+
+
+def load_rules(path: str = RESUME_RULES_PATH) -> ResumeRules:
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    return ResumeRules(config.get("sections", {}), config.get("action_verbs", {}))
+
+
+_rules = None
+_rules_lock = threading.Lock()
+
+
+def get_resume_rules() -> ResumeRules:
+    """Return the process-wide rules, compiling them on first use"""
+    global _rules
+    if _rules is None:
+        with _rules_lock:
+            if _rules is None:
+                _rules = load_rules()
+    return _rules
@@ -0,0 +1,44 @@
+"""
+Persistent cache of AI resume rewrites.
+
+A rewrite is keyed on a hash of the resume text, job description, model
+name, prompt version and prompt token budget (which decides how the
+inputs are pruned), so resubmitting the same pair (after a refresh,
+or a change to an unrelated form field) is answered from disk instead of
+a new completion. Only successful AI rewrites are stored; template
+fallbacks are never cached. Entries expire after a TTL and the least
+recently used ones are evicted beyond max_entries.
+"""
+from typing import Optional
+import hashlib
+import os
+
+from cache import DiskCache
+from prompt_builder import LLM_INPUT_TOKEN_BUDGET
+
+REWRITE_CACHE_PATH = os.getenv("REWRITE_CACHE_PATH", "rewrite_cache.sqlite")
+REWRITE_CACHE_MAX_ENTRIES = int(os.getenv("REWRITE_CACHE_MAX_ENTRIES", "5000"))
+REWRITE_CACHE_TTL = float(os.getenv("REWRITE_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Bump whenever build_rewrite_messages or prompt_builder's pruning changes so old rewrites stop matching
+PROMPT_VERSION = "2"
+
+
+def make_rewrite_key(resume_text: str, job_desc: str, model: str, prompt_version: str = PROMPT_VERSION,
+                     token_budget: int = LLM_INPUT_TOKEN_BUDGET) -> str:
+    """Content hash of everything that determines a rewrite"""
+    digest = hashlib.sha256()
+    for part in (prompt_version, str(token_budget), model, resume_text, job_desc):
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class RewriteCache(DiskCache):
+    """SQLite-backed rewrite cache with TTL and LRU size eviction"""
+
+    def __init__(self, path: str = REWRITE_CACHE_PATH, max_entries: int = REWRITE_CACHE_MAX_ENTRIES,
+                 ttl: Optional[float] = REWRITE_CACHE_TTL):
+        super().__init__(path, table="rewrite_cache", max_entries=max_entries, ttl=ttl)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Startup script for the AI Resume Builder backend
+Development startup script for the AI Resume Builder backend (one process, auto-reload).
+Production runs serve.py, which preloads the models and forks several workers.
 """
 import uvicorn
 import sys
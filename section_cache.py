@@ -0,0 +1,101 @@
+"""
+Per-section resume analysis, cached by content hash, for incremental
+re-analysis of edited resumes.
+
+Candidates edit one part of their resume and resubmit. The resume is
+split into its sections (resume_document.split_sections) and each
+section's skills and embedding are cached under a hash of its text and
+the embedding model, in memory and optionally in SQLite
+(SECTION_CACHE_PATH). A resubmission only runs spaCy and the embedding
+model on the sections that changed. The document is then recombined: its
+skills are the union of the section skills and its embedding is the
+length-weighted mean of the section embeddings, normalized, so similarity
+with a job is still a dot product.
+"""
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from cache import Serializer, TwoTierCache
+from job_store import normalize
+from resume_document import split_sections
+from upload_cache import ResumeAnalysis
+from workers import run_in_thread
+
+SECTION_CACHE_MAX_ENTRIES = int(os.getenv("SECTION_CACHE_MAX_ENTRIES", "4096"))
+SECTION_CACHE_TTL = float(os.getenv("SECTION_CACHE_TTL", str(24 * 3600)))
+# Empty disables the on-disk tier
+SECTION_CACHE_PATH = os.getenv("SECTION_CACHE_PATH", "")
+SECTION_CACHE_DISK_MAX_ENTRIES = int(os.getenv("SECTION_CACHE_DISK_MAX_ENTRIES", "100000"))
+
+# Async fn(section texts) -> (skills per section, embedding per section)
+SectionAnalyzer = Callable[[List[str]], Awaitable[Tuple[List[List[str]], List[np.ndarray]]]]
+
+
+@dataclass
+class SectionAnalysis:
+    skills: List[str]
+    embedding: np.ndarray
+    # Words in the section, its weight in the document embedding
+    words: int
+
+    def to_json(self) -> str:
+        return json.dumps({"skills": self.skills, "embedding": self.embedding.tolist(), "words": self.words})
+
+    @classmethod
+    def from_json(cls, payload: str) -> "SectionAnalysis":
+        data = json.loads(payload)
+        return cls(data["skills"], np.asarray(data["embedding"], dtype=np.float32), data["words"])
+
+
+def make_section_key(text: str, model_name: str) -> str:
+    """Whitespace-insensitive content hash of a section, scoped to the embedding model"""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class SectionCache(TwoTierCache):
+    """Two-tier (memory, then optional disk) cache of SectionAnalysis by section hash"""
+
+    def __init__(self, max_entries: int = SECTION_CACHE_MAX_ENTRIES, ttl: Optional[float] = SECTION_CACHE_TTL,
+                 path: str = SECTION_CACHE_PATH, disk_max_entries: int = SECTION_CACHE_DISK_MAX_ENTRIES):
+        super().__init__(Serializer(SectionAnalysis.to_json, SectionAnalysis.from_json), table="sections",
+                         max_entries=max_entries, ttl=ttl, path=path, disk_max_entries=disk_max_entries)
+
+
+def combine_sections(text: str, sections: List[SectionAnalysis]) -> ResumeAnalysis:
+    """Document analysis from its sections: the union of their skills and their length-weighted mean embedding"""
+    skills = list(dict.fromkeys(skill for section in sections for skill in section.skills))
+    vectors = np.stack([normalize(section.embedding) for section in sections])
+    weights = np.array([max(1, section.words) for section in sections], dtype=np.float32)
+    return ResumeAnalysis(text, skills, normalize(weights @ vectors))
+
+
+async def analyze_incrementally(text: str, cache: SectionCache, analyze: SectionAnalyzer,
+                                model_name: str) -> Tuple[ResumeAnalysis, Dict[str, int]]:
+    """Analyze only the sections missing from the cache, then recombine the whole resume.
+
+    Returns the analysis and counts of its sections and, of the distinct
+    ones, how many were found in the cache (reused) and how many were
+    analyzed; a section repeated within the resume is looked up and
+    analyzed once.
+    """
+    blocks = [block for _, block in split_sections(text)] or [text]
+    keys = [make_section_key(block, model_name) for block in blocks]
+    distinct = dict(zip(keys, blocks))
+    analyses = await run_in_thread(lambda: {key: cache.get(key) for key in distinct})
+    reused = sum(analysis is not None for analysis in analyses.values())
+
+    missing = {key: block for key, block in distinct.items() if analyses[key] is None}
+    if missing:
+        skills_per_section, embeddings = await analyze(list(missing.values()))
+        for (key, block), skills, embedding in zip(missing.items(), skills_per_section, embeddings):
+            analyses[key] = SectionAnalysis(skills, np.asarray(embedding, dtype=np.float32), len(block.split()))
+        await run_in_thread(lambda: [cache.set(key, analyses[key]) for key in missing])
+
+    counts = {"sections": len(keys), "reused": reused, "analyzed": len(missing)}
+    return combine_sections(text, [analyses[key] for key in keys]), counts
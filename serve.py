@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Production entry point: load the models once, then fork the web workers.
+
+The parent imports the app, loads the spaCy pipeline and the embedding
+model and runs a warm-up inference through them, then binds the listening
+socket and forks WEB_CONCURRENCY uvicorn workers that accept on it. The
+workers inherit the loaded models copy-on-write, so they start serving
+without loading anything and N workers cost far less memory than N
+separate uvicorn processes.
+
+Each worker gets WORKER_THREADS intra-op threads for torch, BLAS and ONNX
+Runtime (by default the cores divided among the workers), so N workers do
+not each start one thread per core. With WORKER_MAX_REQUESTS set, a worker
+finishes its in-flight requests and exits after that many (plus a random
+jitter, so workers do not all restart together) and the parent forks a
+fresh one from the preloaded state.
+
+Prometheus metrics are kept in PROMETHEUS_MULTIPROC_DIR (a fresh temporary
+directory unless set), so /metrics reports all workers, not just the one
+that answered the scrape. /stats stays per worker and includes its pid.
+
+    WEB_CONCURRENCY=4 python serve.py
+
+run_backend.py remains the single-process development server with reload.
+"""
+import tempfile
+import shutil
+import glob
+import os
+
+# Cores this process may run on; a container's CPU quota is not visible here, so set WEB_CONCURRENCY there
+CPU_COUNT = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", str(CPU_COUNT))))
+WORKER_THREADS = max(1, int(os.getenv("WORKER_THREADS", str(max(1, CPU_COUNT // WEB_CONCURRENCY)))))
+
+# The OpenMP and BLAS runtimes read these when they load, so they are set before numpy or torch is imported
+for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "EMBEDDING_THREADS"):
+    os.environ.setdefault(variable, str(WORKER_THREADS))
+# The tokenizers thread pool does not survive fork
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+# Each worker is already a process: spaCy runs on its thread pool and queued tasks on its event loop
+os.environ.setdefault("SPACY_PROCESSES", "0")
+os.environ.setdefault("TASK_WORKERS", "0")
+# A job_id registered through one worker must resolve in all of them
+os.environ.setdefault("JOB_STORE_PATH", "job_store.sqlite")
+# prometheus_client picks its multiprocess value class on import, so this must be set before it loads
+METRICS_DIR_OWNED = "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+if METRICS_DIR_OWNED:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="resume-metrics-")
+
+from typing import Dict
+import random
+import signal
+import time
+import gc
+
+import uvicorn
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# 0 never recycles workers
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "0"))
+WORKER_MAX_REQUESTS_JITTER = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", str(WORKER_MAX_REQUESTS // 10)))
+# Seconds a stopping worker waits for in-flight requests
+WORKER_GRACEFUL_TIMEOUT = int(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+
+WARM_UP_TEXT = "Warm-up: Python developer with AWS experience"
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+def preload():
+    """Import the app and load the models in the parent, before any worker exists"""
+    started = time.perf_counter()
+    import main
+    import skills
+    from models import EMBEDDING_BACKEND
+
+    skills.load_resources()
+    skills.extract_skills(WARM_UP_TEXT)
+    # ONNX Runtime sessions own threads, which do not survive fork, so those workers load the model themselves
+    if EMBEDDING_BACKEND == "torch":
+        import torch
+
+        # No OpenMP pool may exist at fork time; each worker sets its own thread count
+        torch.set_num_threads(1)
+        main.encode_texts([WARM_UP_TEXT])
+
+    # Keep the collector from touching (and so copying) every preloaded object in each worker
+    gc.collect()
+    gc.freeze()
+    print(f"Preloaded models in {time.perf_counter() - started:.1f}s")
+    return main.app
+
+
+def run_worker(app, sock, max_requests: int):
+    """Serve on the inherited socket until stopped or recycled"""
+    from models import EMBEDDING_BACKEND, readiness
+
+    # /ready reports this worker's warm-up, not the time since the parent started
+    readiness.started_at = time.time()
+    if EMBEDDING_BACKEND == "torch":
+        import torch
+
+        torch.set_num_threads(WORKER_THREADS)
+    config = uvicorn.Config(app, log_level=LOG_LEVEL, limit_max_requests=max_requests or None,
+                            timeout_graceful_shutdown=WORKER_GRACEFUL_TIMEOUT)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def reset_metrics_dir(directory: str):
+    """Remove samples left by a previous run, which would otherwise be added to this one's"""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+
+def serve():
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    reset_metrics_dir(metrics_dir)
+    sock = uvicorn.Config("main:app", host=HOST, port=PORT, log_level=LOG_LEVEL).bind_socket()
+    app = preload()
+    from prometheus_client import multiprocess
+
+    workers: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        max_requests = WORKER_MAX_REQUESTS + random.randint(0, WORKER_MAX_REQUESTS_JITTER) if WORKER_MAX_REQUESTS else 0
+        # Block stop signals across fork so a child never runs the parent's handler
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                for signum in STOP_SIGNALS:
+                    signal.signal(signum, signal.SIG_DFL)
+                # Out of the terminal's process group: Ctrl-C reaches the parent, which stops each worker once
+                os.setpgid(0, 0)
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+                run_worker(app, sock, max_requests)
+                code = 0
+            finally:
+                os._exit(code)
+        workers[pid] = time.monotonic()
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, stop)
+    for _ in range(WEB_CONCURRENCY):
+        spawn()
+    print(f"Serving on {HOST}:{PORT} with {WEB_CONCURRENCY} workers x {WORKER_THREADS} threads")
+
+    while workers:
+        pid, status = os.wait()
+        started = workers.pop(pid, None)
+        if started is None:
+            continue
+        # Drops the worker's live gauges; its counters and histograms stay in the totals
+        multiprocess.mark_process_dead(pid)
+        if stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if code != 0:
+            print(f"Worker {pid} exited with {code}")
+            # A worker that cannot start is not re-forked in a tight loop
+            if time.monotonic() - started < 5:
+                time.sleep(1)
+        if not stopping:
+            spawn()
+    sock.close()
+    if METRICS_DIR_OWNED:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    serve()
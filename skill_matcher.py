@@ -0,0 +1,167 @@
+"""
+Skill taxonomy and a compiled single-pass skill matcher.
+
+The taxonomy is a text file (SKILL_TAXONOMY_PATH, default
+data/skills_taxonomy.txt) with one skill per line:
+
+    Canonical Name | category | alias one, alias two
+
+Lines starting with # are comments. A surface form prefixed with "=" is
+matched case-sensitively (e.g. "=Go"), and a canonical name prefixed with
+"~" is only found through its aliases (e.g. "~Word | tool | microsoft word").
+
+All surface forms are compiled into one trie-shaped regular expression
+with word boundaries, so a text is scanned once regardless of taxonomy size
+and "java" no longer matches inside "javascript".
+"""
+from typing import Dict, Iterable, List, Optional, Set
+import threading
+import re
+import os
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills_taxonomy.txt")
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH)
+
+# Surface forms shorter than this are too ambiguous to match ("C", "R")
+MIN_SURFACE_LENGTH = 2
+
+# Characters that may not touch either end of a match. "+" and "#" are
+# included so "c" never matches inside "c++" or "c#".
+_BOUNDARY_BEFORE = r"(?<![\w+#])"
+_BOUNDARY_AFTER = r"(?![\w+#])"
+
+
+class SkillEntry:
+    __slots__ = ("name", "category", "surfaces")
+
+    def __init__(self, name: str, category: str, surfaces: List[str]):
+        self.name = name
+        self.category = category
+        self.surfaces = surfaces
+
+
+def parse_taxonomy(lines: Iterable[str]) -> List[SkillEntry]:
+    """Parse taxonomy lines into skill entries"""
+    entries = []
+    for line_number, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) < 2 or not parts[0]:
+            raise ValueError(f"Invalid skill taxonomy line {line_number}: {raw.rstrip()!r}")
+
+        name, category = parts[0], parts[1].lower() or "general"
+        aliases = [alias.strip() for alias in parts[2].split(",")] if len(parts) > 2 else []
+
+        surfaces = []
+        if name.startswith("~"):
+            name = name[1:].strip()
+        else:
+            surfaces.append(name)
+        surfaces.extend(alias for alias in aliases if alias)
+        entries.append(SkillEntry(name, category, surfaces))
+    return entries
+
+
+def load_taxonomy(path: str = SKILL_TAXONOMY_PATH) -> List[SkillEntry]:
+    """Load skill entries from a taxonomy file"""
+    with open(path, encoding="utf-8") as f:
+        return parse_taxonomy(f)
+
+
+def build_trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation shaped like a trie, so matching never backtracks across siblings"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def render(node: Dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        # Longer continuations are tried first, then the shorter word itself
+        return "(?:" + "|".join(branches) + ")" + ("?" if terminal else "")
+
+    return render(trie)
+
+
+class SkillMatcher:
+    """Finds taxonomy skills in text with one compiled pattern"""
+
+    def __init__(self, entries: List[SkillEntry]):
+        self.entries = entries
+        self._by_surface = {}
+        self._case_sensitive = {}
+        self._by_name = {}
+
+        for entry in entries:
+            self._by_name[entry.name.lower()] = entry
+            for surface in entry.surfaces:
+                exact = surface.startswith("=")
+                surface = surface[1:] if exact else surface
+                if len(surface) < MIN_SURFACE_LENGTH:
+                    continue
+                key = surface.lower()
+                self._by_surface.setdefault(key, entry)
+                if exact:
+                    self._case_sensitive[key] = surface
+
+        trie = build_trie_pattern(self._by_surface)
+        self.pattern = re.compile(f"{_BOUNDARY_BEFORE}(?:{trie}){_BOUNDARY_AFTER}", re.IGNORECASE) if trie else None
+
+    def _iter_entries(self, text: str):
+        if self.pattern is None or not text:
+            return
+        for match in self.pattern.finditer(text):
+            found = match.group()
+            key = found.lower()
+            exact = self._case_sensitive.get(key)
+            if exact is not None and found != exact:
+                continue
+            yield self._by_surface[key]
+
+    def find_all(self, text: str, categories: Optional[Set[str]] = None) -> List[str]:
+        """Canonical names of all skills in text, in order of first appearance"""
+        seen = {}
+        for entry in self._iter_entries(text):
+            if categories is None or entry.category in categories:
+                seen.setdefault(entry.name, None)
+        return list(seen)
+
+    def has_match(self, text: str, categories: Optional[Set[str]] = None) -> bool:
+        """Whether text mentions any skill (optionally restricted to categories)"""
+        for entry in self._iter_entries(text):
+            if categories is None or entry.category in categories:
+                return True
+        return False
+
+    def category(self, skill: str) -> Optional[str]:
+        """Category of a skill given by canonical name or alias"""
+        key = skill.strip().lower()
+        entry = self._by_name.get(key) or self._by_surface.get(key)
+        return entry.category if entry else None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Return the process-wide matcher, compiling the taxonomy on first use"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(load_taxonomy())
+    return _matcher
@@ -0,0 +1,102 @@
+"""
+Skill extraction for resumes and job descriptions
+"""
+from typing import Dict, List, Optional
+import spacy
+import re
+import os
+
+from skill_matcher import get_skill_matcher
+
+TECHNICAL_CATEGORIES = {"technical"}
+# Vendor names that mark an entity as technology-related
+TECH_VENDORS = re.compile(r"\b(google|microsoft|amazon|oracle|ibm|adobe)\b", re.IGNORECASE)
+
+# Only doc.ents and doc.noun_chunks are used. noun_chunks needs the tagger,
+# parser and attribute_ruler (which maps tags to coarse POS), so only the
+# lemmatizer can go by default.
+SPACY_EXCLUDE = [name.strip() for name in os.getenv("SPACY_EXCLUDE", "lemmatizer").split(",") if name.strip()]
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "64"))
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+
+_nlp = None
+# Set in the spaCy process pool's workers (workers.get_process_pool), which must not start processes of their own
+_in_pool_worker = False
+
+
+def get_nlp():
+    """Load the trimmed spaCy pipeline once per process"""
+    global _nlp
+    if _nlp is None:
+        _nlp = spacy.load("en_core_web_sm", exclude=SPACY_EXCLUDE)
+    return _nlp
+
+
+def pipe_docs(texts: List[str], batch_size: Optional[int] = None, n_process: Optional[int] = None):
+    """Run texts through nlp.pipe in batches"""
+    batch_size = batch_size or SPACY_BATCH_SIZE
+    n_process = n_process or SPACY_N_PROCESS
+    # Extra processes only pay off across several batches, and a pool worker
+    # starting its own would multiply SPACY_PROCESSES by SPACY_N_PROCESS
+    if len(texts) <= batch_size or _in_pool_worker:
+        n_process = 1
+    return get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process)
+
+
+def extract_skills(text):
+    """Extract skills using a combination of NER and keyword matching"""
+    return extract_skills_batch([text])[0]
+
+
+def extract_skills_batch(texts: List[str], batch_size: Optional[int] = None,
+                         n_process: Optional[int] = None) -> List[List[str]]:
+    """Extract skills for many texts with a single batched nlp.pipe pass"""
+    return [skills_from_doc(doc, text) for doc, text in zip(pipe_docs(texts, batch_size, n_process), texts)]
+
+
+def analyze_job_description(text: str) -> Dict[str, List[str]]:
+    """Extract skills plus the spaCy features kept for a registered job"""
+    doc = next(iter(pipe_docs([text])))
+    return {
+        "skills": skills_from_doc(doc, text),
+        "entities": sorted({ent.text for ent in doc.ents if ent.label_ in ["ORG", "PRODUCT", "LANGUAGE"]}),
+        "noun_chunks": sorted({chunk.text.lower() for chunk in doc.noun_chunks if len(chunk.text.split()) <= 3}),
+    }
+
+
+def skills_from_doc(doc, text: str) -> List[str]:
+    """Collect skills from an already-processed spaCy doc"""
+    matcher = get_skill_matcher()
+    skills = []
+
+    # Extract entities that might be skills
+    for ent in doc.ents:
+        if ent.label_ in ["ORG", "PRODUCT", "LANGUAGE", "PERSON"]:
+            # Filter for technology-related entities
+            if matcher.has_match(ent.text, TECHNICAL_CATEGORIES) or TECH_VENDORS.search(ent.text):
+                skills.append(ent.text)
+
+    # Extract taxonomy skills in a single pass over the text
+    skills.extend(matcher.find_all(text))
+
+    # Extract noun phrases that might be skills
+    for chunk in doc.noun_chunks:
+        if len(chunk.text.split()) <= 3 and len(chunk.text) > 2:
+            # Check if it looks like a technical term
+            if any(char.isupper() for char in chunk.text) or matcher.has_match(chunk.text, TECHNICAL_CATEGORIES):
+                skills.append(chunk.text)
+
+    return list(set(skills))
+
+
+def load_resources():
+    """Load the spaCy pipeline and compile the skill matcher; used to warm worker processes"""
+    get_nlp()
+    get_skill_matcher()
+
+
+def init_pool_worker():
+    """Initializer of the spaCy process pool: mark this process as a pool worker and warm it"""
+    global _in_pool_worker
+    _in_pool_worker = True
+    load_resources()
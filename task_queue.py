@@ -0,0 +1,398 @@
+"""
+Submit/poll queue for tailoring requests that outlive proxy timeouts.
+
+Tasks are rows in a SQLite table (TASK_QUEUE_PATH). The API inserts a
+queued task and answers with its id straight away; TASK_WORKERS worker
+processes claim tasks atomically, run the analysis and rewrite, and store
+the result or the error, which GET /tasks/{id} reads back. A task with a
+callback URL has its final state POSTed there. With TASK_WORKERS=0 the
+tasks run inside the API process instead, which also allows a queue that
+lives only in memory (TASK_QUEUE_PATH=:memory:).
+
+A worker that stops (a recycled serve.py worker, or the API shutting down
+its worker processes) puts the tasks it claimed back in the queue. A task
+left running longer than TASK_TIMEOUT (its worker died) is put back too,
+and failed after TASK_MAX_ATTEMPTS claims.
+
+Callback URLs must resolve to public addresses only (no loopback, private,
+link-local or reserved ranges such as the 169.254.169.254 metadata
+endpoint), checked at submission and again before each delivery. The
+delivery connects to the address that was checked, so the host cannot
+resolve somewhere else in between (DNS rebinding). With
+TASK_CALLBACK_ALLOWED_HOSTS set, only the listed hosts are accepted,
+internal ones included.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import multiprocessing
+import ipaddress
+import importlib
+import threading
+import sqlite3
+import asyncio
+import socket
+import json
+import time
+import uuid
+import os
+
+import httpx
+
+TASK_QUEUE_PATH = os.getenv("TASK_QUEUE_PATH", "task_queue.sqlite")
+# Worker processes; 0 runs tasks in the API process
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "1"))
+# Tasks run at once by each worker (the LLM call dominates, so this can exceed the CPU count)
+TASK_CONCURRENCY = int(os.getenv("TASK_CONCURRENCY", "4"))
+TASK_MAX_QUEUED = int(os.getenv("TASK_MAX_QUEUED", "1000"))
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", "0.5"))
+TASK_TIMEOUT = float(os.getenv("TASK_TIMEOUT", "600"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_RESULT_TTL = float(os.getenv("TASK_RESULT_TTL", str(24 * 3600)))
+TASK_CALLBACK_TIMEOUT = float(os.getenv("TASK_CALLBACK_TIMEOUT", "10"))
+TASK_CALLBACK_RETRIES = int(os.getenv("TASK_CALLBACK_RETRIES", "2"))
+# Comma-separated callback hosts; when set, only these are accepted (and may be internal)
+TASK_CALLBACK_ALLOWED_HOSTS = {host.strip().lower() for host in os.getenv("TASK_CALLBACK_ALLOWED_HOSTS", "").split(",")
+                               if host.strip()}
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+STATUSES = (QUEUED, RUNNING, SUCCEEDED, FAILED)
+
+# Async fn(payload, resume_pdf) -> result dict; the payload carries whatever the handler needs
+TaskHandler = Callable[[str, Dict, Optional[bytes]], Awaitable[Dict]]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class CallbackURLError(ValueError):
+    """A callback URL that the server refuses to POST to"""
+
+
+def check_callback_url(url: str, allowed_hosts: Optional[set] = None) -> str:
+    """Raise CallbackURLError unless url is http(s) and its host is allowed or resolves only to public addresses.
+
+    Returns the checked address to connect to.
+    """
+    allowed_hosts = TASK_CALLBACK_ALLOWED_HOSTS if allowed_hosts is None else allowed_hosts
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise CallbackURLError("callback_url must be an http or https URL")
+    host = parsed.hostname.lower()
+    if allowed_hosts and host not in allowed_hosts:
+        raise CallbackURLError(f"callback_url host {host} is not in TASK_CALLBACK_ALLOWED_HOSTS")
+
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)))
+    except (socket.gaierror, UnicodeError, ValueError) as e:
+        raise CallbackURLError(f"callback_url host {host} does not resolve: {e}")
+    if not allowed_hosts:
+        for address in addresses:
+            ip = ipaddress.ip_address(address.split("%")[0])
+            ip = getattr(ip, "ipv4_mapped", None) or ip
+            if not ip.is_global or ip.is_multicast:
+                raise CallbackURLError(f"callback_url host {host} resolves to a non-public address ({ip})")
+    return addresses[0]
+
+
+def pin_callback_url(url: str, address: str) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+    """URL, headers and httpx request extensions that reach url's host at address without resolving it again"""
+    parsed = urlparse(url)
+    userinfo, _, host_port = parsed.netloc.rpartition("@")
+    host = f"[{address}]" if ":" in address else address
+    netloc = (f"{userinfo}@" if userinfo else "") + host + (f":{parsed.port}" if parsed.port else "")
+    # TLS still verifies the certificate against the original host name
+    extensions = {"sni_hostname": parsed.hostname} if parsed.scheme == "https" else {}
+    return parsed._replace(netloc=netloc).geturl(), {"Host": host_port}, extensions
+
+
+class TaskStore:
+    """SQLite table of tasks, shared by the API and the worker processes"""
+
+    def __init__(self, path: str = TASK_QUEUE_PATH, result_ttl: float = TASK_RESULT_TTL,
+                 max_queued: int = TASK_MAX_QUEUED):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.result_ttl = result_ttl
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+
+        # Other processes hold the write lock briefly while claiming, so wait rather than fail
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, kind TEXT NOT NULL,"
+            " status TEXT NOT NULL, payload TEXT NOT NULL, resume_pdf BLOB, callback_url TEXT,"
+            " callback_status TEXT, result TEXT, error TEXT, worker TEXT, attempts INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, seq)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_finished_at ON tasks (finished_at)")
+        self._db.commit()
+
+    def submit(self, kind: str, payload: Dict, resume_pdf: Optional[bytes] = None,
+               callback_url: Optional[str] = None) -> str:
+        """Queue a task and return its id; raises QueueFull past max_queued waiting tasks"""
+        task_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            # Finished tasks are kept for result_ttl so clients can still poll them
+            self._db.execute("DELETE FROM tasks WHERE finished_at < ?", (now - self.result_ttl,))
+            if self._count(QUEUED) >= self.max_queued:
+                self._db.commit()
+                raise QueueFull(f"{self.max_queued} tasks are already waiting")
+            self._db.execute(
+                "INSERT INTO tasks (id, kind, status, payload, resume_pdf, callback_url, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_id, kind, QUEUED, json.dumps(payload), resume_pdf, callback_url, now),
+            )
+            self._db.commit()
+        return task_id
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Atomically move the oldest queued task to running and return it, or None when the queue is empty"""
+        now = time.time()
+        with self._lock:
+            self._recover_stale(now)
+            row = self._db.execute(
+                "UPDATE tasks SET status = ?, worker = ?, started_at = ?, attempts = attempts + 1"
+                " WHERE seq = (SELECT seq FROM tasks WHERE status = ? ORDER BY seq LIMIT 1)"
+                " RETURNING id, kind, payload, resume_pdf, callback_url",
+                (RUNNING, worker, now, QUEUED),
+            ).fetchone()
+            self._db.commit()
+        if row is None:
+            return None
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "resume_pdf": row[3],
+                "callback_url": row[4]}
+
+    def _recover_stale(self, now: float):
+        """Requeue tasks whose worker stopped reporting, failing those out of attempts"""
+        self._db.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+            " error = CASE WHEN attempts >= ? THEN 'Task timed out' ELSE error END,"
+            " finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END"
+            " WHERE status = ? AND started_at < ?",
+            (TASK_MAX_ATTEMPTS, FAILED, QUEUED, TASK_MAX_ATTEMPTS, TASK_MAX_ATTEMPTS, now, RUNNING, now - TASK_TIMEOUT),
+        )
+
+    def release(self, worker: str) -> int:
+        """Put the running tasks claimed by a stopping worker back in the queue; returns how many"""
+        with self._lock:
+            # The interrupted claim does not count as an attempt
+            released = self._db.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, started_at = NULL, attempts = MAX(attempts - 1, 0)"
+                " WHERE status = ? AND worker = ?",
+                (QUEUED, RUNNING, worker),
+            ).rowcount
+            self._db.commit()
+        return released
+
+    def complete(self, task_id: str, result: Dict):
+        self._finish(task_id, SUCCEEDED, result=json.dumps(result))
+
+    def fail(self, task_id: str, error: str):
+        self._finish(task_id, FAILED, error=error)
+
+    def _finish(self, task_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            # The PDF is no longer needed once the task has run
+            self._db.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ?, finished_at = ?, resume_pdf = NULL WHERE id = ?",
+                (status, result, error, time.time(), task_id),
+            )
+            self._db.commit()
+
+    def set_callback_status(self, task_id: str, callback_status: str):
+        with self._lock:
+            self._db.execute("UPDATE tasks SET callback_status = ? WHERE id = ?", (callback_status, task_id))
+            self._db.commit()
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        """Public view of a task: status, timestamps, queue position, and the result or error"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT seq, kind, status, result, error, created_at, started_at, finished_at, callback_url,"
+                " callback_status FROM tasks WHERE id = ?",
+                (task_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            seq, kind, status, result, error, created_at, started_at, finished_at, callback_url, callback_status = row
+            task = {"task_id": task_id, "kind": kind, "status": status, "created_at": created_at,
+                    "started_at": started_at, "finished_at": finished_at}
+            if status == QUEUED:
+                task["queue_position"] = self._db.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE status = ? AND seq < ?", (QUEUED, seq)).fetchone()[0]
+        if callback_url:
+            task["callback"] = {"url": callback_url, "status": callback_status}
+        if result is not None:
+            task["result"] = json.loads(result)
+        if error is not None:
+            task["error"] = error
+        return task
+
+    def _count(self, status: str) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (status,)).fetchone()[0]
+
+    def depth(self) -> Dict[str, Any]:
+        """Tasks per status and the age of the oldest queued task"""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            oldest = self._db.execute("SELECT MIN(created_at) FROM tasks WHERE status = ?", (QUEUED,)).fetchone()[0]
+        return {
+            "by_status": {status: counts.get(status, 0) for status in STATUSES},
+            "oldest_queued_age_seconds": time.time() - oldest if oldest is not None else 0.0,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.depth(), "max_queued": self.max_queued, "path": self.path}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+async def send_callback(store: TaskStore, task_id: str, url: str):
+    """POST the final task to its callback URL, retrying with backoff, and record the outcome"""
+    task = await asyncio.to_thread(store.get, task_id)
+    # DNS may have changed since submission, so check again and connect to exactly the checked address;
+    # redirects are not followed, so this is the only host posted to
+    try:
+        address = await asyncio.to_thread(check_callback_url, url)
+    except CallbackURLError as e:
+        print(f"Task {task_id} callback rejected: {e}")
+        await asyncio.to_thread(store.set_callback_status, task_id, "rejected")
+        return
+    pinned_url, headers, extensions = pin_callback_url(url, address)
+    status = "failed"
+    async with httpx.AsyncClient(timeout=TASK_CALLBACK_TIMEOUT) as client:
+        for attempt in range(TASK_CALLBACK_RETRIES + 1):
+            try:
+                response = await client.post(pinned_url, json=task, headers=headers, extensions=extensions)
+                status = f"delivered ({response.status_code})" if response.is_success else f"failed ({response.status_code})"
+                if response.is_success or response.status_code < 500:
+                    break
+            except httpx.HTTPError as e:
+                status = f"failed ({e.__class__.__name__})"
+            if attempt < TASK_CALLBACK_RETRIES:
+                await asyncio.sleep(2 ** attempt)
+    await asyncio.to_thread(store.set_callback_status, task_id, status)
+
+
+async def execute_task(store: TaskStore, handler: TaskHandler, task: Dict):
+    try:
+        async with asyncio.timeout(TASK_TIMEOUT):
+            result = await handler(task["payload"], task["resume_pdf"])
+        await asyncio.to_thread(store.complete, task["id"], result)
+    except Exception as e:
+        # HTTPException carries a client-facing detail; anything else is described by its type
+        error = getattr(e, "detail", None) or f"{e.__class__.__name__}: {e}"
+        print(f"Task {task['id']} failed: {error}")
+        await asyncio.to_thread(store.fail, task["id"], str(error))
+    if task["callback_url"]:
+        await send_callback(store, task["id"], task["callback_url"])
+
+
+async def work(store: TaskStore, handler: TaskHandler, worker: str, concurrency: int = TASK_CONCURRENCY,
+               should_stop: Callable[[], bool] = lambda: False):
+    """Claim and run tasks, up to concurrency at a time, polling while the queue is empty.
+
+    worker must be unique among the processes sharing the queue: on exit
+    (including cancellation) the tasks still running under it are requeued.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    running = set()
+
+    def finished(job: asyncio.Task):
+        running.discard(job)
+        slots.release()
+
+    try:
+        while not should_stop():
+            await slots.acquire()
+            task = await asyncio.to_thread(store.claim, worker)
+            if task is None:
+                slots.release()
+                await asyncio.sleep(TASK_POLL_INTERVAL)
+                continue
+            job = asyncio.create_task(execute_task(store, handler, task))
+            running.add(job)
+            job.add_done_callback(finished)
+    finally:
+        for job in list(running):
+            job.cancel()
+        # Also covers a claim that completed while the loop was being cancelled
+        released = store.release(worker)
+        if released:
+            print(f"Task worker {worker} stopped, requeued {released} running tasks")
+
+
+def worker_main(path: str, handler: str, worker: str, parent_pid: int, env: Dict[str, str]):
+    """Entry point of a worker process; handler is "module:function" and is imported here.
+
+    env is applied before the handler module is imported, so it can change
+    settings that module reads at import time.
+    """
+    os.environ.update(env)
+    module_name, function_name = handler.split(":")
+    run_task = getattr(importlib.import_module(module_name), function_name)
+    store = TaskStore(path)
+    try:
+        # Exit with the API process rather than outliving it
+        asyncio.run(work(store, run_task, worker, should_stop=lambda: os.getppid() != parent_pid))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+
+class TaskWorkerPool:
+    """Worker processes consuming the task queue, spawned by the API process"""
+
+    def __init__(self, path: str, handler: str, workers: int = TASK_WORKERS, env: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.env = env or {}
+        self.processes: List[multiprocessing.Process] = []
+
+    def start(self):
+        # Spawn rather than fork: the parent holds torch threads and the event loop
+        context = multiprocessing.get_context("spawn")
+        for number in range(self.workers):
+            process = context.Process(
+                target=worker_main,
+                args=(self.path, self.handler, self.worker_name(number), os.getpid(), self.env),
+                name=f"task-worker-{number}",
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+
+    def worker_name(self, number: int) -> str:
+        # Several API processes (serve.py workers) may each run a pool on the same queue
+        return f"{os.getpid()}-worker-{number}"
+
+    def alive(self) -> int:
+        return sum(process.is_alive() for process in self.processes)
+
+    def stop(self, timeout: float = 5):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(timeout)
+        # Terminated workers cannot requeue their own tasks
+        if self.processes:
+            store = TaskStore(self.path)
+            try:
+                for number in range(len(self.processes)):
+                    store.release(self.worker_name(number))
+            finally:
+                store.close()
+        self.processes = []
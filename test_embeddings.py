@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-request embedding batcher
+"""
+import asyncio
+
+import numpy as np
+
+from embeddings import EmbeddingBatcher
+
+
+def fake_encode(texts):
+    """Deterministic stand-in for model.encode that records batch sizes"""
+    fake_encode.calls.append(len(texts))
+    return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_concurrent_requests_share_one_encode():
+    fake_encode.calls = []
+    batcher = EmbeddingBatcher(fake_encode, max_batch_size=32, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.encode(["a" * i, "job"]) for i in range(1, 6)))
+
+    results = asyncio.run(run())
+
+    assert fake_encode.calls == [10]
+    for i, vectors in enumerate(results, start=1):
+        assert vectors.shape == (2, 2)
+        assert vectors[0][0] == i
+        assert vectors[1][0] == 3
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["requests"] == 5
+    assert stats["avg_batch_size"] == 10
+
+
+def test_batch_size_cap_splits_batches():
+    fake_encode.calls = []
+    batcher = EmbeddingBatcher(fake_encode, max_batch_size=4, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.encode(["resume", "job"]) for _ in range(4)))
+
+    asyncio.run(run())
+
+    assert fake_encode.calls == [4, 4]
+    assert batcher.stats()["batch_size_histogram"]["4"] == 2
+
+
+def test_encode_errors_propagate_to_every_caller():
+    def failing_encode(texts):
+        raise RuntimeError("model unavailable")
+
+    batcher = EmbeddingBatcher(failing_encode, max_wait_ms=10)
+
+    async def run():
+        return await asyncio.gather(batcher.encode(["a"]), batcher.encode(["b"]), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent job posting vector index
+"""
+import threading
+
+import numpy as np
+import pytest
+
+import job_index
+from job_index import JobIndex
+
+
+def posting(posting_id, skills=("Python",)):
+    return {"posting_id": posting_id, "title": posting_id.title(), "job_desc": f"{posting_id} role", "skills": list(skills)}
+
+
+def random_vectors(count, dim=8, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+
+def test_search_matches_brute_force_cosine(tmp_path):
+    index = JobIndex(str(tmp_path))
+    vectors = random_vectors(50)
+    index.add([posting(f"job-{i}") for i in range(50)], vectors)
+
+    query = random_vectors(1, seed=1)[0]
+    results = index.search(query, top_k=5)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    assert [posting_id for posting_id, _ in results] == [f"job-{i}" for i in expected]
+    assert results[0][1] == pytest.approx(float(normalized[expected[0]] @ (query / np.linalg.norm(query))), rel=1e-5)
+
+
+def test_index_persists_across_reopen(tmp_path):
+    index = JobIndex(str(tmp_path), dtype="float16")
+    vectors = random_vectors(3)
+    index.add([posting("a"), posting("b"), posting("c", ["Go"])], vectors)
+    index.close()
+
+    reopened = JobIndex(str(tmp_path), dtype="float16")
+    assert len(reopened) == 3
+    assert reopened.search(vectors[2], top_k=1)[0][0] == "c"
+    assert reopened.get(["c"])["c"]["skills"] == ["Go"]
+
+
+def test_delete_and_replace(tmp_path):
+    index = JobIndex(str(tmp_path))
+    vectors = random_vectors(3)
+    index.add([posting("a"), posting("b"), posting("c")], vectors)
+
+    assert index.delete("b")
+    assert not index.delete("b")
+    assert "b" not in [posting_id for posting_id, _ in index.search(vectors[1], top_k=3)]
+
+    # Re-adding an id replaces the old vector
+    index.add([posting("a")], vectors[2:3])
+    assert len(index) == 2
+    assert index.search(vectors[2], top_k=2)[0][1] == pytest.approx(1.0, rel=1e-5)
+
+
+def test_growth_and_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_index, "INITIAL_CAPACITY", 4)
+    index = JobIndex(str(tmp_path))
+    vectors = random_vectors(10)
+    index.add([posting(f"job-{i}") for i in range(10)], vectors)
+    assert index.stats()["capacity"] >= 10
+
+    for i in range(6):
+        index.delete(f"job-{i}")
+    assert index.stats()["rows"] == 4
+    assert index.search(vectors[9], top_k=1)[0][0] == "job-9"
+
+    reopened = JobIndex(str(tmp_path))
+    assert sorted(reopened._rows) == [f"job-{i}" for i in range(6, 10)]
+    assert reopened.search(vectors[7], top_k=1)[0][0] == "job-7"
+
+
+def test_two_handles_see_each_others_writes(tmp_path, monkeypatch):
+    # Two handles on one directory behave like two serve.py workers
+    monkeypatch.setattr(job_index, "INITIAL_CAPACITY", 4)
+    first, second = JobIndex(str(tmp_path)), JobIndex(str(tmp_path))
+    vectors = random_vectors(8)
+    first.add([posting("a"), posting("b")], vectors[:2])
+    assert second.search(vectors[1], top_k=1)[0][0] == "b"
+
+    # Writes from the second handle take rows after the first's and grow the shared matrix
+    second.add([posting(f"job-{i}") for i in range(6)], vectors[2:])
+    assert len(second) == 8
+    assert first.search(vectors[7], top_k=1)[0][0] == "job-5"
+    first.delete("job-5")
+    assert "job-5" not in dict(second.search(vectors[7], top_k=8))
+
+
+def test_model_mismatch_is_refused_and_rebuild_reembeds(tmp_path):
+    index = JobIndex(str(tmp_path), model_id="model-a")
+    index.add([posting("a"), posting("b", ["Go"])], random_vectors(2))
+    index.close()
+
+    with pytest.raises(job_index.JobIndexModelMismatch):
+        JobIndex(str(tmp_path), model_id="model-b")
+    # The same model reopens fine
+    JobIndex(str(tmp_path), model_id="model-a").close()
+
+    encoded = []
+
+    def encode(texts):
+        encoded.extend(texts)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    rebuilt = JobIndex.rebuild(str(tmp_path), "float32", "model-b", encode)
+    assert encoded == ["a role", "b role"]
+    assert (len(rebuilt), rebuilt.dim, rebuilt.stats()["model_id"]) == (2, 4, "model-b")
+    assert rebuilt.get(["b"])["b"]["skills"] == ["Go"]
+    assert [posting_id for posting_id, _ in rebuilt.search(np.ones(4), top_k=2)] in (["a", "b"], ["b", "a"])
+    rebuilt.close()
+
+    JobIndex(str(tmp_path), model_id="model-b").close()
+    with pytest.raises(job_index.JobIndexModelMismatch):
+        JobIndex(str(tmp_path), model_id="model-a")
+
+
+def test_len_and_contains_see_other_handles_writes(tmp_path):
+    reader = JobIndex(str(tmp_path))
+    writer = JobIndex(str(tmp_path))
+    assert len(reader) == 0 and "a" not in reader
+
+    writer.add([posting("a"), posting("b")], random_vectors(2))
+    assert len(reader) == 2 and "a" in reader
+
+    writer.delete("a")
+    assert len(reader) == 1 and "a" not in reader
+    reader.close()
+    writer.close()
+
+
+def test_endpoints_open_and_rebuild_the_index_off_the_event_loop(client, tmp_path, monkeypatch):
+    import main
+
+    stale = JobIndex(str(tmp_path), model_id="old-model")
+    stale.add([posting("python-dev")], random_vectors(1, dim=3))
+    stale.close()
+
+    threads = []
+
+    class RecordingIndex(JobIndex):
+        def __init__(self, directory=str(tmp_path), dtype="float32", model_id=None):
+            threads.append(threading.current_thread().name)
+            super().__init__(directory, dtype, model_id)
+
+    monkeypatch.setattr(main, "JobIndex", RecordingIndex)
+    monkeypatch.setattr(main, "JOB_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "job_index", None)
+    try:
+        response = client.post("/job-postings/search", data={"resume_text": "python developer"})
+        assert response.status_code == 200
+        # Re-embedded with the current (stub) model, on a worker thread
+        assert response.json()["total_postings"] == 1
+        assert response.json()["results"][0]["posting_id"] == "python-dev"
+        assert main.job_index.dim == 10
+        assert len(threads) == 2 and all(name.startswith("resume-worker") for name in threads)
+    finally:
+        if main.job_index is not None:
+            main.job_index.close()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the store of analyzed job descriptions and its shared SQLite tier
+"""
+import os
+
+import numpy as np
+import pytest
+
+import cache
+from job_store import JobAnalysis, JobStore, make_job_id
+
+
+def job(job_desc="Python developer with AWS"):
+    return JobAnalysis(make_job_id(job_desc), job_desc, ["Python", "AWS"], {"entities": [], "noun_chunks": []},
+                       np.array([0.6, 0.8], dtype=np.float32))
+
+
+def test_memory_only_store_is_per_instance():
+    store = JobStore()
+    store.add(job())
+    assert store.get(job().job_id).skills == ["Python", "AWS"]
+    assert store.stats()["disk"] is None
+    assert JobStore().get(job().job_id) is None
+
+
+def test_disk_tier_is_shared_between_stores(tmp_path):
+    # Two stores on one path behave like two serve.py workers
+    path = str(tmp_path / "jobs.sqlite")
+    first, second = JobStore(path=path), JobStore(path=path)
+    first.add(job())
+
+    restored = second.get(job().job_id)
+    assert restored.job_desc == "Python developer with AWS"
+    assert restored.features == {"entities": [], "noun_chunks": []}
+    np.testing.assert_array_equal(restored.embedding, job().embedding)
+
+    assert second.remove(job().job_id)
+    assert first.get(job().job_id) is not None  # still in its memory tier
+    assert JobStore(path=path).get(job().job_id) is None
+
+
+def test_disk_entries_are_scoped_to_the_embedding_model(tmp_path):
+    # A worker started after a model change shares the file but not the old vectors
+    path = str(tmp_path / "jobs.sqlite")
+    JobStore(path=path, model_id="model-a").add(job())
+
+    assert JobStore(path=path, model_id="model-a").get(job().job_id) is not None
+    store = JobStore(path=path, model_id="model-b")
+    assert store.get(job().job_id) is None
+    assert not store.remove(job().job_id)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_opens_its_own_connection(tmp_path):
+    store = JobStore(path=str(tmp_path / "jobs.sqlite"))
+    pid = os.fork()
+    if pid == 0:
+        try:
+            store.add(job())
+            os._exit(0)
+        except BaseException:
+            os._exit(1)
+    assert os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) == 0
+    assert store.get(job().job_id).skills == ["Python", "AWS"]
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    store = JobStore(ttl=60, path="")
+    store.add(job())
+    now[0] += 59
+    assert store.get(job().job_id) is not None
+    now[0] += 2
+    assert store.get(job().job_id) is None
+
+
+def test_least_recently_used_job_is_evicted():
+    store = JobStore(max_entries=2, path="")
+    first, second, third = job("Python developer"), job("AWS engineer"), job("Data analyst")
+    store.add(first)
+    store.add(second)
+    store.get(first.job_id)
+    store.add(third)
+    assert store.get(second.job_id) is None
+    assert store.get(first.job_id) is not None and store.get(third.job_id) is not None
+    assert store.stats()["evictions"] == 1
+
+
+def test_tailoring_endpoints_resolve_a_registered_job_id(client):
+    registered = client.post("/jobs", data={"job_desc": "Python developer with AWS and Docker"}).json()
+    assert registered["job_id"] == make_job_id("Python developer with AWS and Docker")
+    assert set(registered["job_skills"]) >= {"Python", "AWS", "Docker"}
+    assert client.get(f"/jobs/{registered['job_id']}").json()["job_skills"] == registered["job_skills"]
+
+    form = {"resume_text": "Backend engineer. Python and AWS on Linux.", "job_id": registered["job_id"],
+            "use_cache": "false"}
+    by_id = client.post("/tailor-resume-text", data=form).json()
+    inline = client.post("/tailor-resume-text", data={**form, "job_id": "",
+                                                      "job_desc": "Python developer with AWS and Docker"}).json()
+    assert by_id["missing_skills"] == inline["missing_skills"] == ["Docker"]
+    assert by_id["similarity_score"] == pytest.approx(inline["similarity_score"])
+
+    assert client.post("/tailor-resume-text", data={**form, "job_id": "0" * 16}).status_code == 404
+    assert client.get("/jobs/" + "0" * 16).status_code == 404
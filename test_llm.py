@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the async OpenAI client against a local stub server
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import asyncio
+import json
+
+import pytest
+
+import llm
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers /chat/completions with a canned reply after scripted failures"""
+
+    failures_before_success = 0
+    delay = 0.0
+    calls = 0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        StubOpenAIHandler.calls += 1
+
+        if StubOpenAIHandler.calls <= StubOpenAIHandler.failures_before_success:
+            self.send_response(503)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"error": {"message": "overloaded"}}')
+            return
+
+        if StubOpenAIHandler.delay:
+            threading.Event().wait(StubOpenAIHandler.delay)
+
+        if request.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for piece in ["Rewritten", " resume", None]:
+                delta = {"content": piece} if piece else {}
+                chunk = {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": 0,
+                    "model": "stub",
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None if piece else "stop"}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+
+        body = json.dumps({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "stub",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": "  Rewritten resume  "},
+            }],
+        }).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    StubOpenAIHandler.failures_before_success = 0
+    StubOpenAIHandler.delay = 0.0
+    StubOpenAIHandler.calls = 0
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setattr(llm, "LLM_BACKOFF_BASE", 0.01)
+    llm._client = None
+    llm._semaphore = None
+
+    yield StubOpenAIHandler
+
+    server.shutdown()
+    server.server_close()
+
+
+async def _complete(**kwargs):
+    try:
+        return await llm.chat_completion([{"role": "user", "content": "hi"}], **kwargs)
+    finally:
+        await llm.close_client()
+
+
+def test_chat_completion_returns_stripped_content(stub_server):
+    assert asyncio.run(_complete()) == "Rewritten resume"
+    assert stub_server.calls == 1
+
+
+def test_chat_completion_retries_transient_errors(stub_server):
+    stub_server.failures_before_success = 2
+    assert asyncio.run(_complete()) == "Rewritten resume"
+    assert stub_server.calls == 3
+
+
+def test_chat_completion_gives_up_after_max_retries(stub_server, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_MAX_RETRIES", 1)
+    stub_server.failures_before_success = 5
+    with pytest.raises(llm.InternalServerError):
+        asyncio.run(_complete())
+    assert stub_server.calls == 2
+
+
+def test_chat_completion_enforces_deadline(stub_server):
+    stub_server.delay = 1.0
+    with pytest.raises(TimeoutError):
+        asyncio.run(_complete(deadline=0.2))
+
+
+async def _stream(**kwargs):
+    try:
+        return [piece async for piece in llm.stream_chat_completion([{"role": "user", "content": "hi"}], **kwargs)]
+    finally:
+        await llm.close_client()
+
+
+def test_stream_chat_completion_yields_deltas(stub_server):
+    assert asyncio.run(_stream()) == ["Rewritten", " resume"]
+
+
+def test_stream_chat_completion_retries_before_first_token(stub_server):
+    stub_server.failures_before_success = 1
+    assert asyncio.run(_stream()) == ["Rewritten", " resume"]
+    assert stub_server.calls == 2
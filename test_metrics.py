@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for per-stage timing, Server-Timing headers and pipeline counters
+"""
+import subprocess
+import asyncio
+import sys
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import metrics
+
+
+def stage_count(stage: str) -> float:
+    return REGISTRY.get_sample_value("resume_stage_seconds_count", {"stage": stage}) or 0.0
+
+
+def test_timed_records_stage_even_on_error():
+    before = stage_count("test_failing")
+    try:
+        with metrics.timed("test_failing"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert stage_count("test_failing") == before + 1
+
+
+def test_server_timing_header_lists_request_stages():
+    app = FastAPI()
+    app.add_middleware(metrics.ServerTimingMiddleware)
+
+    @app.get("/work")
+    async def work():
+        await asyncio.gather(metrics.timed_call("skills", asyncio.sleep(0)),
+                             metrics.timed_call("embedding", asyncio.sleep(0)))
+        with metrics.timed("skills"):
+            pass
+        return {}
+
+    header = TestClient(app).get("/work").headers["server-timing"]
+    stages = [entry.split(";")[0] for entry in header.split(", ")]
+    assert stages == ["skills", "embedding", "total"]
+
+
+def test_stages_outside_a_request_only_reach_the_histogram():
+    with metrics.timed("background"):
+        pass
+    assert metrics._request_timings.get() is None
+
+
+def test_counters_are_exported():
+    metrics.record_fallback(TimeoutError())
+    metrics.record_cache_lookup("rewrite", True)
+    body, content_type = metrics.render_metrics()
+    assert content_type.startswith("text/plain")
+    assert b'resume_llm_fallbacks_total{reason="TimeoutError"}' in body
+    assert b'resume_cache_lookups_total{cache="rewrite",result="hit"}' in body
+
+
+def run_in_worker(code: str, metrics_dir) -> str:
+    """Run code in a fresh interpreter in multiprocess mode, as a serve.py worker would"""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(metrics_dir)}
+    return subprocess.run([sys.executable, "-c", "import metrics\n" + code], env=env, cwd=os.path.dirname(__file__),
+                          capture_output=True, text=True, check=True).stdout
+
+
+def test_multiprocess_metrics_sum_over_workers(tmp_path):
+    for _ in range(2):
+        run_in_worker("metrics.record_stage('multi', 0.01)\nmetrics.record_queue_depth("
+                      "{'by_status': {'queued': 3}, 'oldest_queued_age_seconds': 1.5})", tmp_path)
+
+    # A third process (the one answering the scrape) reports samples recorded by the others
+    body = run_in_worker("print(metrics.render_metrics()[0].decode())", tmp_path)
+    assert 'resume_stage_seconds_count{stage="multi"} 2.0' in body
+    assert 'resume_task_queue_depth{status="queued"} 3.0' in body
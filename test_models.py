@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for embedding backend selection
+"""
+from types import SimpleNamespace
+import subprocess
+import sys
+import os
+
+import pytest
+
+import models
+
+
+def import_models(**env) -> subprocess.CompletedProcess:
+    """Import models in a fresh interpreter, since the backend is read at import time"""
+    environment = {key: value for key, value in os.environ.items() if not key.startswith("EMBEDDING_")}
+    return subprocess.run([sys.executable, "-c", "import models; print(models.EMBEDDING_MODEL_ID)"],
+                          env={**environment, **env}, cwd=os.path.dirname(os.path.abspath(__file__)),
+                          capture_output=True, text=True)
+
+
+def test_unknown_backend_is_rejected_at_import():
+    result = import_models(EMBEDDING_BACKEND="tensorflow")
+    assert result.returncode != 0
+    assert "EMBEDDING_BACKEND must be one of torch, onnx, onnx-int8" in result.stderr
+
+
+@pytest.mark.parametrize("backend, model_id", [
+    ("torch", "org/model"),
+    ("onnx", "org/model@onnx"),
+    ("onnx-int8", "org/model@onnx-int8"),
+])
+def test_model_id_names_the_backend(backend, model_id):
+    # Caches and job indexes are keyed by the id, so each backend's vectors stay apart
+    result = import_models(EMBEDDING_MODEL="org/model", EMBEDDING_BACKEND=backend)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == model_id
+
+
+@pytest.fixture
+def sentence_transformers(monkeypatch):
+    """A stand-in sentence_transformers module recording how models are constructed"""
+    loads = []
+
+    def SentenceTransformer(name, **kwargs):
+        loads.append((name, kwargs))
+        # A repository without published int8 weights
+        if name == "no/int8":
+            raise OSError("onnx/model_qint8_avx2.onnx not found")
+        return SimpleNamespace(name=name)
+
+    module = SimpleNamespace(SentenceTransformer=SentenceTransformer, loads=loads)
+    monkeypatch.setitem(sys.modules, "sentence_transformers", module)
+    monkeypatch.setattr(models, "EMBEDDING_THREADS", 0)
+    monkeypatch.setattr(models, "EMBEDDING_ONNX_FILE", "")
+    return module
+
+
+def test_backends_load_their_weights(sentence_transformers):
+    models.load_embedding_model("org/model", "torch")
+    models.load_embedding_model("org/model", "onnx")
+    models.load_embedding_model("org/model", "onnx-int8")
+
+    assert sentence_transformers.loads == [
+        ("org/model", {}),
+        ("org/model", {"backend": "onnx", "device": "cpu", "model_kwargs": {"file_name": "onnx/model.onnx"}}),
+        ("org/model", {"backend": "onnx", "device": "cpu",
+                       "model_kwargs": {"file_name": "onnx/model_qint8_avx2.onnx"}}),
+    ]
+
+
+def test_int8_weights_are_exported_when_missing(sentence_transformers, monkeypatch):
+    monkeypatch.setattr(models, "EMBEDDING_QUANTIZATION", "avx2")
+    monkeypatch.setattr(models, "export_int8_model", lambda name: f"exported/{name.replace('/', '--')}")
+    model = models.load_embedding_model("no/int8", "onnx-int8")
+
+    assert model.name == "exported/no--int8"
+    assert sentence_transformers.loads[-1][1]["model_kwargs"] == {"file_name": "onnx/model_qint8_avx2.onnx"}
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for single-parse PDF text extraction
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pdf_extract
+from benchmarks.corpus import make_pdf
+
+
+def test_extracts_pages_in_order():
+    data = make_pdf(["Page one\nPython developer", "", "Page three"])
+    assert pdf_extract.extract_text(data) == "Page one\nPython developer\nPage three"
+
+
+def test_parallel_extraction_matches_serial(monkeypatch):
+    monkeypatch.setattr(pdf_extract, "PDF_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(pdf_extract, "PDF_PAGES_PER_TASK", 3)
+    data = make_pdf([f"Page {number}" for number in range(10)])
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert pdf_extract.extract_text(data, executor=executor) == pdf_extract.extract_text(data)
+
+
+def test_pages_beyond_cap_are_ignored():
+    data = make_pdf([f"Page {number}" for number in range(5)])
+    assert pdf_extract.extract_text(data, max_pages=2) == "Page 0\nPage 1"
+
+
+def test_image_only_pdf_fails_on_sampled_pages(monkeypatch):
+    extracted = []
+    original = pdf_extract.extract_pages
+    monkeypatch.setattr(pdf_extract, "extract_pages",
+                        lambda reader, start, stop: extracted.append((start, stop)) or original(reader, start, stop))
+
+    with pytest.raises(pdf_extract.ImageOnlyPDFError):
+        pdf_extract.extract_text(make_pdf([""] * 20))
+    assert extracted == [(0, pdf_extract.PDF_SAMPLE_PAGES)]
+
+
+def test_garbage_is_not_reported_as_password_protected():
+    with pytest.raises(Exception) as excinfo:
+        pdf_extract.extract_text(b"not a pdf")
+    assert not isinstance(excinfo.value, pdf_extract.EncryptedPDFError)
+
+
+def test_page_limit_is_checked_before_extraction(monkeypatch):
+    monkeypatch.setattr(pdf_extract, "extract_pages", lambda *args: pytest.fail("pages were extracted"))
+    with pytest.raises(pdf_extract.PageLimitError):
+        pdf_extract.extract_text(make_pdf(["Page"] * 6), page_limit=5)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the dependency-driven analysis pipeline
+"""
+import asyncio
+
+import pytest
+
+from pipeline import AnalysisPipeline
+
+
+def sleeping_pipeline(cancelled=None):
+    pipeline = AnalysisPipeline()
+
+    @pipeline.stage("job")
+    async def job(run):
+        await asyncio.sleep(0.05)
+        return "job"
+
+    @pipeline.stage("resume")
+    async def resume(run):
+        await asyncio.sleep(0.01)
+        return run.inputs["text"]
+
+    @pipeline.stage("skills", after=("resume",))
+    async def skills(run):
+        await asyncio.sleep(0.01)
+        return [run["resume"]]
+
+    @pipeline.stage("embedding", after=("resume",))
+    async def embedding(run):
+        try:
+            await asyncio.sleep(0.02)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append("embedding")
+            raise
+        return [0.0]
+
+    @pipeline.stage("rewrite", after=("skills", "job"))
+    async def rewrite(run):
+        if run.inputs.get("fail"):
+            raise ValueError("rewrite failed")
+        return f"{run['job']}:{run['skills'][0]}"
+
+    return pipeline
+
+
+def test_independent_stages_overlap():
+    pipeline = sleeping_pipeline()
+    run = asyncio.run(pipeline.run(text="cv"))
+    report = run.report(pipeline.dependencies)
+
+    assert run["rewrite"] == "job:cv"
+    # Wall clock follows the longest chain (job), not the sum of the stages
+    assert report["wall_ms"] < report["sum_of_stages_ms"]
+    assert report["wall_ms"] < 90
+    assert report["critical_path"] == ["job", "rewrite"]
+    assert report["stages"]["skills"]["start_ms"] < report["stages"]["job"]["duration_ms"]
+
+
+def test_failure_cancels_remaining_stages():
+    cancelled = []
+    pipeline = sleeping_pipeline(cancelled)
+
+    @pipeline.stage("broken", after=("resume",))
+    async def broken(run):
+        raise RuntimeError("broken stage")
+
+    with pytest.raises(RuntimeError, match="broken stage"):
+        asyncio.run(pipeline.run(text="cv"))
+    assert cancelled == ["embedding"]
+
+
+def test_stage_error_propagates():
+    with pytest.raises(ValueError, match="rewrite failed"):
+        asyncio.run(sleeping_pipeline().run(text="cv", fail=True))
+
+
+def test_dependencies_must_be_registered_first():
+    pipeline = AnalysisPipeline()
+    with pytest.raises(ValueError):
+        pipeline.stage("rewrite", after=("skills",))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for boilerplate pruning and the token budget of the rewrite prompt
+"""
+import asyncio
+
+import numpy as np
+
+from prompt_builder import (count_tokens, fit_prompt_inputs, prune_job_boilerplate, prune_resume_boilerplate,
+                            truncate_to_tokens)
+
+RESUME = """Jane Doe
+jane@email.com | (555) 123-4567
+
+Summary
+Backend engineer building Python services on AWS.
+
+Experience
+Software Engineer | Tech Corp | 2019 - 2024
+- Built Python APIs deployed on AWS Lambda
+- Cut p95 latency by 40% with Redis caching
+
+Jane Doe - Resume
+Page 2 of 2
+
+Projects
+- Painted a mural for the community garden
+- Organized the office book club
+
+Skills
+Python, AWS, Redis, Docker
+
+References available upon request"""
+
+JOB = """Backend Engineer
+
+Requirements:
+- Python and AWS
+- Redis and Docker
+
+Benefits:
+- Health insurance
+- Unlimited PTO
+
+We are an equal opportunity employer."""
+
+
+class KeywordEmbedder:
+    """Embeds texts mentioning Python or AWS near the job vector, Docker further off and everything else orthogonal"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(texts)
+        return [np.array([1.0, 0.1]) if ("Python" in text or "AWS" in text) else
+                np.array([0.5, 1.0]) if "Docker" in text else np.array([0.0, 1.0]) for text in texts]
+
+
+def fit(budget, embedder, resume=RESUME, job=JOB):
+    return asyncio.run(fit_prompt_inputs(resume, job, 100, embedder, np.array([1.0, 0.0]), budget=budget))
+
+
+def test_boilerplate_is_pruned():
+    resume = prune_resume_boilerplate(RESUME + "\nJane Doe - Resume\n3")
+    assert "Page 2" not in resume and "References" not in resume
+    assert resume.count("Jane Doe - Resume") == 1
+    assert "Cut p95 latency" in resume
+
+    job = prune_job_boilerplate(JOB)
+    assert job == "Backend Engineer\n\nRequirements:\n- Python and AWS\n- Redis and Docker"
+
+
+def test_repeated_titles_and_bullets_are_kept():
+    resume = """Jane Doe
+
+Experience
+Software Engineer
+Tech Corp | 2021 - 2024
+- Wrote unit tests
+- Built Python APIs
+
+Software Engineer
+Startup Inc | 2018 - 2021
+- Wrote unit tests
+- Shipped the billing service"""
+    assert prune_resume_boilerplate(resume) == resume
+
+    # Paginated, with a running header on each page: only the header's repeats go
+    pages = resume.split("\n\nSoftware Engineer\nStartup")
+    paginated = f"Jane Doe - Resume\n{pages[0]}\nPage 1 of 2\nJane Doe - Resume\nSoftware Engineer\nStartup{pages[1]}\nPage 2 of 2"
+    pruned = prune_resume_boilerplate(paginated)
+    assert pruned.count("Jane Doe - Resume") == 1 and "Page" not in pruned
+    assert pruned.count("Software Engineer") == 2 and pruned.count("- Wrote unit tests") == 2
+
+
+def test_within_budget_only_boilerplate_goes():
+    embedder = KeywordEmbedder()
+    inputs = fit(10000, embedder)
+    assert embedder.calls == []
+    assert "Painted a mural" in inputs.resume_text
+    assert inputs.saved_tokens > 0
+    assert inputs.tokens == 100 + count_tokens(inputs.resume_text) + count_tokens(inputs.job_desc)
+
+
+def test_least_relevant_sections_are_dropped_first():
+    embedder = KeywordEmbedder()
+    full = fit(10000, embedder)
+    projects = count_tokens("Projects\n- Painted a mural for the community garden\n- Organized the office book club")
+    inputs = fit(full.tokens - projects, embedder)
+
+    assert inputs.dropped_sections == ["projects"]
+    assert "Painted a mural" not in inputs.resume_text
+    # The contact block is never ranked, and the kept sections stay in order
+    assert embedder.calls and not any("jane@email.com" in text for text in embedder.calls[0])
+    assert inputs.resume_text.startswith("Jane Doe\njane@email.com")
+    assert inputs.resume_text.index("Summary") < inputs.resume_text.index("Experience")
+    assert inputs.tokens <= full.tokens - projects
+
+
+def test_small_sections_dropped_before_a_large_one_come_back():
+    projects = "\n".join(f"- Containerized service {i} with Docker" for i in range(40))
+    resume = f"Jane Doe\n\nAwards\n- Hackathon winner\n\nProjects\n{projects}\n\nSkills\nPython, AWS"
+    embedder = KeywordEmbedder()
+    full = fit(10000, embedder, resume=resume)
+    inputs = fit(full.tokens - count_tokens(projects) // 2, embedder, resume=resume)
+    assert inputs.dropped_sections == ["projects"]
+    assert "Hackathon winner" in inputs.resume_text
+
+
+def test_tight_budget_truncates_to_fit():
+    inputs = fit(130, KeywordEmbedder())
+    assert inputs.tokens <= 130
+    assert inputs.resume_text.startswith("Jane Doe")
+    assert truncate_to_tokens("one\ntwo\nthree", count_tokens("one\ntwo\n")) == "one\ntwo"
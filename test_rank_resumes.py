@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk ranking over POST /rank-resumes, with stub models
+"""
+import json
+
+import main
+
+JOB = "Python developer with AWS, Docker and Kubernetes"
+# Closest to the job by embedding, but only one of its four skills
+SIMILAR = "python python python python python"
+# Every skill of the job, buried in unrelated words
+SKILLED = "Python AWS Docker Kubernetes sales sales sales sales sales sales marketing marketing marketing marketing"
+
+
+def rank(client, texts, files=(), **form):
+    response = client.post("/rank-resumes", data={"resume_texts": texts, "job_desc": JOB, **form},
+                           files=list(files))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_per_item_errors_do_not_fail_the_batch(client):
+    lines = rank(client, [SIMILAR, "   ", SKILLED], files=[("resumes", ("broken.pdf", b"not a pdf", "application/pdf"))])
+
+    errors = {line["id"]: line for line in lines if line["type"] == "error"}
+    results = {line["id"]: line for line in lines if line["type"] == "result"}
+    # Uploads are numbered before texts
+    assert set(errors) == {0, 2} and set(results) == {1, 3}
+    assert errors[0]["filename"] == "broken.pdf"
+    assert errors[2]["detail"] == "Resume text is empty"
+
+    ranking = lines[-1]
+    assert ranking["type"] == "ranking"
+    assert (ranking["total"], ranking["scored"]) == (4, 2)
+    assert sorted(entry["id"] for entry in ranking["ranking"]) == [1, 3]
+
+
+def test_chunks_cover_every_resume_exactly_once(client, monkeypatch):
+    chunk_sizes = []
+    rank_chunk = main.rank_resume_chunk
+
+    async def recording_rank_chunk(chunk, *args, **kwargs):
+        chunk_sizes.append(len(chunk))
+        return await rank_chunk(chunk, *args, **kwargs)
+
+    monkeypatch.setattr(main, "BULK_CHUNK_SIZE", 2)
+    monkeypatch.setattr(main, "rank_resume_chunk", recording_rank_chunk)
+    texts = [f"Python developer number {i}" for i in range(4)] + [SKILLED]
+    lines = rank(client, texts)
+
+    assert sorted(chunk_sizes) == [1, 2, 2]
+    assert sorted(line["id"] for line in lines if line["type"] == "result") == [0, 1, 2, 3, 4]
+    assert [line["type"] for line in lines].count("ranking") == 1 and lines[-1]["type"] == "ranking"
+
+
+def test_rank_by_skills_reorders_the_final_ranking(client):
+    by_similarity = rank(client, [SKILLED, SIMILAR])[-1]
+    by_skills = rank(client, [SKILLED, SIMILAR], rank_by="skills")[-1]
+
+    assert [entry["id"] for entry in by_similarity["ranking"]] == [1, 0]
+    assert [entry["id"] for entry in by_skills["ranking"]] == [0, 1]
+    assert by_skills["rank_by"] == "skills"
+    assert [entry["rank"] for entry in by_skills["ranking"]] == [1, 2]
+
+    top = by_skills["ranking"][0]
+    assert top["skill_match_percentage"] == 100
+    assert top["similarity_score"] < by_skills["ranking"][1]["similarity_score"]
+
+
+def test_final_ranking_line(client):
+    registered = client.post("/jobs", data={"job_desc": JOB}).json()
+    lines = rank(client, [SIMILAR, SKILLED], fields="similarity_score")
+
+    results = [line for line in lines if line["type"] == "result"]
+    assert all(set(line) == {"type", "id", "filename", "similarity_score"} for line in results)
+
+    ranking = lines[-1]
+    assert ranking["job_id"] == registered["job_id"]
+    assert ranking["rank_by"] == "similarity"
+    scores = [entry["similarity_score"] for entry in ranking["ranking"]]
+    assert scores == sorted(scores, reverse=True)
+    assert set(ranking["ranking"][0]) == {"rank", "id", "filename", "similarity_score", "skill_match_percentage"}
+
+
+def test_invalid_requests_are_rejected_before_streaming(client):
+    assert client.post("/rank-resumes", data={"job_desc": JOB}).status_code == 400
+    assert client.post("/rank-resumes", data={"resume_texts": [SIMILAR], "job_desc": JOB,
+                                              "rank_by": "salary"}).status_code == 400
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the /ready readiness probe and the /health liveness probe around model warm-up
+"""
+import asyncio
+
+import pytest
+
+import main
+from models import Readiness
+
+
+@pytest.fixture
+def readiness(monkeypatch):
+    """A fresh readiness state, as in a server that has just started"""
+    state = Readiness()
+    monkeypatch.setattr(main, "readiness", state)
+    return state
+
+
+def test_not_ready_before_warm_up_but_live(client, readiness):
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up" and response.json()["ready"] is False
+
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["status"] == "healthy" and health.json()["ready"] is False
+
+
+def test_ready_after_warm_up(client, readiness):
+    asyncio.run(main.warm_up_models())
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready" and body["error"] is None
+    assert set(body["stages"]) == {"embedding_model", "spacy"}
+    assert body["warmup_seconds"] >= 0
+    assert client.get("/health").json()["ready"] is True
+
+
+def test_failed_warm_up_is_reported(client, readiness, monkeypatch):
+    def broken_model():
+        raise OSError("model files missing")
+
+    monkeypatch.setattr(main, "get_model", broken_model)
+    asyncio.run(main.warm_up_models())
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert response.json()["error"] == "OSError: model files missing"
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for field projection, compact results and negotiated compression
+"""
+import gzip
+import json
+import zlib
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import responses
+from responses import CompressionMiddleware, choose_encoding, json_line, parse_fields, project
+
+RESULT = {
+    "similarity_score": 0.82,
+    "resume_text": "Jane Doe, Python engineer",
+    "job_desc": "Python developer",
+    "job_skills": ["Python", "AWS"],
+    "missing_skills": ["AWS"],
+    "analysis": {"total_job_skills": 2, "skill_match_percentage": 50.0},
+}
+
+
+def test_projection_keeps_requested_and_nested_fields():
+    fields = parse_fields("similarity_score, analysis.skill_match_percentage,unknown")
+    assert project(RESULT, fields) == {"similarity_score": 0.82, "analysis": {"skill_match_percentage": 50.0}}
+    assert project({"type": "result", "id": 3, **RESULT}, fields, keep=("type", "id"))["id"] == 3
+    assert parse_fields(" ") is None
+    with pytest.raises(ValueError):
+        parse_fields("analysis..score")
+
+
+def test_compact_drops_echoed_inputs_unless_fields_are_given():
+    compact = project(RESULT, compact=True)
+    assert "resume_text" not in compact and "job_desc" not in compact and "job_skills" not in compact
+    assert compact["missing_skills"] == ["AWS"]
+    assert project(RESULT, parse_fields("job_desc"), compact=True) == {"job_desc": "Python developer"}
+    assert project(RESULT) is RESULT
+
+
+def test_encoding_negotiation():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.8") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+    # An explicit q=0 excludes a coding even when "*" accepts the rest
+    assert choose_encoding("*, br;q=0") == "gzip"
+    assert choose_encoding("*, br;q=0, gzip;q=0") is None
+    assert choose_encoding("*;q=0") is None
+
+
+def compressing_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    async def large():
+        return responses.json_response({"rows": [RESULT] * 50})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    return app
+
+
+def test_large_bodies_are_compressed_as_negotiated():
+    client = TestClient(compressing_app())
+    # Decoded by hand, so the raw stream is requested
+    raw = client.get("/large", headers={"Accept-Encoding": "br"})
+    assert raw.headers["content-encoding"] == "br"
+    assert raw.headers["vary"] == "Accept-Encoding"
+
+    for encoding, decompress in (("br", brotli.decompress), ("gzip", gzip.decompress)):
+        with client.stream("GET", "/large", headers={"Accept-Encoding": encoding}) as response:
+            body = b"".join(response.iter_raw())
+        assert response.headers["content-encoding"] == encoding
+        assert json.loads(decompress(body))["rows"][0] == RESULT
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_streamed_chunks_decode_as_they_arrive():
+    # Each chunk of a stream must be decodable on its own, before the stream ends
+    for responder, decompress in ((responses.GzipResponder(None, 0), zlib.decompressobj(31).decompress),
+                                  (responses.BrotliResponder(None, 0), brotli.Decompressor().process)):
+        for i in range(3):
+            line = json_line({"id": i})
+            assert decompress(responder.apply_compression(line, more_body=True)) == line
+        decompress(responder.apply_compression(b"", more_body=False))
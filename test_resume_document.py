@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass resume document model
+"""
+from resume_document import classify_header, parse_resume, split_sections
+
+RESUME = """
+Jane Roe
+jane.roe@email.com | (555) 987-6543
+github.com/janeroe
+
+PROFESSIONAL SUMMARY
+Backend engineer focused on APIs.
+
+Work Experience
+Senior Engineer | Acme Corp | 2020 - Present
+• Built services with the Django framework
+• Worked on Python data pipelines
+Developer at Northwind
+- Used SQL daily
+
+Education
+B.Sc. Computer Science, 2016
+
+Technical Skills
+Python, SQL, Docker
+"""
+
+
+def test_headers_and_sections():
+    doc = parse_resume(RESUME)
+    assert sorted(set(doc.headers.values())) == ["education", "experience", "skills", "summary"]
+    assert doc.section_lines("summary") == ["Backend engineer focused on APIs."]
+    assert doc.section_lines("education") == ["B.Sc. Computer Science, 2016"]
+    assert doc.education == ["B.Sc. Computer Science, 2016"]
+    assert doc.section_lines("other")[0] == "Jane Roe"
+
+
+def test_bullets_mentioning_work_are_not_headers():
+    assert classify_header("• Worked on Python data pipelines") is None
+    assert classify_header("Built services with the Django framework") is None
+    assert classify_header("Professional Experience") == "experience"
+    assert classify_header("SKILLS:") == "skills"
+
+
+def test_experience_entries():
+    entries = parse_resume(RESUME).experience
+    assert [(entry["title"], entry["company"], entry["dates"]) for entry in entries] == [
+        ("Senior Engineer", "Acme Corp", "2020 - Present"),
+        ("Developer", "Northwind", ""),
+    ]
+    assert len(entries[0]["description"]) == 2
+    assert entries[1]["description"] == ["- Used SQL daily"]
+
+
+def test_contacts_name_and_offsets():
+    doc = parse_resume(RESUME)
+    assert doc.name == "Jane Roe"
+    assert doc.contacts["email"] == "jane.roe@email.com"
+    assert doc.contacts["phone"] == "(555) 987-6543"
+    assert doc.contacts["github"] == "github.com/janeroe"
+    for line, offset in zip(doc.lines, doc.line_offsets):
+        assert RESUME[offset:offset + len(line)] == line
+    assert "Python" in doc.skills
+
+
+def test_split_sections_keeps_order_and_isolates_edits():
+    blocks = split_sections(RESUME)
+    assert [section for section, _ in blocks] == ['other', 'summary', 'experience', 'education', 'skills']
+    assert blocks[2][1].strip().startswith('Work Experience')
+    assert ''.join(text for _, text in blocks).split() == RESUME.split()
+
+    edited = split_sections(RESUME.replace('focused on APIs', 'focused on APIs and data'))
+    changed = [section for (section, old), (_, new) in zip(blocks, edited) if old != new]
+    assert changed == ['summary']
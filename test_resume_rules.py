@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled section-header and action-verb rules
+"""
+import json
+import re
+
+import pytest
+
+from resume_rules import ResumeRules, get_resume_rules, load_rules
+
+
+def test_sections_are_tried_in_config_order():
+    rules = ResumeRules({"summary": "professional summary", "experience": "professional|experience"}, {})
+    assert rules.section_for("Professional Summary") == "summary"
+    assert rules.section_for("PROFESSIONAL EXPERIENCE") == "experience"
+    assert rules.section_for("Experienced engineer") is None
+
+
+def test_default_rules_classify_common_headers():
+    rules = get_resume_rules()
+    assert rules.section_for("== Technical Skills ==") == "skills"
+    assert rules.section_for("Work History") == "experience"
+    assert rules.section_for("Awards") == "achievements"
+
+
+def test_verbs_match_sequential_substitution():
+    verbs = get_resume_rules().action_verbs
+    bullet = "Worked with QA, made dashboards and was responsible for releases; used Python"
+
+    expected = bullet
+    for weak, strong in verbs.items():
+        expected = re.sub(rf'\b{weak}\b', strong, expected, flags=re.IGNORECASE)
+    assert get_resume_rules().strengthen_verbs(bullet) == expected
+    assert get_resume_rules().strengthen_verbs("reused frameworks") == "reused frameworks"
+
+
+def test_rules_load_from_config(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"sections": {"skills": "toolbox"}, "action_verbs": {"ran": "led"}}))
+    rules = load_rules(str(path))
+    assert rules.section_for("Toolbox") == "skills"
+    assert rules.strengthen_verbs("Ran the team") == "led the team"
+
+
+def test_section_names_must_be_identifiers():
+    with pytest.raises(ValueError):
+        ResumeRules({"work history": "experience"}, {})
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent AI rewrite cache
+"""
+import sqlite3
+import time
+
+import main
+from rewrite_cache import RewriteCache, make_rewrite_key
+
+
+def test_key_depends_on_every_input():
+    base = make_rewrite_key("resume", "job", "gpt-4o-mini")
+    assert base == make_rewrite_key("resume", "job", "gpt-4o-mini")
+    assert base != make_rewrite_key("resume", "job", "gpt-4o")
+    assert base != make_rewrite_key("resume", "job", "gpt-4o-mini", prompt_version="1")
+    # A different budget prunes the prompt differently
+    assert base != make_rewrite_key("resume", "job", "gpt-4o-mini", token_budget=1500)
+    assert make_rewrite_key("ab", "c", "m") != make_rewrite_key("a", "bc", "m")
+
+
+def test_hits_survive_reopening(tmp_path):
+    path = str(tmp_path / "rewrites.sqlite")
+    cache = RewriteCache(path)
+    assert cache.get("k") is None
+    cache.set("k", "Rewritten resume")
+    cache.close()
+
+    reopened = RewriteCache(path)
+    assert reopened.get("k") == "Rewritten resume"
+    stats = reopened.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 0, 1)
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = RewriteCache(str(tmp_path / "rewrites.sqlite"), ttl=0.05)
+    cache.set("k", "Rewritten resume")
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = RewriteCache(str(tmp_path / "rewrites.sqlite"), max_entries=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_errors_do_not_cost_the_ai_rewrite(client, fake_llm, monkeypatch):
+    def unwritable_cache():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(main, "get_rewrite_cache", unwritable_cache)
+    response = client.post("/tailor-resume-text", data={"resume_text": "Python developer", "job_desc": "Python and AWS"})
+    assert response.status_code == 200
+    assert response.json()["improved_resume"].startswith("Improved resume text")
+    assert fake_llm.calls == 1
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental, section-by-section resume analysis
+"""
+import asyncio
+
+import numpy as np
+
+from section_cache import SectionAnalysis, SectionCache, analyze_incrementally, combine_sections, make_section_key
+
+RESUME = """Jane Doe
+jane@email.com
+
+Summary
+Backend developer with five years of experience.
+
+Experience
+- Built REST APIs with Python and AWS
+
+Skills
+Python, AWS, Docker
+"""
+
+
+class CountingAnalyzer:
+    """Stands in for spaCy and the embedding model, recording which sections it was given"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(texts)
+        skills = [[word.strip(",") for word in text.split() if word[:1].isupper()] for text in texts]
+        embeddings = [np.array([len(text), 1.0], dtype=np.float32) for text in texts]
+        return skills, embeddings
+
+
+def analyze(text, cache, analyzer):
+    return asyncio.run(analyze_incrementally(text, cache, analyzer, "test-model"))
+
+
+def test_only_changed_sections_are_reanalyzed():
+    cache, analyzer = SectionCache(), CountingAnalyzer()
+    first, counts = analyze(RESUME, cache, analyzer)
+    assert counts == {"sections": 4, "reused": 0, "analyzed": 4}
+    assert "AWS" in first.skills
+
+    edited = RESUME.replace("five years", "six years")
+    second, counts = analyze(edited, cache, analyzer)
+    assert counts == {"sections": 4, "reused": 3, "analyzed": 1}
+    assert [text.strip() for text in analyzer.calls[-1]] == ["Summary\nBackend developer with six years of experience."]
+    assert second.text == edited
+
+    # Whitespace-only changes hit the cache
+    _, counts = analyze(RESUME.replace("\n\n", "\n\n\n"), cache, analyzer)
+    assert counts["analyzed"] == 0
+    assert len(analyzer.calls) == 2
+
+
+def test_only_cache_hits_count_as_reused():
+    cache, analyzer = SectionCache(), CountingAnalyzer()
+    analyze(RESUME, cache, analyzer)
+
+    # A new section pasted twice is one lookup miss and one analysis, not a reuse
+    projects = "Projects\n- Built a CLI in Go\n"
+    _, counts = analyze(RESUME + "\n" + projects + "\n" + projects, cache, analyzer)
+    assert counts == {"sections": 6, "reused": 4, "analyzed": 1}
+    assert [text.strip() for text in analyzer.calls[-1]] == [projects.strip()]
+
+
+def test_combined_embedding_is_length_weighted_and_normalized():
+    short = SectionAnalysis(["Python"], np.array([1.0, 0.0], dtype=np.float32), 1)
+    long = SectionAnalysis(["AWS", "Python"], np.array([0.0, 2.0], dtype=np.float32), 3)
+    combined = combine_sections("text", [short, long])
+    assert combined.skills == ["Python", "AWS"]
+    np.testing.assert_allclose(combined.embedding, np.array([1.0, 3.0]) / np.sqrt(10), rtol=1e-6)
+
+
+def test_disk_tier_survives_reopening(tmp_path):
+    path = str(tmp_path / "sections.sqlite")
+    key = make_section_key("Skills\nPython,  AWS", "test-model")
+    assert key == make_section_key("Skills Python, AWS", "test-model")
+    assert key != make_section_key("Skills Python AWS", "other-model")
+
+    cache = SectionCache(path=path)
+    cache.set(key, SectionAnalysis(["Python", "AWS"], np.array([0.6, 0.8], dtype=np.float32), 3))
+    cache.close()
+
+    restored = SectionCache(path=path).get(key)
+    assert restored.skills == ["Python", "AWS"] and restored.words == 3
+    np.testing.assert_allclose(restored.embedding, [0.6, 0.8])
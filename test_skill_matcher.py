@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled skill taxonomy matcher
+"""
+import re
+import time
+
+from import_taxonomy import convert_rows
+from skill_matcher import SkillMatcher, build_trie_pattern, get_skill_matcher, parse_taxonomy
+
+
+def test_word_boundaries_prevent_substring_matches():
+    matcher = get_skill_matcher()
+    assert matcher.find_all("Built SPAs in JavaScript") == ["JavaScript"]
+    assert matcher.find_all("Let's go to the meeting and catch up") == []
+    assert matcher.find_all("Painted murals in Django Reinhardt style") == ["Django"]
+
+
+def test_aliases_map_to_canonical_names():
+    matcher = get_skill_matcher()
+    found = matcher.find_all("Deployed k8s clusters with golang services on Amazon Web Services, reactjs frontend")
+    assert found == ["Kubernetes", "Go", "AWS", "React"]
+
+
+def test_symbols_in_skill_names():
+    matcher = get_skill_matcher()
+    assert matcher.find_all("C++, C# and Node.js with CI/CD") == ["C++", "C#", "Node.js", "CI/CD"]
+
+
+def test_case_sensitive_and_alias_only_entries():
+    matcher = SkillMatcher(parse_taxonomy([
+        "~Word | office | microsoft word",
+        "Go | technical | =Go, golang",
+        "Artificial Intelligence | technical | =AI",
+    ]))
+    assert matcher.find_all("a word about Microsoft Word") == ["Word"]
+    assert matcher.find_all("AI research, said ai") == ["Artificial Intelligence"]
+
+
+def test_categories_and_technical_lookup():
+    matcher = get_skill_matcher()
+    assert matcher.category("excel") == "office"
+    assert matcher.category("k8s") == "technical"
+    assert matcher.has_match("Senior web development role", {"technical"})
+    assert not matcher.has_match("Excellent communication", {"technical"})
+
+
+def test_trie_pattern_prefers_longest_match():
+    pattern = re.compile(build_trie_pattern(["java", "javascript", "jav"]))
+    assert pattern.match("javascript").group() == "javascript"
+    assert pattern.match("javax").group() == "java"
+
+
+def test_large_taxonomy_scans_in_one_pass():
+    lines = [f"Skill{i} | technical | alias{i}a, alias{i}b" for i in range(12000)]
+    matcher = SkillMatcher(parse_taxonomy(lines))
+    text = "Worked with skill11999 and alias42b daily. " * 200
+
+    started = time.perf_counter()
+    found = matcher.find_all(text)
+    elapsed = time.perf_counter() - started
+
+    assert found == ["Skill11999", "Skill42"]
+    assert elapsed < 1.0
+
+
+def test_imported_export_extends_the_curated_taxonomy():
+    rows = [
+        {"preferredLabel": "Apache Airflow", "altLabels": "airflow\nairflow dags", "skillType": "knowledge"},
+        {"preferredLabel": "negotiate contracts", "altLabels": "contract negotiation|deal, terms", "skillType": "skill/competence"},
+        # Already curated, so the curated entry and its rules win
+        {"preferredLabel": "Python", "altLabels": "py", "skillType": "knowledge"},
+    ]
+    lines = convert_rows(rows, "preferredLabel", "altLabels", "skillType", known={"python", "python3"})
+    assert lines == ["Apache Airflow | technical | airflow, airflow dags",
+                     "negotiate contracts | general | contract negotiation"]
+
+    matcher = SkillMatcher(parse_taxonomy(["Python | technical | python3", *lines]))
+    assert matcher.find_all("Scheduled airflow DAGs in Python, led contract negotiation") == [
+        "Apache Airflow", "Python", "negotiate contracts"]
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for batched skill extraction and the trimmed spaCy pipeline, with a stub pipeline
+"""
+import pytest
+
+import skills
+from conftest import StubNLP
+
+
+class RecordingNLP(StubNLP):
+    """StubNLP that records the nlp.pipe arguments"""
+
+    def __init__(self):
+        self.pipe_calls = []
+
+    def pipe(self, texts, **kwargs):
+        texts = list(texts)
+        self.pipe_calls.append({"texts": len(texts), **kwargs})
+        return super().pipe(texts)
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    stub = RecordingNLP()
+    monkeypatch.setattr(skills, "_nlp", stub)
+    monkeypatch.setattr(skills, "_in_pool_worker", False)
+    return stub
+
+
+def test_batch_keeps_order_and_matches_single_texts(nlp):
+    texts = ["Python and AWS developer", "Sales and marketing lead", "", "Docker, Kubernetes and SQL"]
+    batched = skills.extract_skills_batch(texts)
+
+    assert len(batched) == len(texts)
+    assert [sorted(found) for found in batched] == [sorted(skills.extract_skills(text)) for text in texts]
+    assert "Python" in batched[0] and "Docker" in batched[3] and batched[2] == []
+    # One nlp.pipe pass for the batch
+    assert nlp.pipe_calls[0]["texts"] == len(texts)
+
+
+def test_extra_processes_only_for_several_batches(nlp):
+    skills.extract_skills_batch(["Python"] * 4, batch_size=2, n_process=3)
+    skills.extract_skills_batch(["Python"] * 2, batch_size=2, n_process=3)
+    assert [call["n_process"] for call in nlp.pipe_calls] == [3, 1]
+
+
+def test_pool_workers_never_start_spacy_processes(nlp, monkeypatch):
+    monkeypatch.setattr(skills, "load_resources", lambda: None)
+    skills.init_pool_worker()
+
+    skills.extract_skills_batch(["Python"] * 10, batch_size=2, n_process=4)
+    assert nlp.pipe_calls[0]["n_process"] == 1
+
+
+def test_pipeline_is_loaded_once_without_excluded_components(monkeypatch):
+    loads = []
+
+    def load(name, exclude=()):
+        loads.append((name, list(exclude)))
+        return StubNLP()
+
+    monkeypatch.setattr(skills, "_nlp", None)
+    monkeypatch.setattr(skills.spacy, "load", load)
+    assert skills.get_nlp() is skills.get_nlp()
+    assert loads == [("en_core_web_sm", skills.SPACY_EXCLUDE)]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the Server-Sent Events tailoring endpoints, with stub models and a fake LLM
+"""
+import json
+
+import pytest
+
+import main
+from benchmarks.corpus import make_pdf
+from conftest import FakeLLM
+from rewrite_cache import RewriteCache
+
+RESUME = "Python developer with AWS and SQL"
+JOB = "Senior Python developer with Docker, AWS and React"
+
+
+def events(response):
+    """(event, data) pairs of an SSE response"""
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    parsed = []
+    for message in response.text.strip().split("\n\n"):
+        event, data = message.split("\n")
+        parsed.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return parsed
+
+
+def stream_text(client, **form):
+    return events(client.post("/tailor-resume-text-stream", data={"resume_text": RESUME, "job_desc": JOB,
+                                                                  "use_cache": "false", **form}))
+
+
+@pytest.fixture
+def rewrite_cache(tmp_path, monkeypatch):
+    cache = RewriteCache(str(tmp_path / "rewrites.sqlite"))
+    monkeypatch.setattr(main, "get_rewrite_cache", lambda: cache)
+    yield cache
+    cache.close()
+
+
+def test_events_arrive_in_order(client, fake_llm):
+    stream = stream_text(client)
+
+    names = [name for name, _ in stream]
+    assert names == ["analysis"] + ["token"] * len(FakeLLM.REWRITE_TOKENS) + ["notes", "done"]
+    analysis = stream[0][1]
+    assert analysis["similarity_score"] > 0 and "Docker" in analysis["missing_skills"]
+    assert [data["text"] for name, data in stream if name == "token"] == FakeLLM.REWRITE_TOKENS
+    assert stream[-2][1]["text"]
+
+
+def test_cached_rewrite_is_one_token_event(client, fake_llm, rewrite_cache):
+    first = stream_text(client, use_cache="true")
+    second = stream_text(client, use_cache="true")
+
+    assert fake_llm.calls == 1
+    tokens = [data for name, data in second if name == "token"]
+    assert tokens == [{"text": "".join(FakeLLM.REWRITE_TOKENS).strip(), "cached": True}]
+    assert [name for name, _ in second] == ["analysis", "token", "notes", "done"]
+    assert [name for name, _ in first].count("token") == len(FakeLLM.REWRITE_TOKENS)
+
+
+def test_failure_mid_stream_falls_back_and_replaces_tokens(client, fake_llm):
+    fake_llm.fail = True
+    stream = stream_text(client)
+
+    assert [name for name, _ in stream] == ["analysis", "token", "fallback", "done"]
+    fallback = stream[2][1]
+    assert fallback["replaces_tokens"] is True
+    assert "PROFESSIONAL SUMMARY" in fallback["text"]
+
+
+def test_fallback_before_any_token_replaces_nothing(client):
+    # No OPENAI_API_KEY: the template rewrite is sent without any token events
+    stream = stream_text(client)
+    assert [name for name, _ in stream] == ["analysis", "fallback", "done"]
+    assert stream[1][1]["replaces_tokens"] is False
+
+
+def test_pdf_stream_reports_analysis_errors_as_an_event(client, fake_llm):
+    response = client.post("/tailor-resume-stream", data={"job_desc": JOB},
+                           files={"resume": ("resume.pdf", b"%PDF-1.4 truncated", "application/pdf")})
+    stream = events(response)
+
+    assert [name for name, _ in stream] == ["error"]
+    assert stream[0][1]["detail"]
+    assert fake_llm.calls == 0
+
+
+def test_pdf_stream_analyzes_the_upload(client, fake_llm):
+    response = client.post("/tailor-resume-stream", data={"job_desc": JOB, "use_cache": "false"},
+                           files={"resume": ("resume.pdf", make_pdf([RESUME]), "application/pdf")})
+    stream = events(response)
+
+    assert [name for name, _ in stream][0] == "analysis" and stream[-1][0] == "done"
+    assert stream[0][1]["resume_text"] == RESUME
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite submit/poll task queue and its worker processes
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import asyncio
+import socket
+import json
+import time
+
+import pytest
+
+import task_queue
+from task_queue import TaskStore, TaskWorkerPool, QueueFull
+
+
+async def echo_handler(payload, resume_pdf):
+    """Handler run by the worker processes in test_worker_processes_run_tasks"""
+    return {"text": payload["text"], "pdf_bytes": len(resume_pdf or b"")}
+
+
+async def hanging_handler(payload, resume_pdf):
+    """Handler that never finishes, for stopping workers mid-task"""
+    await asyncio.sleep(3600)
+
+
+def test_tasks_are_claimed_in_submission_order(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.sqlite"))
+    first = store.submit("tailor-resume-text", {"text": "a"})
+    second = store.submit("tailor-resume", {"text": "b"}, resume_pdf=b"%PDF")
+    assert store.get(second)["queue_position"] == 1
+
+    claimed = store.claim("w1")
+    assert claimed["id"] == first and claimed["payload"] == {"text": "a"}
+    assert store.get(first)["status"] == "running"
+    store.complete(first, {"ok": True})
+    assert store.get(first)["result"] == {"ok": True}
+
+    assert store.claim("w1")["resume_pdf"] == b"%PDF"
+    store.fail(second, "bad pdf")
+    assert store.get(second)["error"] == "bad pdf"
+    assert store.claim("w1") is None
+    assert store.depth()["by_status"] == {"queued": 0, "running": 0, "succeeded": 1, "failed": 1}
+
+
+def test_submit_rejects_when_queue_is_full():
+    store = TaskStore(":memory:", max_queued=1)
+    store.submit("tailor-resume-text", {})
+    with pytest.raises(QueueFull):
+        store.submit("tailor-resume-text", {})
+
+
+def test_stale_running_tasks_are_requeued_then_failed(monkeypatch):
+    monkeypatch.setattr(task_queue, "TASK_TIMEOUT", -1)
+    monkeypatch.setattr(task_queue, "TASK_MAX_ATTEMPTS", 2)
+    store = TaskStore(":memory:")
+    task_id = store.submit("tailor-resume-text", {})
+
+    assert store.claim("dead-worker")["id"] == task_id
+    assert store.claim("w2")["id"] == task_id
+    assert store.claim("w3") is None
+    assert store.get(task_id)["status"] == "failed"
+    assert store.get(task_id)["error"] == "Task timed out"
+
+
+def test_release_requeues_only_that_workers_tasks():
+    store = TaskStore(":memory:")
+    first, second = store.submit("tailor-resume-text", {}), store.submit("tailor-resume-text", {})
+    store.claim("w1")
+    store.claim("w2")
+
+    assert store.release("w1") == 1
+    assert store.get(first)["status"] == "queued" and store.get(second)["status"] == "running"
+    # The interrupted claim is not counted against TASK_MAX_ATTEMPTS
+    assert store.claim("w3")["id"] == first
+    assert store._db.execute("SELECT attempts FROM tasks WHERE id = ?", (first,)).fetchone()[0] == 1
+
+
+def test_cancelled_worker_loop_requeues_its_tasks():
+    store = TaskStore(":memory:")
+    task_id = store.submit("tailor-resume-text", {})
+
+    async def run_then_cancel():
+        loop = asyncio.create_task(task_queue.work(store, hanging_handler, "api-1"))
+        while store.get(task_id)["status"] != "running":
+            await asyncio.sleep(0.01)
+        loop.cancel()
+        await asyncio.gather(loop, return_exceptions=True)
+
+    asyncio.run(run_then_cancel())
+    assert store.get(task_id)["status"] == "queued"
+
+
+def test_handler_errors_fail_the_task():
+    store = TaskStore(":memory:")
+    task_id = store.submit("tailor-resume-text", {})
+
+    async def broken(payload, resume_pdf):
+        raise ValueError("no skills")
+
+    asyncio.run(task_queue.execute_task(store, broken, store.claim("w1")))
+    assert store.get(task_id)["status"] == "failed"
+    assert store.get(task_id)["error"] == "ValueError: no skills"
+
+
+def test_worker_processes_run_tasks(tmp_path):
+    path = str(tmp_path / "tasks.sqlite")
+    store = TaskStore(path)
+    task_ids = [store.submit("tailor-resume", {"text": str(number)}, resume_pdf=b"x" * number) for number in range(3)]
+
+    pool = TaskWorkerPool(path, "test_task_queue:echo_handler", workers=2)
+    pool.start()
+    try:
+        deadline = time.time() + 60
+        while time.time() < deadline and any(store.get(task_id)["status"] != "succeeded" for task_id in task_ids):
+            time.sleep(0.1)
+        assert pool.alive() == 2
+    finally:
+        pool.stop()
+
+    results = [store.get(task_id)["result"] for task_id in task_ids]
+    assert results == [{"text": str(number), "pdf_bytes": number} for number in range(3)]
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:8000/hook",
+    "http://localhost/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/hook",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "ftp://93.184.216.34/hook",
+])
+def test_callback_urls_to_internal_addresses_are_rejected(url):
+    with pytest.raises(task_queue.CallbackURLError):
+        task_queue.check_callback_url(url, allowed_hosts=set())
+
+
+def test_callback_url_allowlist():
+    task_queue.check_callback_url("https://93.184.216.34/hook", allowed_hosts=set())
+    task_queue.check_callback_url("http://127.0.0.1/hook", allowed_hosts={"127.0.0.1"})
+    with pytest.raises(task_queue.CallbackURLError):
+        task_queue.check_callback_url("https://93.184.216.34/hook", allowed_hosts={"hooks.example.com"})
+
+
+@pytest.mark.parametrize("url", ["http://127.0.0.1:8000/hook", "http://169.254.169.254/latest/meta-data/"])
+def test_submitting_an_internal_callback_url_is_a_400(client, url):
+    response = client.post("/tasks/tailor-resume-text", data={"resume_text": "Python developer",
+                                                              "job_desc": "Python", "callback_url": url})
+    assert response.status_code == 400
+    assert "callback_url" in response.json()["detail"]
+
+
+def test_callback_is_checked_again_before_delivery():
+    store = TaskStore(":memory:")
+    task_id = store.submit("tailor-resume-text", {}, callback_url="http://169.254.169.254/")
+    asyncio.run(task_queue.send_callback(store, task_id, "http://169.254.169.254/"))
+    assert store.get(task_id)["callback"]["status"] == "rejected"
+
+
+def test_stopped_worker_processes_requeue_their_tasks(tmp_path):
+    path = str(tmp_path / "tasks.sqlite")
+    store = TaskStore(path)
+    task_id = store.submit("tailor-resume-text", {})
+
+    pool = TaskWorkerPool(path, "test_task_queue:hanging_handler", workers=1)
+    pool.start()
+    try:
+        deadline = time.time() + 60
+        while time.time() < deadline and store.get(task_id)["status"] != "running":
+            time.sleep(0.1)
+        assert store.get(task_id)["status"] == "running"
+    finally:
+        pool.stop()
+    assert store.get(task_id)["status"] == "queued"
+
+
+def test_pinned_callback_keeps_host_credentials_and_tls_name():
+    url, headers, extensions = task_queue.pin_callback_url("https://user:pw@hooks.example.com:8443/done?x=1",
+                                                           "93.184.216.34")
+    assert url == "https://user:pw@93.184.216.34:8443/done?x=1"
+    assert headers == {"Host": "hooks.example.com:8443"}
+    assert extensions == {"sni_hostname": "hooks.example.com"}
+
+    url, headers, extensions = task_queue.pin_callback_url("http://hooks.example.com/done", "2606:2800:220:1::1")
+    assert (url, headers, extensions) == ("http://[2606:2800:220:1::1]/done", {"Host": "hooks.example.com"}, {})
+
+
+def test_callback_connects_to_the_checked_address(monkeypatch):
+    received = []
+
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append((self.headers["Host"], json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    real_getaddrinfo = socket.getaddrinfo
+    lookups = []
+
+    def rebinding_getaddrinfo(host, *args, **kwargs):
+        # The first lookup (the check) gets the receiver; any later one would go elsewhere
+        if host == "hooks.test":
+            lookups.append(host)
+            if len(lookups) > 1:
+                raise socket.gaierror("rebound")
+            return real_getaddrinfo("127.0.0.1", *args, **kwargs)
+        return real_getaddrinfo(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", rebinding_getaddrinfo)
+    monkeypatch.setattr(task_queue, "TASK_CALLBACK_ALLOWED_HOSTS", {"hooks.test"})
+    store = TaskStore(":memory:")
+    url = f"http://hooks.test:{server.server_port}/done"
+    task_id = store.submit("tailor-resume-text", {}, callback_url=url)
+    try:
+        asyncio.run(task_queue.send_callback(store, task_id, url))
+    finally:
+        server.shutdown()
+
+    assert store.get(task_id)["callback"]["status"] == "delivered (204)"
+    assert lookups == ["hooks.test"]
+    assert received[0][0] == f"hooks.test:{server.server_port}" and received[0][1]["task_id"] == task_id
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-hash cache of analyzed resume uploads
+"""
+import numpy as np
+
+from upload_cache import ResumeAnalysis, UploadCache, make_upload_key
+
+
+def analysis():
+    return ResumeAnalysis("Python developer", ["Python"], np.array([0.6, 0.8], dtype=np.float32))
+
+
+def test_key_depends_on_hash_and_model():
+    assert make_upload_key("ab12", "model-a") == make_upload_key("ab12", "model-a")
+    assert make_upload_key("ab12", "model-a") != make_upload_key("cd34", "model-a")
+    assert make_upload_key("ab12", "model-a") != make_upload_key("ab12", "model-b")
+
+
+def test_memory_only_cache_misses_after_restart():
+    cache = UploadCache(max_entries=2)
+    cache.set("k", analysis())
+    assert cache.get("k").skills == ["Python"]
+    assert cache.stats()["disk"] is None
+    assert UploadCache(max_entries=2).get("k") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "uploads.sqlite")
+    cache = UploadCache(path=path)
+    cache.set("k", analysis())
+    cache.close()
+
+    restored = UploadCache(path=path).get("k")
+    assert restored.text == "Python developer"
+    assert restored.skills == ["Python"]
+    assert restored.embedding.dtype == np.float32
+    np.testing.assert_array_equal(restored.embedding, analysis().embedding)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for request size limits and upload spooling
+"""
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from uploads import BodySizeLimitMiddleware, spool_upload
+
+
+def make_client(calls):
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=1024, path_limits={"/bulk": 4096})
+
+    @app.post("/upload")
+    @app.post("/bulk")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+def test_small_bodies_pass_through():
+    calls = []
+    response = make_client(calls).post("/upload", files={"file": ("a.pdf", b"x" * 100)})
+    assert response.status_code == 200
+    assert calls == ["a.pdf"]
+
+
+def test_content_length_over_limit_is_rejected_before_the_handler():
+    calls = []
+    response = make_client(calls).post("/upload", files={"file": ("a.pdf", b"x" * 2048)})
+    assert response.status_code == 413
+    assert calls == []
+
+
+def test_path_limits_override_the_default():
+    response = make_client([]).post("/bulk", files={"file": ("a.pdf", b"x" * 2048)})
+    assert response.status_code == 200
+
+
+def test_chunked_body_over_limit_is_rejected():
+    def chunks():
+        for _ in range(4):
+            yield b"x" * 512
+
+    calls = []
+    response = make_client(calls).post("/upload", content=chunks(),
+                                       headers={"content-type": "application/x-www-form-urlencoded"})
+    assert response.status_code == 413
+    assert calls == []
+
+
+def test_spool_upload_hashes_and_enforces_limit():
+    data = b"%PDF-1.4 " * 1000
+    upload = UploadFile(io.BytesIO(data), filename="a.pdf")
+    source = upload.file
+    source.read(100)
+    spooled = spool_upload(upload)
+    # The upload's own spool is taken over and rewound rather than copied
+    assert spooled.file is source and source.tell() == 0
+    assert upload.file is not source
+    upload.file.close()
+    assert not source.closed
+    assert spooled.size == len(data)
+    assert spooled.sha256 == hashlib.sha256(data).hexdigest()
+    assert spooled.open().read() == data
+    spooled.close()
+
+    with pytest.raises(HTTPException) as excinfo:
+        spool_upload(UploadFile(io.BytesIO(data), filename="a.pdf"), max_bytes=1000)
+    assert excinfo.value.status_code == 413
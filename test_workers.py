@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared worker pools
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+import asyncio
+import os
+
+import pytest
+
+import workers
+
+
+def where(parent_pid):
+    return "process" if os.getpid() != parent_pid else threading.current_thread().name
+
+
+def die_in_worker(parent_pid):
+    # Only a pool worker dies; the thread fallback in the parent returns normally
+    if os.getpid() != parent_pid:
+        os._exit(1)
+    return threading.current_thread().name
+
+
+class RecordingPool(ProcessPoolExecutor):
+    """Records shutdown() calls"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shutdown_calls = []
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shutdown_calls.append({"wait": wait, "cancel_futures": cancel_futures})
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    """A one-worker spawn pool without the spaCy initializer, installed as the shared pool"""
+    pool = RecordingPool(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    monkeypatch.setattr(workers, "SPACY_PROCESSES", 1)
+    monkeypatch.setattr(workers, "_process_pool", pool)
+    yield pool
+    pool.shutdown(wait=True, cancel_futures=True)
+    workers.shutdown_pools()
+
+
+def test_run_in_thread_uses_the_worker_pool():
+    try:
+        assert asyncio.run(workers.run_in_thread(where, os.getpid())).startswith("resume-worker")
+    finally:
+        workers.shutdown_pools()
+
+
+def test_run_in_process_offloads_to_the_pool(process_pool):
+    assert asyncio.run(workers.run_in_process(where, os.getpid())) == "process"
+
+
+def test_broken_pool_is_shut_down_and_replaced(process_pool):
+    result = asyncio.run(workers.run_in_process(die_in_worker, os.getpid()))
+
+    # The call is retried on a thread and the broken executor is released, not leaked
+    assert result.startswith("resume-worker")
+    assert process_pool.shutdown_calls == [{"wait": False, "cancel_futures": True}]
+    assert workers._process_pool is None
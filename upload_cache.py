@@ -0,0 +1,54 @@
+"""
+Cache of analyzed resume uploads, keyed by the SHA-256 of the PDF bytes.
+
+Candidates upload the same PDF once per job they apply to. The extracted
+text, its skills and its normalized embedding are kept in an in-memory
+LRU, optionally backed by a SQLite tier (UPLOAD_CACHE_PATH) that
+survives restarts, so a repeat upload skips PDF parsing, spaCy and the
+embedding model entirely. The embedding model name is part of the key so
+switching models never serves stale vectors.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+import json
+import os
+
+import numpy as np
+
+from cache import Serializer, TwoTierCache
+
+UPLOAD_CACHE_MAX_ENTRIES = int(os.getenv("UPLOAD_CACHE_MAX_ENTRIES", "512"))
+UPLOAD_CACHE_TTL = float(os.getenv("UPLOAD_CACHE_TTL", str(24 * 3600)))
+# Empty disables the on-disk tier
+UPLOAD_CACHE_PATH = os.getenv("UPLOAD_CACHE_PATH", "")
+UPLOAD_CACHE_DISK_MAX_ENTRIES = int(os.getenv("UPLOAD_CACHE_DISK_MAX_ENTRIES", "20000"))
+
+
+@dataclass
+class ResumeAnalysis:
+    text: str
+    skills: List[str]
+    # Unit length, so similarity with a job is a dot product
+    embedding: np.ndarray
+
+    def to_json(self) -> str:
+        return json.dumps({"text": self.text, "skills": self.skills, "embedding": self.embedding.tolist()})
+
+    @classmethod
+    def from_json(cls, payload: str) -> "ResumeAnalysis":
+        data = json.loads(payload)
+        return cls(data["text"], data["skills"], np.asarray(data["embedding"], dtype=np.float32))
+
+
+def make_upload_key(sha256: str, model_name: str) -> str:
+    """Cache key from the hex SHA-256 of the upload (computed while spooling it)"""
+    return f"{sha256}:{model_name}"
+
+
+class UploadCache(TwoTierCache):
+    """Two-tier (memory, then optional disk) cache of ResumeAnalysis by upload hash"""
+
+    def __init__(self, max_entries: int = UPLOAD_CACHE_MAX_ENTRIES, ttl: Optional[float] = UPLOAD_CACHE_TTL,
+                 path: str = UPLOAD_CACHE_PATH, disk_max_entries: int = UPLOAD_CACHE_DISK_MAX_ENTRIES):
+        super().__init__(Serializer(ResumeAnalysis.to_json, ResumeAnalysis.from_json), table="uploads",
+                         max_entries=max_entries, ttl=ttl, path=path, disk_max_entries=disk_max_entries)
@@ -0,0 +1,135 @@
+"""
+Bounded-memory upload ingestion.
+
+BodySizeLimitMiddleware caps request bodies: it answers 413 from the
+Content-Length header before any of the body is read, and stops a
+chunked body as soon as it crosses the limit. Each PDF upload is then
+read in chunks from the SpooledTemporaryFile Starlette already parsed it
+into, hashed and checked against its own limit on the way, and rewound,
+so the PDF parser reads from that spool without a second copy. The app
+takes the spool over from the UploadFile, so it outlives the request
+form for the streaming endpoints.
+"""
+from typing import Dict, Optional
+import hashlib
+import io
+import json
+import os
+
+from fastapi import HTTPException, UploadFile
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Whole request body, i.e. the upload plus the job description and other form fields
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(MAX_UPLOAD_BYTES + 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def format_limit(limit: int) -> str:
+    if limit >= 1024 * 1024:
+        return f"{limit / (1024 * 1024):g} MB"
+    return f"{limit / 1024:g} KB"
+
+
+class SpooledUpload:
+    """An uploaded file's spool, taken over by the app, with its size and SHA-256"""
+
+    def __init__(self, file, size: int, sha256: str, filename: Optional[str] = None):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+        self.filename = filename
+
+    def open(self):
+        """Return the spool rewound to the start, ready for the parser"""
+        self.file.seek(0)
+        return self.file
+
+    def close(self):
+        self.file.close()
+
+
+def spool_upload(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledUpload:
+    """Hash an upload's spool in chunks, enforcing max_bytes, and take it over rewound (blocking)"""
+    spool = upload.file
+    spool.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = spool.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"{upload.filename or 'Upload'} is larger than the {format_limit(max_bytes)} limit"
+            )
+        digest.update(chunk)
+    spool.seek(0)
+    # The form closes its UploadFiles once the handler returns; the spool is now closed by SpooledUpload
+    upload.file = io.BytesIO()
+    return SpooledUpload(spool, size, digest.hexdigest(), upload.filename)
+
+
+class RequestTooLarge(HTTPException):
+    def __init__(self, limit: int):
+        super().__init__(status_code=413, detail=f"Request body is larger than the {format_limit(limit)} limit")
+
+
+class BodySizeLimitMiddleware:
+    """ASGI middleware that rejects request bodies over a per-path byte limit with 413"""
+
+    def __init__(self, app, max_body_size: int = MAX_REQUEST_BYTES, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_body_size)
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            # Reject before reading any of the body
+            await self._reject(send, RequestTooLarge(limit))
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside form parsing, FastAPI turns this into the 413 response
+                    raise RequestTooLarge(limit)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestTooLarge as e:
+            if response_started:
+                raise
+            await self._reject(send, e)
+
+    @staticmethod
+    async def _reject(send, error: HTTPException):
+        body = json.dumps({"detail": error.detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": error.status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
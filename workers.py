@@ -0,0 +1,86 @@
+"""
+Bounded worker pools for the CPU-bound stages of the tailoring pipeline.
+
+PDF parsing, embedding and the OpenAI client run on a thread pool. torch
+releases the GIL, so embeddings overlap with other work; PyPDF2 is pure
+Python and holds it, so the thread only keeps a parse off the event loop
+(long PDFs are split across the process pool instead). spaCy runs on a
+small process pool because its Python-level work holds the GIL for the
+whole document.
+"""
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import multiprocessing
+import asyncio
+import os
+
+import skills
+
+# Pool sizes are configurable so small instances can trade latency for memory
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", str(min(32, (os.cpu_count() or 1) + 4))))
+# 0 disables the process pool and runs spaCy on the thread pool instead
+SPACY_PROCESSES = int(os.getenv("SPACY_PROCESSES", str(min(2, os.cpu_count() or 1))))
+
+_thread_pool = None
+_process_pool = None
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Return the shared thread pool, creating it on first use"""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="resume-worker")
+    return _thread_pool
+
+
+def get_process_pool():
+    """Return the shared spaCy process pool, or None when it is disabled"""
+    global _process_pool
+    if SPACY_PROCESSES <= 0:
+        return None
+    if _process_pool is None:
+        # Spawn rather than fork: the parent holds torch threads and the event loop
+        _process_pool = ProcessPoolExecutor(
+            max_workers=SPACY_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=skills.init_pool_worker,
+        )
+    return _process_pool
+
+
+async def run_in_thread(func, *args, **kwargs):
+    """Run a blocking callable on the thread pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_thread_pool(), partial(func, *args, **kwargs))
+
+
+async def run_in_process(func, *args, **kwargs):
+    """Run a picklable callable on the process pool, falling back to a thread"""
+    global _process_pool
+    pool = get_process_pool()
+    if pool is None:
+        return await run_in_thread(func, *args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); rebuild the pool for later requests
+        print("spaCy process pool broke, recreating it")
+        # Release the broken executor's management thread and pipes before replacing it
+        pool.shutdown(wait=False, cancel_futures=True)
+        if _process_pool is pool:
+            _process_pool = None
+        return await run_in_thread(func, *args, **kwargs)
+
+
+def shutdown_pools():
+    """Stop both pools; called when the application shuts down"""
+    global _thread_pool, _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None